@@ -0,0 +1,60 @@
+// Mount the interactive content of a section once it approaches the viewport.
+//
+// The content is compiled to its own module by utils/deferred.py and passed
+// as `load`, so it is only fetched, rendered and laid out when the
+// placeholder gets within `rootMargin` of the viewport. Until then the
+// placeholder reserves `intrinsicSize` and, with `content-visibility: auto`,
+// is skipped by rendering whenever it is off screen.
+import { Suspense, createElement, lazy, useEffect, useRef, useState } from "react";
+
+// The lazy component of each section, so its module is only imported once.
+const sections = new Map();
+
+function lazySection(name, load) {
+  if (!sections.has(name)) {
+    sections.set(name, lazy(() => load().then((module) => ({ default: module[name] }))));
+  }
+  return sections.get(name);
+}
+
+export function DeferredSection({
+  name,
+  load,
+  rootMargin = "600px 0px",
+  intrinsicSize = "auto 40rem",
+  style,
+  ...props
+}) {
+  const ref = useRef(null);
+  const [visible, setVisible] = useState(false);
+
+  useEffect(() => {
+    if (typeof IntersectionObserver === "undefined") {
+      setVisible(true);
+      return undefined;
+    }
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+          setVisible(true);
+          observer.disconnect();
+        }
+      },
+      { rootMargin },
+    );
+    observer.observe(ref.current);
+    return () => observer.disconnect();
+  }, [rootMargin]);
+
+  return createElement(
+    "div",
+    {
+      ref,
+      style: { contentVisibility: "auto", containIntrinsicSize: intrinsicSize, ...style },
+      ...props,
+    },
+    visible
+      ? createElement(Suspense, { fallback: null }, createElement(lazySection(name, load)))
+      : null,
+  );
+}
@@ -0,0 +1,221 @@
+"""Measure the construction, compile time and bundle size of the portfolio.
+
+Usage:
+    python -m benchmarks.build [--repeat N] [--jobs N] [--export] [--output FILE]
+
+Without ``--export``, the app is compiled without writing the frontend and the
+bundle is measured from the last export found in ``.web``, if any. The photo
+variants are encoded into a temporary directory on a single core, then on
+``--jobs`` processes, to measure the speedup of the parallel image stage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from utils.components import iter_components, literal
+
+# The id of each section of the main content, in page order.
+SECTIONS = ("about", "experience", "skills", "projects", "certifications", "contact")
+
+STATIC_DIR = Path(".web") / "build" / "client"
+
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".br": "brotli", ".zst": "zstd"}
+
+
+def count_nodes(root) -> int:
+    """Count the components of a tree, the root included."""
+    return sum(1 for _ in iter_components(root))
+
+
+def section_nodes(root) -> dict[str, int]:
+    """Count the components of each section of the page.
+
+    Args:
+        root: The page.
+
+    Returns:
+        The node count of each section, the footer and the whole page.
+    """
+    from portofolio_reflex.components.test import create_footer
+
+    counts = dict.fromkeys(SECTIONS, 0)
+    for component in iter_components(root):
+        section = literal(component.id)
+        if section in counts:
+            counts[section] = count_nodes(component)
+    counts["footer"] = count_nodes(create_footer())
+    counts["total"] = count_nodes(root)
+    return counts
+
+
+def time_tree(repeat: int) -> dict:
+    """Time the construction of the portfolio page.
+
+    Args:
+        repeat: The number of trees to build.
+
+    Returns:
+        The median and best build time with empty factory caches, the median
+        time of a rebuild served from the caches, and the node counts.
+    """
+    from portofolio_reflex.components.factory import clear_factories, factory_stats
+    from portofolio_reflex.pages.index.page import create_portfolio_page
+
+    cold, warm = [], []
+    for _ in range(repeat):
+        clear_factories()
+        start = time.perf_counter()
+        page = create_portfolio_page()
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        create_portfolio_page()
+        warm.append(time.perf_counter() - start)
+
+    stats = factory_stats().values()
+    hits, misses = sum(s.hits for s in stats), sum(s.misses for s in stats)
+    return {
+        "median_ms": round(statistics.median(cold) * 1e3, 3),
+        "min_ms": round(min(cold) * 1e3, 3),
+        "cached_median_ms": round(statistics.median(warm) * 1e3, 3),
+        "factory_hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        "nodes": section_nodes(page),
+    }
+
+
+def time_compile() -> float:
+    """Time the compilation of the app, without writing the frontend.
+
+    Returns:
+        The compile time in seconds.
+    """
+    from portofolio_reflex.portofolio_reflex import app
+
+    start = time.perf_counter()
+    app._compile(dry_run=True, use_rich=False)
+    return round(time.perf_counter() - start, 3)
+
+
+def time_images(jobs: int | None) -> dict:
+    """Time the encoding of the photo variants, serially then in parallel.
+
+    Args:
+        jobs: The number of processes of the parallel run, every core if None.
+
+    Returns:
+        The number of variants, the wall time of each run and the speedup of
+        the parallel run.
+    """
+    from utils.images import ASSETS_DIR, SOURCE_SUFFIXES, encode_variants
+
+    paths = sorted(
+        path for path in ASSETS_DIR.iterdir() if path.suffix.lower() in SOURCE_SUFFIXES
+    )
+    reports = []
+    for run_jobs in (1, jobs):
+        with tempfile.TemporaryDirectory() as output_dir:
+            reports.append(encode_variants(paths, Path(output_dir), run_jobs)[1])
+    serial, parallel = reports
+    return {
+        "variants": parallel.items,
+        "jobs": parallel.jobs,
+        "serial_s": round(serial.wall, 3),
+        "parallel_s": round(parallel.wall, 3),
+        "speedup": round(serial.wall / parallel.wall, 2) if parallel.wall else 1.0,
+    }
+
+
+def time_export() -> float:
+    """Time a full frontend export, bundling included.
+
+    Returns:
+        The export time in seconds.
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "reflex", "export", "--frontend-only", "--no-zip"],
+        check=True,
+    )
+    return round(time.perf_counter() - start, 3)
+
+
+def bundle_size(static_dir: Path = STATIC_DIR) -> dict | None:
+    """Measure the exported frontend.
+
+    Args:
+        static_dir: The exported frontend.
+
+    Returns:
+        The size in bytes of the files of each type, with the total size of
+        each precompressed format, or None if the app was never exported.
+    """
+    if not static_dir.is_dir():
+        return None
+    sizes: dict[str, int] = {}
+    compressed = dict.fromkeys(COMPRESSED_SUFFIXES.values(), 0)
+    for path in static_dir.rglob("*"):
+        if not path.is_file():
+            continue
+        size = path.stat().st_size
+        if path.suffix in COMPRESSED_SUFFIXES:
+            compressed[COMPRESSED_SUFFIXES[path.suffix]] += size
+            continue
+        kind = path.suffix.lstrip(".") or "other"
+        sizes[kind] = sizes.get(kind, 0) + size
+    return {
+        "files": dict(sorted(sizes.items())),
+        "total": sum(sizes.values()),
+        "compressed": {fmt: size for fmt, size in compressed.items() if size},
+    }
+
+
+def run(repeat: int, jobs: int | None, export: bool) -> dict:
+    """Run the benchmark.
+
+    Args:
+        repeat: The number of page trees to build.
+        jobs: The number of processes encoding the photo variants.
+        export: Whether to run a full export before measuring the bundle.
+
+    Returns:
+        The measurements of each stage.
+    """
+    results = {
+        "python": sys.version.split()[0],
+        "tree": time_tree(repeat),
+        "compile_s": time_compile(),
+        "images": time_images(jobs),
+    }
+    if export:
+        results["export_s"] = time_export()
+    results["bundle_bytes"] = bundle_size()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument(
+        "--jobs", type=int, help="Processes encoding the photos, every core by default."
+    )
+    parser.add_argument(
+        "--export", action="store_true", help="Run a full export first."
+    )
+    parser.add_argument("--output", type=Path, help="File to write the results to.")
+    args = parser.parse_args()
+
+    results = json.dumps(run(args.repeat, args.jobs, args.export), indent=2)
+    if args.output:
+        args.output.write_text(results + "\n")
+    print(results)
+
+
+if __name__ == "__main__":
+    main()
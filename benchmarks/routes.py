@@ -0,0 +1,106 @@
+"""Build and query a route index of 100k routes.
+
+Usage:
+    python -m benchmarks.routes [--routes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from utils.routes import RouteIndex
+
+
+def generate_routes(count: int) -> list[str]:
+    """Generate a site map shaped like a large content site.
+
+    Args:
+        count: The number of routes.
+
+    Returns:
+        Static pages nested up to 6 levels, plus a few dynamic sections.
+    """
+    rng = random.Random(0)
+    routes = [
+        "/",
+        "/projects/[slug]",
+        "/articles/[year]/[slug]",
+        "/docs/[[...path]]",
+    ]
+    while len(routes) < count:
+        depth = rng.randint(1, 6)
+        routes.append(
+            "/"
+            + "/".join(f"s{rng.randint(0, 30)}" for _ in range(depth - 1))
+            + f"/page{len(routes)}"
+        )
+    return routes
+
+
+def generate_paths(routes: list[str], count: int) -> list[str]:
+    """Generate the paths to look up, a mix of hits, dynamic routes and misses."""
+    rng = random.Random(1)
+    paths = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.7:
+            paths.append(rng.choice(routes).replace("[[...path]]", "a/b"))
+        elif kind < 0.9:
+            paths.append(f"/articles/2024/post-{rng.randint(0, 999)}")
+        else:
+            paths.append(f"/missing/{rng.randint(0, 999)}/page")
+    return paths
+
+
+def timed(function, *args) -> tuple[float, object]:
+    """Run a function and measure its wall time in seconds."""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def run(count: int) -> dict:
+    """Run the benchmark.
+
+    Args:
+        count: The number of routes and lookups.
+
+    Returns:
+        The timings of each stage.
+    """
+    routes = generate_routes(count)
+    paths = generate_paths(routes, count)
+
+    build_time, index = timed(
+        lambda: RouteIndex([{"route": route} for route in routes])
+    )
+    match_time, matches = timed(lambda: [index.match(path) for path in paths])
+    prefix_time, _ = timed(lambda: [index.longest_prefix(path) for path in paths])
+    iter_time, iterated = timed(lambda: sum(1 for _ in index))
+
+    assert iterated == len(index)
+    return {
+        "python": sys.version.split()[0],
+        "routes": len(index),
+        "lookups": len(paths),
+        "hits": sum(match is not None for match in matches),
+        "build_s": round(build_time, 4),
+        "match_us": round(match_time / len(paths) * 1e6, 3),
+        "longest_prefix_us": round(prefix_time / len(paths) * 1e6, 3),
+        "iterate_s": round(iter_time, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.routes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Sections of the page layout and their content deferred until scrolled to.
+
+The sections are always rendered to the prerendered HTML, so their text is
+there for the visitors and the crawlers before any script runs. Only the
+interactive content of a section, such as the contact form, is deferred into
+a chunk mounted when it approaches the viewport.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import reflex as rx
+
+
+class DeferredSection(rx.Component):
+    """Mount its children once they approach the viewport, on the client only.
+
+    The children are moved to their own module by ``utils.deferred``, which
+    sets ``name`` and ``load``.
+    """
+
+    library = rx.asset("components/deferred_section.js").importable_path
+
+    tag = "DeferredSection"
+
+    # The export name of the compiled module of the children.
+    name: rx.Var[str]
+
+    # A function importing the compiled module of the children.
+    load: rx.Var[Any]
+
+    # How far from the viewport the children start loading, as a CSS margin.
+    root_margin: rx.Var[str]
+
+    # The size reserved for the section until it is rendered, as a
+    # `contain-intrinsic-size` value.
+    intrinsic_size: rx.Var[str]
+
+
+def create_deferred(*children, name, intrinsic_size="auto 40rem"):
+    """Defer interactive content until it approaches the viewport.
+
+    The content is missing from the prerendered HTML, keep the text of the
+    page out of it.
+
+    Args:
+        children: The interactive content.
+        name: The name of the module of the content, unique in the app.
+        intrinsic_size: The size reserved for the content until it is rendered.
+
+    Returns:
+        The placeholder loading the content.
+    """
+    return DeferredSection.create(*children, name=name, intrinsic_size=intrinsic_size)
+
+
+def create_section(*children, id, intrinsic_size=None, **props):
+    """Create a section of the page layout.
+
+    Args:
+        children: The content of the section.
+        id: The id of the section, also the target of the navigation links.
+        intrinsic_size: The size of a section below the fold, whose layout and
+            painting are then skipped while it is off screen.
+        props: The props of the section.
+
+    Returns:
+        The section.
+    """
+    if intrinsic_size is not None:
+        props.setdefault("content_visibility", "auto")
+        props.setdefault("contain_intrinsic_size", intrinsic_size)
+    return rx.box(*children, id=id, **props)
@@ -0,0 +1,167 @@
+"""Memoization of the pure component factories of the pages.
+
+A factory decorated with ``component_factory`` returns the same component for
+the same arguments instead of building a new tree, so a subtree repeated in a
+page, or rebuilt by every compile of a long running process, is built once.
+
+Components passed as arguments are keyed by identity: the children built by
+other memoized factories are already shared, which makes identity a cheap
+structural hash of the subtree. Arguments that can not be hashed bypass the
+cache.
+
+The cached components are shared, so they must not be modified after they are
+returned. ``StyleClassesPlugin`` is the exception: it moves their style to a
+class on the first compile, and keeps the rules of the class for the next
+compiles of the same components, see ``utils/style_classes.py``.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, TypeVar
+
+import reflex as rx
+
+Factory = TypeVar("Factory", bound=Callable[..., rx.Component])
+
+DEFAULT_MAXSIZE = 256
+
+
+class FactoryStats(NamedTuple):
+    """The cache statistics of a factory."""
+
+    hits: int
+    misses: int
+    evictions: int
+    uncacheable: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of cacheable calls served from the cache."""
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+
+class _Identity:
+    """Hash a component by identity, keeping it alive while it is in a key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __hash__(self) -> int:
+        return id(self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Identity) and other.value is self.value
+
+
+def _freeze(value: Any) -> Any:
+    """Get a hashable key for an argument.
+
+    Raises:
+        TypeError: If the argument can not be hashed.
+    """
+    if isinstance(value, rx.Component):
+        return _Identity(value)
+    if isinstance(value, rx.Var):
+        # Comparing Vars builds a new Var instead of a bool.
+        return (rx.Var, value._js_expr, hash(value))
+    if isinstance(value, (list, tuple)):
+        return (type(value), *map(_freeze, value))
+    if isinstance(value, dict):
+        return (dict, *sorted((key, _freeze(item)) for key, item in value.items()))
+    hash(value)
+    return value
+
+
+class _FactoryCache:
+    """A bounded LRU cache of the components built by a factory."""
+
+    __slots__ = ("entries", "maxsize", "hits", "misses", "evictions", "uncacheable")
+
+    def __init__(self, maxsize: int):
+        self.entries: OrderedDict[Any, rx.Component] = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+    def get(self, factory: Callable[..., rx.Component], args: tuple, kwargs: dict):
+        try:
+            key = (_freeze(args), _freeze(kwargs))
+        except TypeError:
+            self.uncacheable += 1
+            return factory(*args, **kwargs)
+
+        component = self.entries.get(key)
+        if component is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return component
+
+        self.misses += 1
+        component = self.entries[key] = factory(*args, **kwargs)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return component
+
+    def stats(self) -> FactoryStats:
+        return FactoryStats(
+            self.hits,
+            self.misses,
+            self.evictions,
+            self.uncacheable,
+            len(self.entries),
+            self.maxsize,
+        )
+
+
+# The cache of every memoized factory, keyed by its qualified name.
+_caches: dict[str, _FactoryCache] = {}
+
+
+def component_factory(
+    factory: Factory | None = None, /, *, maxsize: int = DEFAULT_MAXSIZE
+) -> Factory | Callable[[Factory], Factory]:
+    """Memoize a pure component factory on its arguments.
+
+    Args:
+        factory: The factory, when used as a bare decorator.
+        maxsize: The number of components kept, the least recently used one
+            being evicted first.
+
+    Returns:
+        The memoized factory, or a decorator when called with options only.
+    """
+
+    def decorator(factory: Factory) -> Factory:
+        cache = _caches[f"{factory.__module__}.{factory.__qualname__}"] = _FactoryCache(
+            maxsize
+        )
+
+        @functools.wraps(factory)
+        def wrapper(*args, **kwargs):
+            return cache.get(factory, args, kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator(factory) if factory is not None else decorator
+
+
+def factory_stats() -> dict[str, FactoryStats]:
+    """Get the cache statistics of every memoized factory.
+
+    Returns:
+        The statistics of each factory, keyed by its qualified name.
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_factories():
+    """Empty the caches and reset their statistics, e.g. when the content changed."""
+    for cache in _caches.values():
+        cache.__init__(cache.maxsize)
@@ -1,6 +1,19 @@
 import reflex as rx
 
-
+from portofolio_reflex import content, styles
+from portofolio_reflex.contact import ContactState
+from portofolio_reflex.components.deferred import create_deferred, create_section
+from portofolio_reflex.components.factory import component_factory
+from portofolio_reflex.templates.template import routes
+from utils.fonts import font_stack
+from utils.icons import icon_href
+from utils.images import load_manifest as load_image_manifest
+from utils.images import src_set
+from utils.lazy_socket import WARMUP_ATTRIBUTE
+from utils.sitemap import navigation_links
+
+
+@component_factory
 def create_hover_link(href, text):
     """Create a link element with hover effect and custom color."""
     return rx.el.a(
@@ -11,6 +24,7 @@ def create_hover_link(href, text):
     )
 
 
+@component_factory
 def create_h2_heading(font_size, line_height, margin_bottom, text):
     """Create an h2 heading with custom font size, line height, and margin."""
     return rx.heading(
@@ -23,6 +37,7 @@ def create_h2_heading(font_size, line_height, margin_bottom, text):
     )
 
 
+@component_factory
 def create_h3_heading(font_size, line_height, margin_bottom, text):
     """Create an h3 heading with custom font size, line height, and margin."""
     return rx.heading(
@@ -35,21 +50,35 @@ def create_h3_heading(font_size, line_height, margin_bottom, text):
     )
 
 
+@component_factory
+def create_sprite_icon(tag, height, width, **props):
+    """Create an icon referencing its symbol in the icon sprite."""
+    return rx.el.svg(
+        rx.el.svg.use(href=icon_href(tag)),
+        aria_hidden="true",
+        style={"height": height, "width": width},
+        **props,
+    )
+
+
+@component_factory
 def create_icon(tag):
     """Create an icon with specified tag and default styling."""
-    return rx.icon(
-        tag=tag,
+    return create_sprite_icon(
+        tag,
         height="1.5rem",
         margin_right="0.5rem",
         width="1.5rem",
     )
 
 
+@component_factory
 def create_text_span(text):
     """Create a text span element."""
     return rx.text.span(text)
 
 
+@component_factory
 def create_icon_with_text(icon_tag, text):
     """Create a flex container with an icon and text."""
     return rx.flex(
@@ -60,6 +89,7 @@ def create_icon_with_text(icon_tag, text):
     )
 
 
+@component_factory
 def create_icon_link(href, icon_tag, text):
     """Create a link with an icon and text, opening in a new tab."""
     return rx.el.a(
@@ -73,6 +103,7 @@ def create_icon_link(href, icon_tag, text):
     )
 
 
+@component_factory
 def create_image(alt, height, src, width):
     """Create an image element with specified attributes."""
     return rx.image(
@@ -84,6 +115,32 @@ def create_image(alt, height, src, width):
     )
 
 
+@component_factory
+def create_responsive_image(alt, src, sizes, loading="lazy", **props):
+    """Create an image serving the AVIF and WebP variants of a local photo."""
+    image = load_image_manifest().get(src)
+    if image is None:
+        return rx.image(alt=alt, src=src, loading=loading, decoding="async", **props)
+    return rx.el.picture(
+        *(
+            rx.el.source(type=f"image/{fmt}", src_set=src_set(variants), sizes=sizes)
+            for fmt, variants in image["sources"].items()
+        ),
+        rx.image(
+            alt=alt,
+            src=src,
+            loading=loading,
+            decoding="async",
+            custom_attrs={"width": image["width"], "height": image["height"]},
+            background_image=f"url({image['placeholder']})",
+            background_size="cover",
+            **props,
+        ),
+        display="contents",
+    )
+
+
+@component_factory
 def create_h3_title(text):
     """Create an h3 title with predefined styling."""
     return rx.heading(
@@ -95,6 +152,7 @@ def create_h3_title(text):
     )
 
 
+@component_factory
 def create_image_with_title(image_alt, image_src, title_text):
     """Create a flex container with an image and a title."""
     return rx.flex(
@@ -111,6 +169,7 @@ def create_image_with_title(image_alt, image_src, title_text):
     )
 
 
+@component_factory
 def create_body_text(text):
     """Create a paragraph of body text with predefined styling."""
     return rx.text(
@@ -122,18 +181,17 @@ def create_body_text(text):
     )
 
 
+@component_factory
 def create_list_item(text):
     """Create a list item element."""
     return rx.el.li(text)
 
 
-def create_bullet_list(item1, item2, item3, item4):
-    """Create a bullet list with four items."""
+@component_factory
+def create_bullet_list(items):
+    """Create a bullet list with one item per text."""
     return rx.list(
-        create_list_item(text=item1),
-        create_list_item(text=item2),
-        create_list_item(text=item3),
-        create_list_item(text=item4),
+        *[create_list_item(text=item) for item in items],
         list_style_type="disc",
         list_style_position="inside",
         font_size="1.125rem",
@@ -141,6 +199,7 @@ def create_bullet_list(item1, item2, item3, item4):
     )
 
 
+@component_factory
 def create_logo_image(alt, src):
     """Create a logo image with predefined styling."""
     return rx.image(
@@ -152,11 +211,13 @@ def create_logo_image(alt, src):
     )
 
 
+@component_factory
 def create_h4_title(text):
     """Create an h4 title with predefined styling."""
     return rx.heading(text, font_weight="600", as_="h4", size="3")
 
 
+@component_factory
 def create_skill_card(logo_alt, logo_src, skill_name):
     """Create a skill card with a logo and skill name."""
     return rx.flex(
@@ -168,15 +229,17 @@ def create_skill_card(logo_alt, logo_src, skill_name):
         align_items="center",
         padding="1rem",
         border_radius="0.25rem",
-        box_shadow="0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06)",
+        box_shadow=styles.card_box_shadow,
     )
 
 
+@component_factory
 def create_description_text(text):
     """Create a description text with predefined styling."""
     return rx.text(text, margin_bottom="1rem")
 
 
+@component_factory
 def create_tag(text):
     """Create a tag element with predefined styling."""
     return rx.text.span(
@@ -194,22 +257,23 @@ def create_tag(text):
     )
 
 
-def create_tag_group(tag1, tag2, tag3):
-    """Create a group of three tags."""
+@component_factory
+def create_tag_group(tags):
+    """Create a group of tags."""
     return rx.flex(
-        create_tag(text=tag1),
-        create_tag(text=tag2),
-        create_tag(text=tag3),
+        *[create_tag(text=tag) for tag in tags],
         display="flex",
         column_gap="0.5rem",
     )
 
 
+@component_factory
 def create_subtext(text):
     """Create a subtext element with predefined styling."""
     return rx.text(text, color="#4B5563")
 
 
+@component_factory
 def create_title_with_subtext(title, subtext):
     """Create a box with a title and subtext."""
     return rx.box(
@@ -223,6 +287,7 @@ def create_title_with_subtext(title, subtext):
     )
 
 
+@component_factory
 def create_certification_card(logo_alt, logo_src, title, description):
     """Create a certification card with logo, title, and description."""
     return rx.flex(
@@ -238,10 +303,11 @@ def create_certification_card(logo_alt, logo_src, title, description):
         align_items="center",
         padding="1.5rem",
         border_radius="0.25rem",
-        box_shadow="0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06)",
+        box_shadow=styles.card_box_shadow,
     )
 
 
+@component_factory
 def create_form_label(text):
     """Create a form label with predefined styling."""
     return rx.el.label(
@@ -253,6 +319,7 @@ def create_form_label(text):
     )
 
 
+@component_factory
 def create_form_input(id, name, type):
     """Create a form input field with predefined styling."""
     return rx.el.input(
@@ -262,11 +329,7 @@ def create_form_input(id, name, type):
         type=type,
         border_width="1px",
         border_color="#D1D5DB",
-        _focus={
-            "outline-style": "none",
-            "box-shadow": "var(--tw-ring-inset) 0 0 0 calc(2px + var(--tw-ring-offset-width)) var(--tw-ring-color)",
-            "--ring-color": "#6366F1",
-        },
+        _focus=styles.focus_ring,
         padding_left="0.75rem",
         padding_right="0.75rem",
         padding_top="0.5rem",
@@ -276,6 +339,7 @@ def create_form_input(id, name, type):
     )
 
 
+@component_factory
 def create_form_field(label, input_id, input_name, input_type):
     """Create a form field with label and input."""
     return rx.box(
@@ -285,11 +349,13 @@ def create_form_field(label, input_id, input_name, input_type):
     )
 
 
+@component_factory
 def create_small_icon(tag):
     """Create a small icon with specified tag."""
-    return rx.icon(tag=tag, height="1.5rem", width="1.5rem")
+    return create_sprite_icon(tag, height="1.5rem", width="1.5rem")
 
 
+@component_factory
 def create_social_link(href, icon_tag):
     """Create a social media link with an icon."""
     return rx.el.a(
@@ -301,12 +367,15 @@ def create_social_link(href, icon_tag):
     )
 
 
+@component_factory
 def create_profile_header():
     """Create the profile header with name and image."""
     return rx.flex(
-        rx.image(
+        create_responsive_image(
             alt="Mehdi Leqsiouer profile picture",
             src="/photo_mehdi.jpg",
+            sizes="3rem",
+            loading="eager",
             height="3rem",
             margin_right="1rem",
             border_radius="9999px",
@@ -325,33 +394,18 @@ def create_profile_header():
     )
 
 
-def create_navigation_bar():
+@component_factory
+def create_navigation_bar(links):
     """Create the navigation bar with profile and links."""
     return rx.flex(
         create_profile_header(),
         rx.flex(
-            create_hover_link(href="#about", text="About"),
-            create_hover_link(href="#experience", text="Experience"),
-            create_hover_link(href="#skills", text="Skills"),
-            create_hover_link(href="#projects", text="Projects"),
-            create_hover_link(
-                href="#certifications",
-                text="Certifications",
-            ),
-            create_hover_link(href="#contact", text="Contact"),
+            *[create_hover_link(href=href, text=text) for href, text in links],
             display="flex",
             column_gap="1rem",
         ),
         width="100%",
-        style=rx.breakpoints(
-            {
-                "640px": {"max-width": "640px"},
-                "768px": {"max-width": "768px"},
-                "1024px": {"max-width": "1024px"},
-                "1280px": {"max-width": "1280px"},
-                "1536px": {"max-width": "1536px"},
-            }
-        ),
+        style=styles.container_max_width,
         display="flex",
         align_items="center",
         justify_content="space-between",
@@ -364,6 +418,7 @@ def create_navigation_bar():
     )
 
 
+@component_factory
 def create_contact_button():
     """Create a 'Get in Touch' button."""
     return rx.el.a(
@@ -384,6 +439,7 @@ def create_contact_button():
     )
 
 
+@component_factory
 def create_hero_section():
     """Create the hero section with title, subtitle, and button."""
     return rx.box(
@@ -408,15 +464,7 @@ def create_hero_section():
         ),
         create_contact_button(),
         width="100%",
-        style=rx.breakpoints(
-            {
-                "640px": {"max-width": "640px"},
-                "768px": {"max-width": "768px"},
-                "1024px": {"max-width": "1024px"},
-                "1280px": {"max-width": "1280px"},
-                "1536px": {"max-width": "1536px"},
-            }
-        ),
+        style=styles.container_max_width,
         margin_left="auto",
         margin_right="auto",
         padding_left="1.5rem",
@@ -425,15 +473,18 @@ def create_hero_section():
     )
 
 
+@component_factory
 def create_about_content():
     """Create the content for the About Me section."""
     return rx.flex(
-        rx.image(
+        create_responsive_image(
             alt="Mehdi Leqsiouer working on a laptop",
             src="/photo_mehdi.jpg",
+            sizes="(min-width: 1536px) 30rem, 33vw",
             margin_right="1.5rem",
             border_radius="0.5rem",
             width="33.333333%",
+            height="auto",
         ),
         rx.text(
             "Hello! I'm Mehdi Leqsiouer, a Data Engineer at Orange based in Paris. With a robust background in both data science and data engineering acquired through diverse experiences, I specialize in implementing best practices in DevOps and MLOps to successfully drive various data projects.",
@@ -446,9 +497,10 @@ def create_about_content():
     )
 
 
+@component_factory
 def create_about_section():
     """Create the About Me section with title and content."""
-    return rx.box(
+    return create_section(
         create_h2_heading(
             font_size="1.875rem",
             line_height="2.25rem",
@@ -479,92 +531,59 @@ def create_about_section():
     )
 
 
+@component_factory
+def create_experience(experience):
+    """Create a position of the work experience."""
+    return rx.box(
+        create_image_with_title(
+            image_alt=experience.logo_alt,
+            image_src=experience.logo,
+            title_text=experience.title,
+        ),
+        create_body_text(text=f"{experience.company} | {experience.period}"),
+        create_bullet_list(items=experience.highlights),
+    )
+
+
+@component_factory
+def create_experience_list(experiences):
+    """Create the positions of the work experience, spaced out."""
+    return rx.box(
+        *[create_experience(experience) for experience in experiences],
+        display="flex",
+        flex_direction="column",
+        row_gap="2rem",
+    )
+
+
 def create_experience_section():
     """Create the Work Experience section with job details."""
-    return rx.box(
+    return create_section(
         create_h2_heading(
             font_size="1.875rem",
             line_height="2.25rem",
             margin_bottom="1.5rem",
             text="Work Experience",
         ),
-        rx.box(
-            create_image_with_title(
-                image_alt="Orange Logo",
-                image_src="/orange_logo",
-                title_text="Data Engineer",
-            ),
-            create_body_text(text="Orange S.A | January 2024 - Present"),
-            create_bullet_list(
-                item1="Designed and implemented scalable data pipelines using Apache Spark and Airflow",
-                item2="Optimized data warehouse performance, reducing query times by 40%",
-                item3="Led the migration of on-premises data infrastructure to AWS cloud services",
-                item4="Collaborated with data science teams to productionize machine learning models",
-            ),
-            margin_bottom="2rem",
-        ),
-        rx.box(
-            create_image_with_title(
-                image_alt="DataSolutions Co. logo",
-                image_src="https://replicate.delivery/xezq/cyuPSoHeSZxqFy9LhQIsoLuIRGefp0jxBRhGffYGlAPhNVEeE/out-0.webp",
-                title_text="Data Engineer",
-            ),
-            create_body_text(text="DataSolutions Co. | 2015 - 2018"),
-            create_bullet_list(
-                item1="Developed and maintained ETL processes using Python and SQL",
-                item2="Implemented data quality checks and monitoring systems",
-                item3="Assisted in the design of data models for various business domains",
-                item4="Provided technical support and documentation for data-related projects",
-            ),
-        ),
+        create_experience_list(content.load("experience")),
         id="experience",
+        intrinsic_size="auto 40rem",
         margin_bottom="5rem",
     )
 
 
-def create_skills_grid():
+@component_factory
+def create_skills_grid(skills):
     """Create a grid of skill cards."""
     return rx.box(
-        create_skill_card(
-            logo_alt="Python logo",
-            logo_src="https://replicate.delivery/xezq/MGql59oK6f3CGK3mF3AHcNuSSc8GRlvmRv6G6ZkGK7J2UR4JA/out-0.webp",
-            skill_name="Python",
-        ),
-        create_skill_card(
-            logo_alt="SQL logo",
-            logo_src="https://replicate.delivery/xezq/vdyaYiTKR5JGNZasgMn0QG1NBvjYpzJdrc2hEhTbxRxaqI8E/out-0.webp",
-            skill_name="SQL",
-        ),
-        create_skill_card(
-            logo_alt="Apache Spark logo",
-            logo_src="https://replicate.delivery/xezq/Yxspvat9D6q7C53tOqmqYqBCKJOLPfCbBpjJnMgD1mZ2UR4JA/out-0.webp",
-            skill_name="Apache Spark",
-        ),
-        create_skill_card(
-            logo_alt="Airflow logo",
-            logo_src="https://replicate.delivery/xezq/L2g2ExpagBoEHlrggh749kg0ru9wrv3R8egTde9SSjfZTFhnA/out-0.webp",
-            skill_name="Airflow",
-        ),
-        create_skill_card(
-            logo_alt="AWS logo",
-            logo_src="https://replicate.delivery/xezq/uZqUULFfWfgprUMnel64P77lTonLWyH7hWfCiBWQIffMbqI8E/out-0.webp",
-            skill_name="AWS",
-        ),
-        create_skill_card(
-            logo_alt="Hadoop logo",
-            logo_src="https://replicate.delivery/xezq/22flquQ8Ax3JOSilf53oMDRHehhrO5XBcjosQnihOovXTFhnA/out-0.webp",
-            skill_name="Hadoop",
-        ),
-        create_skill_card(
-            logo_alt="Kafka logo",
-            logo_src="https://replicate.delivery/xezq/kxRSvs6HEhLgLdxyexucyj11xQ3SHIstjKqLdnI1cQT2UR4JA/out-0.webp",
-            skill_name="Kafka",
-        ),
-        create_skill_card(
-            logo_alt="Docker logo",
-            logo_src="https://replicate.delivery/xezq/qHBUfz2CMiQtPSJY8DTZJuDOfa0b3leTaQ11uO1IEvfxmKCPB/out-0.webp",
-            skill_name="Docker",
-        ),
+        *[
+            create_skill_card(
+                logo_alt=skill.logo_alt,
+                logo_src=skill.logo,
+                skill_name=skill.name,
+            )
+            for skill in skills
+        ],
         gap="1rem",
         display="grid",
         grid_template_columns=rx.breakpoints(
@@ -576,41 +595,54 @@ def create_skills_grid():
     )
 
 
-def create_projects_grid():
-    """Create a grid of featured projects."""
+@component_factory
+def create_project_card(project):
+    """Create a project card with its title, description and tags."""
     return rx.box(
-        rx.box(
-            create_h3_heading(
-                font_size="1.25rem",
-                line_height="1.75rem",
-                margin_bottom="1rem",
-                text="Real-time Data Processing Pipeline",
-            ),
-            create_description_text(
-                text="Developed a high-throughput, fault-tolerant data processing pipeline using Apache Kafka and Spark Streaming, capable of handling millions of events per second."
-            ),
-            create_tag_group(tag1="Kafka", tag2="Spark", tag3="AWS"),
-            background_color="#ffffff",
-            padding="1.5rem",
-            border_radius="0.25rem",
-            box_shadow="0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06)",
+        create_h3_heading(
+            font_size="1.25rem",
+            line_height="1.75rem",
+            margin_bottom="1rem",
+            text=project.title,
         ),
-        rx.box(
-            create_h3_heading(
-                font_size="1.25rem",
-                line_height="1.75rem",
-                margin_bottom="1rem",
-                text="Data Warehouse Optimization",
-            ),
-            create_description_text(
-                text="Redesigned and optimized a large-scale data warehouse, resulting in a 60% reduction in storage costs and 40% improvement in query performance."
-            ),
-            create_tag_group(tag1="SQL", tag2="Redshift", tag3="Python"),
-            background_color="#ffffff",
-            padding="1.5rem",
-            border_radius="0.25rem",
-            box_shadow="0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06)",
+        create_description_text(text=project.description),
+        create_tag_group(tags=project.tags),
+        background_color="#ffffff",
+        padding="1.5rem",
+        border_radius="0.25rem",
+        box_shadow=styles.card_box_shadow,
+    )
+
+
+@component_factory
+def create_projects_grid(projects):
+    """Create a grid of featured projects."""
+    return rx.box(
+        *[create_project_card(project) for project in projects],
+        gap="2rem",
+        display="grid",
+        grid_template_columns=rx.breakpoints(
+            {
+                "0px": "repeat(1, minmax(0, 1fr))",
+                "768px": "repeat(2, minmax(0, 1fr))",
+            }
         ),
+    )
+
+
+@component_factory
+def create_certifications_grid(certifications):
+    """Create a grid of certification cards."""
+    return rx.box(
+        *[
+            create_certification_card(
+                logo_alt=certification.logo_alt,
+                logo_src=certification.logo,
+                title=certification.title,
+                description=certification.description,
+            )
+            for certification in certifications
+        ],
         gap="2rem",
         display="grid",
         grid_template_columns=rx.breakpoints(
@@ -622,6 +654,7 @@ def create_projects_grid():
     )
 
 
+@component_factory
 def create_message_textarea():
     """Create a textarea for message input in the contact form."""
     return rx.el.textarea(
@@ -631,11 +664,7 @@ def create_message_textarea():
         rows="4",
         border_width="1px",
         border_color="#D1D5DB",
-        _focus={
-            "outline-style": "none",
-            "box-shadow": "var(--tw-ring-inset) 0 0 0 calc(2px + var(--tw-ring-offset-width)) var(--tw-ring-color)",
-            "--ring-color": "#6366F1",
-        },
+        _focus=styles.focus_ring,
         padding_left="0.75rem",
         padding_right="0.75rem",
         padding_top="0.5rem",
@@ -645,6 +674,7 @@ def create_message_textarea():
     )
 
 
+@component_factory
 def create_submit_button():
     """Create a submit button for the contact form."""
     return rx.el.button(
@@ -664,6 +694,20 @@ def create_submit_button():
     )
 
 
+@component_factory
+def create_form_status():
+    """Create the message telling whether the contact form was sent."""
+    return rx.cond(
+        ContactState.status,
+        rx.cond(
+            ContactState.sent,
+            rx.text(ContactState.status, color="#047857", margin_top="1rem"),
+            rx.text(ContactState.status, color="#B91C1C", margin_top="1rem"),
+        ),
+    )
+
+
+@component_factory
 def create_contact_form():
     """Create the contact form with input fields and submit button."""
     return rx.form(
@@ -685,10 +729,14 @@ def create_contact_form():
             margin_bottom="1rem",
         ),
         create_submit_button(),
+        rx.box(create_form_status(), role="status"),
+        on_submit=ContactState.submit,
+        # Connect to the backend as soon as the visitor starts filling the form.
+        custom_attrs={WARMUP_ATTRIBUTE: ""},
         background_color="#ffffff",
         padding="1.5rem",
         border_radius="0.25rem",
-        box_shadow="0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06)",
+        box_shadow=styles.card_box_shadow,
     )
 
 
@@ -697,81 +745,59 @@ def create_main_content():
     return rx.box(
         create_about_section(),
         create_experience_section(),
-        rx.box(
+        create_section(
             create_h2_heading(
                 font_size="1.875rem",
                 line_height="2.25rem",
                 margin_bottom="1.5rem",
                 text="Skills",
             ),
-            create_skills_grid(),
+            create_skills_grid(content.load("skills")),
             id="skills",
+            intrinsic_size="auto 40rem",
             margin_bottom="5rem",
         ),
-        rx.box(
+        create_section(
             create_h2_heading(
                 font_size="1.875rem",
                 line_height="2.25rem",
                 margin_bottom="1.5rem",
                 text="Featured Projects",
             ),
-            create_projects_grid(),
+            create_projects_grid(content.load("projects")),
             id="projects",
+            intrinsic_size="auto 40rem",
             margin_bottom="5rem",
         ),
-        rx.box(
+        create_section(
             create_h2_heading(
                 font_size="1.875rem",
                 line_height="2.25rem",
                 margin_bottom="1.5rem",
                 text="Certifications & Achievements",
             ),
-            rx.box(
-                create_certification_card(
-                    logo_alt="AWS Certified Data Analytics - Specialty",
-                    logo_src="https://replicate.delivery/xezq/ySvDDTmaHT7mApzoVrhADOve4DGqtIMeUM7SMuxAafQYTFhnA/out-0.webp",
-                    title="AWS Certified Data Analytics - Specialty",
-                    description="Issued by Amazon Web Services, 2022",
-                ),
-                create_certification_card(
-                    logo_alt="Databricks Certified Associate Developer for Apache Spark",
-                    logo_src="https://replicate.delivery/xezq/Zmhgh0mWKDbLEdX17bHQ71sR8XAy4O3CzBFpV1rwCnIbqI8E/out-0.webp",
-                    title="Databricks Certified Associate Developer for Apache Spark",
-                    description="Issued by Databricks, 2021",
-                ),
-                gap="2rem",
-                display="grid",
-                grid_template_columns=rx.breakpoints(
-                    {
-                        "0px": "repeat(1, minmax(0, 1fr))",
-                        "768px": "repeat(2, minmax(0, 1fr))",
-                    }
-                ),
-            ),
+            create_certifications_grid(content.load("certifications")),
             id="certifications",
+            intrinsic_size="auto 40rem",
             margin_bottom="5rem",
         ),
-        rx.box(
+        create_section(
             create_h2_heading(
                 font_size="1.875rem",
                 line_height="2.25rem",
                 margin_bottom="1.5rem",
                 text="Get in Touch",
             ),
-            create_contact_form(),
+            # Only the form is deferred, with the state and the event socket it needs.
+            create_deferred(
+                create_contact_form(), name="contact_form", intrinsic_size="auto 32rem"
+            ),
             id="contact",
+            intrinsic_size="auto 40rem",
             margin_bottom="5rem",
         ),
         width="100%",
-        style=rx.breakpoints(
-            {
-                "640px": {"max-width": "640px"},
-                "768px": {"max-width": "768px"},
-                "1024px": {"max-width": "1024px"},
-                "1280px": {"max-width": "1280px"},
-                "1536px": {"max-width": "1536px"},
-            }
-        ),
+        style=styles.container_max_width,
         margin_left="auto",
         margin_right="auto",
         padding_left="1.5rem",
@@ -781,6 +807,7 @@ def create_main_content():
     )
 
 
+@component_factory
 def create_social_links():
     """Create social media links for the footer."""
     return rx.flex(
@@ -804,21 +831,14 @@ def create_social_links():
     )
 
 
+@component_factory
 def create_footer():
     """Create the footer with copyright and social links."""
     return rx.box(
         rx.text("© 2024 Mehdi Leqsiouer. All rights reserved."),
         create_social_links(),
         width="100%",
-        style=rx.breakpoints(
-            {
-                "640px": {"max-width": "640px"},
-                "768px": {"max-width": "768px"},
-                "1024px": {"max-width": "1024px"},
-                "1280px": {"max-width": "1280px"},
-                "1536px": {"max-width": "1536px"},
-            }
-        ),
+        style=styles.container_max_width,
         margin_left="auto",
         margin_right="auto",
         padding_left="1.5rem",
@@ -831,7 +851,7 @@ def create_page_layout():
     """Create the overall page layout including header, content, and footer."""
     return rx.box(
         rx.box(
-            create_navigation_bar(),
+            create_navigation_bar(navigation_links(routes, "/")),
             background_color="#ffffff",
             box_shadow="0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06)",
         ),
@@ -851,7 +871,7 @@ def create_page_layout():
             color="#ffffff",
         ),
         class_name="bg-gradient-to-br from-blue-100 to-pink-200 via-purple-100",
-        font_family='system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"',
+        font_family=font_stack(),
         color="#1F2937",
     )
 
@@ -859,18 +879,5 @@ def create_page_layout():
 def create_portfolio_page():
     """Create the main portfolio page with all components."""
     return rx.fragment(
-        rx.script(src="https://cdn.tailwindcss.com"),
-        rx.el.link(
-            href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap",
-            rel="stylesheet",
-        ),
-        rx.el.style(
-            """
-        @font-face {
-            font-family: 'LucideIcons';
-            src: url(https://unpkg.com/lucide-static@latest/font/Lucide.ttf) format('truetype');
-        }
-    """
-        ),
         create_page_layout(),
     )
@@ -0,0 +1,334 @@
+"""Receive the messages of the contact form and store them in SQLite.
+
+The submit handler only validates a message and puts it in a bounded queue,
+so it answers as soon as the message is accepted. A background task drains
+the queue and writes the messages by batches in a worker thread, with the
+database in WAL mode, so a burst of submissions never blocks the event loop
+serving the other visitors. When the queue is full, new messages are refused
+after a short wait instead of growing the memory without bound. A batch whose
+write fails is retried a few times, then counted as failed and logged, so no
+message is lost silently.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import reflex as rx
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(os.environ.get("CONTACT_DB_PATH", ".data/contact.sqlite3"))
+
+# Upper bound of the length of each field, in characters.
+MAX_LENGTHS = {"name": 100, "email": 254, "message": 5000}
+
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    message TEXT NOT NULL,
+    received_at REAL NOT NULL
+)
+"""
+
+INSERT = (
+    "INSERT INTO submissions (name, email, message, received_at) VALUES (?, ?, ?, ?)"
+)
+
+
+class ContactError(ValueError):
+    """A message that can not be accepted, explained to the visitor."""
+
+
+class QueueFullError(ContactError):
+    """The queue stayed full for longer than the submit timeout."""
+
+
+@dataclass(frozen=True, slots=True)
+class Submission:
+    """A message sent through the contact form."""
+
+    name: str
+    email: str
+    message: str
+    received_at: float
+
+
+class SubmissionStats(NamedTuple):
+    """The counters of a submission queue."""
+
+    queued: int
+    accepted: int
+    rejected: int
+    written: int
+    failed: int
+    batches: int
+
+
+def validate(form_data: dict) -> Submission:
+    """Build a submission from the fields of the contact form.
+
+    Args:
+        form_data: The fields of the form, by name.
+
+    Returns:
+        The submission, with its fields stripped.
+
+    Raises:
+        ContactError: If a field is missing, too long or malformed.
+    """
+    fields = {}
+    for name, max_length in MAX_LENGTHS.items():
+        value = form_data.get(name)
+        value = value.strip() if isinstance(value, str) else ""
+        if not value:
+            raise ContactError(f"Please fill in the {name} field.")
+        if len(value) > max_length:
+            raise ContactError(f"The {name} is limited to {max_length} characters.")
+        fields[name] = value
+    if not EMAIL_PATTERN.fullmatch(fields["email"]):
+        raise ContactError("Please enter a valid email address.")
+    return Submission(**fields, received_at=time.time())
+
+
+class SubmissionQueue:
+    """A bounded queue of submissions, written to SQLite by a background task."""
+
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        *,
+        maxsize: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        submit_timeout: float = 0.1,
+        retries: int = 3,
+        retry_delay: float = 1.0,
+    ):
+        """Create an idle queue, started by the first submission.
+
+        Args:
+            db_path: The SQLite database the submissions are written to.
+            maxsize: The number of submissions waiting to be written.
+            batch_size: The largest number of submissions written at once.
+            flush_interval: How long to wait for a batch to fill, in seconds.
+            submit_timeout: How long a submission waits for room in a full
+                queue before being refused, in seconds.
+            retries: How many times a batch is written again after an error
+                before its submissions are counted as failed.
+            retry_delay: How long to wait before the first retry, doubled for
+                each of the next ones, in seconds.
+        """
+        self.db_path = Path(db_path)
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.submit_timeout = submit_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue[Submission] | None = None
+        self._writer: asyncio.Task | None = None
+        self._connection: sqlite3.Connection | None = None
+        self.accepted = self.rejected = self.written = self.failed = self.batches = 0
+
+    def start(self):
+        """Start the writer on the running event loop, if it is not running yet.
+
+        A writer stopped by an error is started again on the same queue, so
+        the submissions waiting in it are still written.
+        """
+        if self._writer is None or self._writer.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(self.maxsize)
+            self._writer = asyncio.get_running_loop().create_task(self._run())
+            self._writer.add_done_callback(self._stopped)
+
+    def _stopped(self, writer: asyncio.Task):
+        """Log the error that stopped the writer, if it was not cancelled."""
+        if not writer.cancelled() and (error := writer.exception()) is not None:
+            logger.error(
+                "The contact writer stopped, %d messages wait for the next submission to start it again.",
+                self._queue.qsize(),
+                exc_info=error,
+            )
+
+    async def submit(self, submission: Submission):
+        """Queue a submission to be written.
+
+        Args:
+            submission: The validated submission.
+
+        Raises:
+            QueueFullError: If the queue is still full after the submit timeout.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(submission)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(submission), self.submit_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise QueueFullError(
+                    "Too many messages right now, please try again in a minute."
+                ) from None
+        self.accepted += 1
+
+    async def _next_batch(self) -> list[Submission]:
+        """Wait for a submission, then for the batch to fill or the flush interval to end."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Write the queued submissions until cancelled."""
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: list[Submission]):
+        """Write a batch in a worker thread, retrying it after an error."""
+        for attempt in range(self.retries + 1):
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception:
+                # Reopened by the next attempt, in case the error broke it.
+                self._disconnect()
+                if attempt == self.retries:
+                    self.failed += len(batch)
+                    logger.exception(
+                        "Lost %d contact messages, their batch could not be stored.",
+                        len(batch),
+                    )
+                    return
+                delay = self.retry_delay * 2**attempt
+                logger.warning(
+                    "Could not store %d contact messages, retrying in %.1f s.",
+                    len(batch),
+                    delay,
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.written += len(batch)
+                self.batches += 1
+                return
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database in WAL mode, creating it if needed."""
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Only the writer task uses the connection, one batch at a time.
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _disconnect(self):
+        """Close the database, if it is open."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _write(self, batch: list[Submission]):
+        """Insert a batch of submissions in a single transaction."""
+        connection = self._connect()
+        with connection:
+            connection.executemany(INSERT, map(astuple, batch))
+
+    async def drain(self):
+        """Wait until every queued submission has been written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        """Write the queued submissions, then stop the writer."""
+        if self._writer is not None and not self._writer.done():
+            await self.drain()
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+            # Empty, and bound to the event loop that is shutting down.
+            self._queue = None
+        self._writer = None
+        self._disconnect()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self):
+        """Run the writer for the lifetime of the app, flushing it on shutdown."""
+        self.start()
+        try:
+            yield
+        finally:
+            await self.close()
+
+    def stats(self) -> SubmissionStats:
+        """Get the counters of the queue."""
+        return SubmissionStats(
+            self._queue.qsize() if self._queue is not None else 0,
+            self.accepted,
+            self.rejected,
+            self.written,
+            self.failed,
+            self.batches,
+        )
+
+
+submissions = SubmissionQueue()
+
+
+class ContactState(rx.State):
+    """The state of the contact form."""
+
+    # The outcome of the last submission, shown under the form.
+    status: str = ""
+
+    # Whether the last submission was accepted.
+    sent: bool = False
+
+    @rx.event
+    async def submit(self, form_data: dict[str, Any]):
+        """Validate a message and queue it to be stored.
+
+        Args:
+            form_data: The fields of the form, by name.
+        """
+        try:
+            await submissions.submit(validate(form_data))
+        except ContactError as err:
+            self.status, self.sent = str(err), False
+            return
+        self.status, self.sent = "Thank you, your message has been sent.", True
@@ -0,0 +1,197 @@
+"""The content of the portfolio, loaded from the files of ``content/``.
+
+Each section is a list of entries in a JSON, TOML or YAML file, e.g.
+``content/projects.toml``. A file is parsed the first time its section is
+rendered and validated into frozen slotted dataclasses. The entries are then
+cached with the hash of the file content, so a file is only parsed again when
+it changed. Since the entries are hashable, the memoized section factories
+only rebuild the sections whose content changed.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import tomllib
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+CONTENT_DIR = Path("content")
+
+# Supported formats, in order of precedence when a section has several files.
+SUFFIXES = (".toml", ".json", ".yaml", ".yml")
+
+Entry = TypeVar("Entry")
+
+
+class ContentError(ValueError):
+    """A content file that can not be loaded."""
+
+
+@dataclass(frozen=True, slots=True)
+class Experience:
+    """A position in the work experience section."""
+
+    title: str
+    company: str
+    period: str
+    logo: str
+    logo_alt: str
+    highlights: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Skill:
+    """A card of the skills grid."""
+
+    name: str
+    logo: str
+    logo_alt: str
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    """A card of the featured projects."""
+
+    title: str
+    description: str
+    tags: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Certification:
+    """A card of the certifications and achievements."""
+
+    title: str
+    description: str
+    logo: str
+    logo_alt: str
+
+
+# The entry type of each section, named after its file.
+SECTIONS: dict[str, type] = {
+    "experience": Experience,
+    "skills": Skill,
+    "projects": Project,
+    "certifications": Certification,
+}
+
+# The digest of each loaded file with its entries.
+_cache: dict[Path, tuple[str, tuple]] = {}
+
+
+def _parse(path: Path, data: bytes) -> Any:
+    """Parse a content file according to its format."""
+    if path.suffix == ".json":
+        return json.loads(data)
+    if path.suffix == ".toml":
+        return tomllib.loads(data.decode())
+    try:
+        import yaml
+    except ImportError as err:
+        raise ContentError("PyYAML is required to load YAML content.") from err
+    try:
+        return yaml.safe_load(data)
+    except yaml.YAMLError as err:
+        raise ContentError(str(err)) from err
+
+
+def _validate(cls: type[Entry], raw: Any, where: str) -> Entry:
+    """Build an entry from its raw fields.
+
+    Args:
+        cls: The entry type.
+        raw: The parsed fields.
+        where: The location of the entry, for error messages.
+
+    Returns:
+        The entry, with its lists converted to tuples.
+
+    Raises:
+        ContentError: If a field is missing, unknown or has the wrong type.
+    """
+    if not isinstance(raw, dict):
+        raise ContentError(f"{where}: expected a table, got {type(raw).__name__}.")
+    fields = {field.name: field for field in dataclasses.fields(cls)}
+    if unknown := raw.keys() - fields.keys():
+        raise ContentError(f"{where}: unknown fields {', '.join(sorted(unknown))}.")
+
+    hints = typing.get_type_hints(cls)
+    values = {}
+    for name, field in fields.items():
+        if name not in raw:
+            if field.default is dataclasses.MISSING:
+                raise ContentError(f"{where}: missing field {name}.")
+            continue
+        value = raw[name]
+        if hints[name] == tuple[str, ...]:
+            if not isinstance(value, list) or not all(
+                isinstance(item, str) for item in value
+            ):
+                raise ContentError(f"{where}: {name} must be a list of strings.")
+            value = tuple(value)
+        elif not isinstance(value, str):
+            raise ContentError(f"{where}: {name} must be a string.")
+        values[name] = value
+    return cls(**values)
+
+
+def section_path(section: str, content_dir: Path = CONTENT_DIR) -> Path:
+    """Find the content file of a section.
+
+    Args:
+        section: The name of the section.
+        content_dir: The directory of the content files.
+
+    Returns:
+        The first existing file named after the section.
+
+    Raises:
+        ContentError: If the section has no content file.
+    """
+    for suffix in SUFFIXES:
+        path = content_dir / f"{section}{suffix}"
+        if path.is_file():
+            return path
+    raise ContentError(f"No content file for {section} in {content_dir}/.")
+
+
+def load(section: str, content_dir: Path = CONTENT_DIR) -> tuple:
+    """Load the entries of a section, parsing its file only when it changed.
+
+    Args:
+        section: The name of the section, e.g. ``projects``.
+        content_dir: The directory of the content files.
+
+    Returns:
+        The validated entries, the same tuple as long as the file is unchanged.
+
+    Raises:
+        ContentError: If the file is invalid.
+    """
+    path = section_path(section, content_dir)
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    try:
+        raw = _parse(path, data)
+    except ValueError as err:
+        raise ContentError(f"{path}: {err}") from err
+    # TOML can not hold a top level array, entries are listed under the section name.
+    if isinstance(raw, dict):
+        raw = raw.get(section)
+    if not isinstance(raw, list):
+        raise ContentError(f"{path}: expected a list of {section}.")
+
+    cls = SECTIONS[section]
+    entries = tuple(
+        _validate(cls, item, f"{path}[{index}]") for index, item in enumerate(raw)
+    )
+    _cache[path] = (digest, entries)
+    return entries
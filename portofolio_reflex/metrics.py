@@ -0,0 +1,461 @@
+"""Expose what the backend process is doing, in the Prometheus text format.
+
+``MetricsMiddleware`` wraps the backend ASGI app like ``RateLimitMiddleware``.
+It counts the requests of each proxied route by status, and answers
+``GET /metrics`` itself. Caddy does not forward that path, so it is only
+scraped from the host, next to ``/ping`` on the backend port. The event
+handlers are timed by ``TimedEventProcessor``, the processor of the app.
+
+Recording happens on the event loop and only increments counters of plain
+dicts, so nothing takes a lock on the hot path. Everything else (websockets,
+sessions, queue depths, memory, garbage collector) is read by the collectors
+registered in ``registry`` when the endpoint is scraped.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import gc
+import os
+import resource
+import sys
+import time
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, NamedTuple
+
+from reflex_base.event import Event
+from reflex_base.event.context import EventContext
+from reflex_base.event.processor import BaseStateEventProcessor
+from reflex_base.event.processor.future import EventFuture
+from reflex_base.utils.types import ASGIApp, Receive, Scope, Send
+
+from portofolio_reflex.state_manager import installed_state_manager
+
+PATH = "/metrics"
+
+CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+
+# The routes Caddy forwards to the backend, the others are counted as "other".
+ROUTES = ("/_event", "/_upload", "/ping", PATH)
+
+# Upper bound of the series of a histogram, the next values are counted as "other".
+MAX_SERIES = 200
+
+# Upper bounds of the event handler durations, in seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metric(NamedTuple):
+    """A metric family and its samples, by name and labels."""
+
+    name: str
+    type: str
+    help: str
+    samples: list[tuple[str, dict[str, str], float]]
+
+
+class Histogram:
+    """Observations bucketed by upper bound, for each value of a label."""
+
+    def __init__(self, name: str, help: str, label: str, buckets=DURATION_BUCKETS):
+        """Create a histogram without observations.
+
+        Args:
+            name: The name of the metric.
+            help: What the metric measures.
+            label: The label distinguishing the series.
+            buckets: The upper bounds of the buckets, sorted.
+        """
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        # The count of each bucket, then of +Inf, then the sum, by label value.
+        self._series: dict[str, list[float]] = {}
+
+    def observe(self, value: str, amount: float):
+        """Count an observation.
+
+        Args:
+            value: The value of the label, e.g. the event handler.
+            amount: The observed amount, e.g. a duration in seconds.
+        """
+        series = self._series.get(value)
+        if series is None:
+            # The event names come from the visitors, keep their number bounded.
+            if len(self._series) >= MAX_SERIES:
+                value = "other"
+            series = self._series.setdefault(value, [0] * (len(self.buckets) + 2))
+        series[bisect.bisect_left(self.buckets, amount)] += 1
+        series[-1] += amount
+
+    def collect(self) -> Metric:
+        """Get the cumulated buckets, count and sum of each series."""
+        samples = []
+        for value, series in sorted(self._series.items()):
+            cumulated = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series[:-1]):
+                cumulated += count
+                labels = {self.label: value, "le": str(bound)}
+                samples.append((f"{self.name}_bucket", labels, cumulated))
+            samples.append((f"{self.name}_count", {self.label: value}, cumulated))
+            samples.append((f"{self.name}_sum", {self.label: value}, series[-1]))
+        return Metric(self.name, "histogram", self.help, samples)
+
+
+EVENT_DURATION = Histogram(
+    "portfolio_event_duration_seconds",
+    "Time from the reception of an event to the end of its handler.",
+    "handler",
+)
+
+
+class TimedEventProcessor(BaseStateEventProcessor):
+    """An event processor observing how long each event takes in a histogram."""
+
+    def __init__(self, *, durations: Histogram = EVENT_DURATION, **kwargs):
+        """Create the processor.
+
+        Args:
+            durations: The histogram of the event durations, by handler.
+            kwargs: The arguments of the other event processors.
+        """
+        super().__init__(**kwargs)
+        self.durations = durations
+
+    async def enqueue(
+        self, token: str, event: Event, ev_ctx: EventContext | None = None
+    ) -> EventFuture:
+        """Enqueue an event, timing it until its handler ends.
+
+        Args:
+            token: The client token associated with the event.
+            event: The event to be enqueued.
+            ev_ctx: The event context to use for this event.
+
+        Returns:
+            The future of the event.
+        """
+        received_at = time.perf_counter()
+        future = await super().enqueue(token, event, ev_ctx)
+        future.add_done_callback(functools.partial(self._done, event.name, received_at))
+        return future
+
+    def _done(self, name: str, received_at: float, future: EventFuture):
+        """Observe the duration of a processed event, not of a refused one."""
+        if not future.cancelled():
+            self.durations.observe(name, time.perf_counter() - received_at)
+
+
+class Registry:
+    """The collectors read when the metrics are scraped."""
+
+    def __init__(self):
+        """Create a registry without collectors."""
+        self.collectors: dict[Hashable, Callable[[], Iterable[Metric]]] = {}
+
+    def register(
+        self, collector: Callable[[], Iterable[Metric]], name: str | None = None
+    ):
+        """Add a collector.
+
+        Args:
+            collector: Returns the current metrics of a component.
+            name: Replaces the collector registered under the same name, in
+                its place, so a component built again (a new app in the
+                tests, a reload in development) does not report its metric
+                families twice, which Prometheus rejects.
+
+        Returns:
+            The collector, so this can be used as a decorator.
+        """
+        self.collectors[collector if name is None else name] = collector
+        return collector
+
+    def render(self) -> str:
+        """Get every metric in the Prometheus text format."""
+        lines = []
+        for collector in self.collectors.values():
+            for metric in collector():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.type}")
+                lines.extend(
+                    f"{name}{format_labels(labels)} {format_value(value)}"
+                    for name, labels, value in metric.samples
+                )
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    """Format the labels of a sample, escaping their values."""
+    if not labels:
+        return ""
+    escaped = (
+        key
+        + '="'
+        + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def format_value(value: float) -> str:
+    """Format the value of a sample, integers without a decimal part."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def gauge(name: str, help: str, value: float) -> Metric:
+    """Build a metric holding a single value that goes up and down."""
+    return Metric(name, "gauge", help, [(name, {}, value)])
+
+
+def counter(name: str, help: str, value: float) -> Metric:
+    """Build a metric holding a single total."""
+    return Metric(name, "counter", help, [(f"{name}_total", {}, value)])
+
+
+registry = Registry()
+registry.register(lambda: [EVENT_DURATION.collect()])
+
+
+def resident_memory() -> int:
+    """Get the resident set size of the process, in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # The peak instead, in kilobytes on Linux and in bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# The counters of `gc.get_stats()`, by metric name.
+GC_COUNTERS = {
+    "python_gc_collections": ("collections", "Collections run, by generation."),
+    "python_gc_objects_collected": ("collected", "Objects collected, by generation."),
+    "python_gc_objects_uncollectable": (
+        "uncollectable",
+        "Uncollectable objects found, by generation.",
+    ),
+}
+
+
+@registry.register
+def process_metrics() -> list[Metric]:
+    """Get the memory and garbage collector statistics of the process."""
+    generations = list(enumerate(gc.get_stats()))
+    metrics = [
+        gauge(
+            "process_resident_memory_bytes",
+            "Resident memory size of the backend process.",
+            resident_memory(),
+        ),
+        Metric(
+            "python_gc_pending_objects",
+            "gauge",
+            "Allocations minus deallocations since the last collection, by generation.",
+            [
+                ("python_gc_pending_objects", {"generation": str(generation)}, count)
+                for generation, count in enumerate(gc.get_count())
+            ],
+        ),
+    ]
+    for name, (key, help) in GC_COUNTERS.items():
+        samples = [
+            (f"{name}_total", {"generation": str(generation)}, stats[key])
+            for generation, stats in generations
+        ]
+        metrics.append(Metric(name, "counter", help, samples))
+    return metrics
+
+
+def app_metrics(app: Any) -> Callable[[], list[Metric]]:
+    """Build the collector of the connections, sessions and queues of the app.
+
+    Args:
+        app: The Reflex app, optionally with a ``BoundedStateManager`` and an
+            ``EventLimiter``.
+
+    Returns:
+        The collector.
+    """
+    from portofolio_reflex.contact import submissions
+
+    def collect() -> list[Metric]:
+        namespace = app.event_namespace
+        metrics = [
+            gauge(
+                "portfolio_websockets",
+                "Connected event websockets.",
+                len(namespace.sid_to_token) if namespace is not None else 0,
+            ),
+        ]
+
+        state_manager = installed_state_manager(app)
+        if hasattr(state_manager, "stats"):
+            store = state_manager.stats()
+            metrics += [
+                gauge(
+                    "portfolio_sessions",
+                    "Sessions whose state is in memory.",
+                    store.entries,
+                ),
+                gauge(
+                    "portfolio_session_bytes",
+                    "Size of the serialized states in memory.",
+                    store.bytes,
+                ),
+                *(
+                    counter(f"portfolio_session_{name}", help, getattr(store, name))
+                    for name, help in (
+                        ("hits", "States found in memory."),
+                        ("disk_hits", "States read back from the disk."),
+                        ("misses", "States created for new sessions."),
+                        ("evictions", "States spilled to the disk."),
+                        ("expirations", "States dropped after the token expiration."),
+                    )
+                ),
+            ]
+
+        if (limiter := getattr(app, "event_limiter", None)) is not None:
+            events = limiter.stats()
+            metrics += [
+                gauge(
+                    "portfolio_events_in_flight",
+                    "Events received from the visitors, queued or being processed.",
+                    events.in_flight,
+                ),
+                Metric(
+                    "portfolio_events_refused",
+                    "counter",
+                    "Events refused by the limiter, by reason.",
+                    [
+                        (
+                            "portfolio_events_refused_total",
+                            {"reason": reason},
+                            getattr(events, reason),
+                        )
+                        for reason in ("rate_limited", "session_busy", "overloaded")
+                    ],
+                ),
+            ]
+
+        contact = submissions.stats()
+        metrics += [
+            gauge(
+                "portfolio_contact_queue_depth",
+                "Contact messages waiting to be written.",
+                contact.queued,
+            ),
+            counter(
+                "portfolio_contact_written",
+                "Contact messages written.",
+                contact.written,
+            ),
+            counter(
+                "portfolio_contact_rejected",
+                "Contact messages refused by the full queue.",
+                contact.rejected,
+            ),
+            counter(
+                "portfolio_contact_failed",
+                "Contact messages lost to database errors.",
+                contact.failed,
+            ),
+        ]
+        return metrics
+
+    return collect
+
+
+def route_of(path: str) -> str:
+    """Get the proxied route of a path, or ``other``."""
+    for route in ROUTES:
+        if path == route or path.startswith(f"{route}/"):
+            return route
+    return "other"
+
+
+class MetricsMiddleware:
+    """Count the requests by route and status, and serve the metrics."""
+
+    def __init__(self, app: ASGIApp, metrics: Registry = registry):
+        """Wrap the backend app.
+
+        Args:
+            app: The backend ASGI app.
+            metrics: The registry rendered by the endpoint.
+        """
+        self.app = app
+        self.registry = metrics
+        self.requests: dict[tuple[str, str, str], int] = {}
+        metrics.register(self.collect, name="requests")
+
+    def collect(self) -> list[Metric]:
+        """Get the request counts."""
+        return [
+            Metric(
+                "portfolio_requests",
+                "counter",
+                "Requests to the backend, by route, type and status.",
+                [
+                    (
+                        "portfolio_requests_total",
+                        {"route": route, "type": type_, "status": status},
+                        count,
+                    )
+                    for (route, type_, status), count in sorted(self.requests.items())
+                ],
+            )
+        ]
+
+    def _count(self, route: str, type_: str, status: int | str):
+        key = (route, type_, str(status))
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Serve the metrics, or count the request once it is answered."""
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        route = route_of(scope["path"])
+        if scope["type"] == "http" and scope["path"] == PATH:
+            body = self.registry.render().encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", CONTENT_TYPE),
+                        (b"content-length", str(len(body)).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            self._count(route, "http", 200)
+            return
+
+        status: int | None = None
+
+        async def send_counting(message):
+            nonlocal status
+            if status is None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                elif message["type"] == "websocket.accept":
+                    # Counted when accepted, the socket may stay open for hours.
+                    status = 101
+                    self._count(route, "websocket", status)
+                elif message["type"] == "websocket.close":
+                    # Closed before being accepted, i.e. refused.
+                    status = 403
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            if scope["type"] == "http" or status != 101:
+                self._count(route, scope["type"], status or 500)
@@ -6,7 +6,20 @@ from portofolio_reflex.components.test import create_portfolio_page
 import reflex as rx
 
 
-@template(route="/", title="Home", image="/reflex.png")
+@template(
+    route="/",
+    title="Home",
+    image="/reflex.png",
+    prerender=True,
+    sections={
+        "about": "About",
+        "experience": "Experience",
+        "skills": "Skills",
+        "projects": "Projects",
+        "certifications": "Certifications",
+        "contact": "Contact",
+    },
+)
 def index() -> rx.Component:
     """The home page.
 
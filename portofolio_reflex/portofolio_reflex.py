@@ -1,11 +1,60 @@
 """Welcome to Reflex!."""
 
+# Imported first to time the imports of the app, see `portofolio_reflex/startup.py`.
+from portofolio_reflex.startup import startup
+
 from portofolio_reflex import styles
+from portofolio_reflex.contact import ContactState, submissions
+from portofolio_reflex.metrics import (
+    MetricsMiddleware,
+    TimedEventProcessor,
+    app_metrics,
+    registry,
+)
+from portofolio_reflex.rate_limit import (
+    EventLimiter,
+    Limit,
+    LimitedEventProcessor,
+    RateLimitedApp,
+    RateLimitMiddleware,
+)
+from portofolio_reflex.state_manager import BoundedStateManager, install_state_manager
 
 # Import all the pages.
 from portofolio_reflex.pages.index import page
 
-import reflex as rx
+from reflex_base.utils.format import format_event_handler
+
+
+class EventProcessor(TimedEventProcessor, LimitedEventProcessor):
+    """Time the events admitted by the limiter."""
+
+
+# Create the app, limiting the traffic of each client, see
+# `portofolio_reflex/rate_limit.py`, and serving its metrics on /metrics, see
+# `portofolio_reflex/metrics.py`.
+app = RateLimitedApp(
+    style=styles.base_style,
+    # The last one wraps the others, so the refused requests are counted too.
+    api_transformer=[RateLimitMiddleware, MetricsMiddleware],
+    event_limiter=EventLimiter(
+        # A few messages in a row, then one every 10 seconds.
+        limits={format_event_handler(ContactState.submit): Limit(0.1, 3)},
+    ),
+    event_processor_class=EventProcessor,
+)
+
+# Keep the session states in a bounded LRU spilling to SQLite instead of the
+# unbounded in-process store, see `portofolio_reflex/state_manager.py`.
+install_state_manager(app, BoundedStateManager())
+
+# Report the websockets, sessions and queues of the app on /metrics.
+registry.register(app_metrics(app), name="app")
+
+# Flush the queued contact messages to SQLite, see `portofolio_reflex/contact.py`.
+app.register_lifespan_task(submissions.lifespan)
 
-# Create the app.
-app = rx.App(style=styles.base_style)
+# Skip evaluating the pages with the artifacts of `python -m utils.backend`,
+# and report how long the startup took.
+startup.loaded()
+app.register_lifespan_task(startup.lifespan)
@@ -0,0 +1,438 @@
+"""Limit the backend traffic of each client and shed it under overload.
+
+Caddy forwards ``/_event``, ``/_upload`` and ``/ping`` to the single backend
+process as is. Two layers keep one client from saturating it:
+
+* ``RateLimitMiddleware`` wraps the backend ASGI app, with a token bucket per
+  client IP and route, answering ``429 Too Many Requests`` (or closing the
+  websocket handshake) once it is empty, and ``503 Service Unavailable`` when
+  too many HTTP requests are already in flight.
+* ``RateLimitedApp`` processes the events received on the websocket through an
+  ``EventLimiter``, with a token bucket per client IP and event name, a cap on
+  the events in flight per session and in total. A refused event is dropped
+  and the visitor gets a toast explaining why.
+
+Every bucket lives in a bounded LRU and is only touched synchronously from
+the event loop, so the limiters need no lock.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import NamedTuple
+
+import reflex as rx
+from reflex.state import StateUpdate
+from reflex_base.event import Event
+from reflex_base.event.context import EventContext
+from reflex_base.event.processor import BaseStateEventProcessor
+from reflex_base.event.processor.future import EventFuture
+from reflex_base.utils.types import ASGIApp, Receive, Scope, Send
+
+
+class Limit(NamedTuple):
+    """A token bucket: ``burst`` requests at once, refilled at ``rate`` per second."""
+
+    rate: float
+    burst: int
+
+
+# Per client IP, by backend route. A visitor opens a single event socket.
+ROUTE_LIMITS = {
+    "/_event": Limit(0.5, 10),
+    "/_upload": Limit(0.2, 5),
+    "/ping": Limit(1, 10),
+}
+
+# Per client IP and event name, unless the event has a limit of its own.
+EVENT_LIMIT = Limit(5, 30)
+
+# At most one toast explaining a refusal per session in that interval.
+NOTICE_LIMIT = Limit(0.2, 1)
+
+# Upper bound of the clients tracked by each limiter.
+DEFAULT_MAX_KEYS = 10_000
+
+# Peers whose X-Forwarded-For header is trusted, i.e. Caddy in the same container.
+TRUSTED_PROXIES = frozenset({"127.0.0.1", "::1"})
+
+
+class RateLimiter:
+    """Token buckets by key, in an LRU dropping the least recently seen keys."""
+
+    def __init__(self, limit: Limit, max_keys: int = DEFAULT_MAX_KEYS):
+        """Create a limiter without any bucket.
+
+        Args:
+            limit: The bucket of each key.
+            max_keys: The number of buckets kept, a dropped bucket is full again.
+        """
+        self.limit = limit
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, key: Hashable, now: float | None = None) -> float:
+        """Take a token from the bucket of a key.
+
+        Args:
+            key: The client, e.g. its IP.
+            now: The current monotonic time, in seconds.
+
+        Returns:
+            0 if a token was taken, else the seconds until one is available.
+        """
+        if now is None:
+            now = time.monotonic()
+        rate, burst = self.limit
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        """Get the number of buckets."""
+        return len(self._buckets)
+
+
+def client_ip(scope: Scope) -> str:
+    """Get the IP of the client of a request, behind Caddy or not.
+
+    Args:
+        scope: The ASGI scope of the request.
+
+    Returns:
+        The first address of X-Forwarded-For when sent by a trusted proxy,
+        else the address of the peer.
+    """
+    peer = (scope.get("client") or ("",))[0]
+    if peer in TRUSTED_PROXIES:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").partition(",")[0].strip()
+    return peer
+
+
+class RateLimitMiddleware:
+    """Limit the requests of each client IP to the backend routes."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limits: dict[str, Limit] = ROUTE_LIMITS,
+        max_in_flight: int = 64,
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ):
+        """Wrap the backend app.
+
+        Args:
+            app: The backend ASGI app.
+            limits: The bucket of each client IP, by route prefix.
+            max_in_flight: The number of HTTP requests processed at once.
+            max_keys: The number of client IPs tracked by route.
+        """
+        self.app = app
+        self.limiters = {
+            route: RateLimiter(limit, max_keys) for route, limit in limits.items()
+        }
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.limited = self.overloaded = 0
+
+    def _route(self, path: str) -> str | None:
+        """Get the limited route of a path, if any."""
+        for route in self.limiters:
+            if path == route or path.startswith(f"{route}/"):
+                return route
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Refuse the request if its client or the backend is over its limit."""
+        if (
+            scope["type"] not in ("http", "websocket")
+            or (route := self._route(scope["path"])) is None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if wait := self.limiters[route].acquire(client_ip(scope)):
+            self.limited += 1
+            await refuse(scope, send, 429, "Too many requests", wait)
+            return
+        if scope["type"] == "websocket":
+            # Long-lived, its events are limited by the EventLimiter.
+            await self.app(scope, receive, send)
+            return
+        if self.in_flight >= self.max_in_flight:
+            self.overloaded += 1
+            await refuse(scope, send, 503, "The server is busy", 1)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+async def refuse(
+    scope: Scope, send: Send, status: int, reason: str, retry_after: float
+):
+    """Answer a refused request without reaching the app.
+
+    Args:
+        scope: The ASGI scope of the request.
+        send: The ASGI send channel.
+        status: The HTTP status.
+        reason: What went wrong, for the client.
+        retry_after: When the client may try again, in seconds.
+    """
+    retry_after = math.ceil(retry_after)
+    if scope["type"] == "websocket":
+        # Closing before accepting the handshake answers it with a 403.
+        await send({"type": "websocket.close", "code": 1013, "reason": reason})
+        return
+    body = f"{reason}, please retry in {retry_after} s.\n".encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class EventLimiterStats(NamedTuple):
+    """The counters of an event limiter."""
+
+    in_flight: int
+    accepted: int
+    rate_limited: int
+    session_busy: int
+    overloaded: int
+
+
+class EventLimiter:
+    """Decide which events received from the visitors are processed."""
+
+    def __init__(
+        self,
+        limit: Limit = EVENT_LIMIT,
+        limits: dict[str, Limit] | None = None,
+        *,
+        max_session_in_flight: int = 4,
+        max_in_flight: int = 256,
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ):
+        """Create a limiter without any event in flight.
+
+        Args:
+            limit: The bucket of each client IP and event name.
+            limits: The buckets of some events, by event name.
+            max_session_in_flight: The number of events of a session processed
+                or waiting to be.
+            max_in_flight: The number of events processed or waiting to be.
+            max_keys: The number of clients tracked by bucket.
+        """
+        self.max_keys = max_keys
+        self.limiter = RateLimiter(limit, max_keys)
+        self.limiters = {
+            name: RateLimiter(event_limit, max_keys)
+            for name, event_limit in (limits or {}).items()
+        }
+        self.notices = RateLimiter(NOTICE_LIMIT, max_keys)
+        self.max_session_in_flight = max_session_in_flight
+        self.max_in_flight = max_in_flight
+        # Only the sessions with events in flight, so bounded by max_in_flight.
+        self._session_in_flight: dict[str, int] = {}
+        self.in_flight = 0
+        self.accepted = self.rate_limited = self.session_busy = self.overloaded = 0
+
+    def admit(self, ip: str, token: str, name: str) -> str | None:
+        """Count an event in flight, unless it must be refused.
+
+        Args:
+            ip: The IP of the client.
+            token: The session of the client.
+            name: The name of the event.
+
+        Returns:
+            None if the event is accepted, else why it is refused, for the visitor.
+        """
+        if self.in_flight >= self.max_in_flight:
+            self.overloaded += 1
+            return "The server is busy, please try again in a moment."
+        session_in_flight = self._session_in_flight.get(token, 0)
+        if session_in_flight >= self.max_session_in_flight:
+            self.session_busy += 1
+            return "Still working on your previous actions, please wait a moment."
+        if wait := self.limiters.get(name, self.limiter).acquire((ip, name)):
+            self.rate_limited += 1
+            return f"Too many requests, please try again in {math.ceil(wait)} s."
+        self._session_in_flight[token] = session_in_flight + 1
+        self.in_flight += 1
+        self.accepted += 1
+        return None
+
+    def release(self, token: str):
+        """Count an accepted event of a session as processed.
+
+        Args:
+            token: The session of the client.
+        """
+        self.in_flight -= 1
+        if (session_in_flight := self._session_in_flight.pop(token, 0) - 1) > 0:
+            self._session_in_flight[token] = session_in_flight
+
+    def should_notify(self, token: str) -> bool:
+        """Whether a session may get another toast about a refused event."""
+        return not self.notices.acquire(token)
+
+    def stats(self) -> EventLimiterStats:
+        """Get the counters of the limiter."""
+        return EventLimiterStats(
+            self.in_flight,
+            self.accepted,
+            self.rate_limited,
+            self.session_busy,
+            self.overloaded,
+        )
+
+
+def _chained() -> bool:
+    """Whether the current code runs in an event handler, chaining events."""
+    try:
+        return bool(EventContext.get().txid)
+    except LookupError:
+        return False
+
+
+class LimitedEventProcessor(BaseStateEventProcessor):
+    """An event processor refusing the events the limiter of its app does not admit."""
+
+    def __init__(self, **kwargs):
+        """Create the processor.
+
+        Args:
+            kwargs: The arguments of ``BaseStateEventProcessor``, whose
+                ``middleware`` is the ``RateLimitedApp``.
+        """
+        super().__init__(**kwargs)
+        self.frontend = None
+
+    @property
+    def limiter(self) -> EventLimiter:
+        """Decides which events received from the visitors are processed."""
+        return self.middleware.event_limiter
+
+    def configure(self, *, state_manager=None, event_namespace=None):
+        """Set up the processor, keeping the namespace to notify the visitors.
+
+        Args:
+            state_manager: The state manager to use for processing events.
+            event_namespace: The event namespace to communicate with the frontend.
+
+        Returns:
+            The event processor instance.
+        """
+        self.frontend = event_namespace
+        return super().configure(
+            state_manager=state_manager, event_namespace=event_namespace
+        )
+
+    async def enqueue(
+        self, token: str, event: Event, ev_ctx: EventContext | None = None
+    ) -> EventFuture:
+        """Enqueue an event, if the limiter admits it when received from a visitor.
+
+        Args:
+            token: The client token associated with the event.
+            event: The event to be enqueued.
+            ev_ctx: The event context to use for this event.
+
+        Returns:
+            The future of the event, already cancelled if it was refused.
+        """
+        # The events chained by the handlers are not limited.
+        limited = ev_ctx is None and not _chained()
+        if limited:
+            ip = event.router_data.get(rx.constants.RouteVar.CLIENT_IP, "")
+            if (refusal := self.limiter.admit(ip, token, event.name)) is not None:
+                await self._notify(token, refusal)
+                future = EventFuture(txid="")
+                future.cancel()
+                return future
+        try:
+            future = await super().enqueue(token, event, ev_ctx)
+        except BaseException:
+            if limited:
+                self.limiter.release(token)
+            raise
+        if limited:
+            future.add_done_callback(functools.partial(self._release, token))
+        return future
+
+    def _release(self, token: str, future: EventFuture):
+        """Release a processed event from the limiter."""
+        self.limiter.release(token)
+
+    async def _notify(self, token: str, message: str):
+        """Explain to a visitor why an event was refused."""
+        if self.frontend is None or not self.limiter.should_notify(token):
+            return
+        await self.frontend.emit_update(
+            update=StateUpdate(events=Event.from_event_type(rx.toast.warning(message))),
+            token=token,
+        )
+
+
+@dataclasses.dataclass
+class RateLimitedApp(rx.App):
+    """An app whose events received from the visitors go through an ``EventLimiter``.
+
+    Reflex has no public way to choose the event processor: a middleware is
+    only called once the event is dequeued, and never after it is processed.
+    ``rx.App`` creates a ``BaseStateEventProcessor`` when the backend starts,
+    so the processor it assigns is replaced by an ``event_processor_class``
+    built from the same arguments, its ``middleware`` being this app.
+    ``tests/integration_tests/test_rate_limit.py`` checks that the events of
+    the app still go through it.
+    """
+
+    event_limiter: EventLimiter = dataclasses.field(default_factory=EventLimiter)
+
+    # The processor of the events, e.g. with other concerns mixed in.
+    event_processor_class: type[LimitedEventProcessor] = LimitedEventProcessor
+
+    def __setattr__(self, name: str, value):
+        # The processor created by `rx.App._setup_event_processor`.
+        if (
+            name == "_event_processor"
+            and value is not None
+            and not isinstance(value, self.event_processor_class)
+        ):
+            value = self.event_processor_class(
+                **{
+                    field.name: getattr(value, field.name)
+                    for field in dataclasses.fields(value)
+                    if field.init
+                }
+            )
+        super().__setattr__(name, value)
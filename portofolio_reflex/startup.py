@@ -0,0 +1,151 @@
+"""Time the startup of the backend and reuse the artifacts prepared at build time.
+
+Before serving, ``reflex run --env prod --backend-only`` evaluates every page
+to find the ones creating state classes, unless ``stateful_pages.json`` from
+a previous run is in ``.web/backend``. The image used to delete it with the
+rest of ``.web``, so every container evaluated the whole page tree again when
+it started. ``python -m utils.backend`` writes it at build time, next to a
+manifest of the routes and a digest of the sources, so the backend only
+evaluates the stateful pages, none for the portfolio.
+
+A manifest not matching the sources, e.g. after editing a page in a mounted
+volume, discards the artifacts, so every page is evaluated again instead of
+serving stale ones.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import importlib.metadata
+import json
+import logging
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+# When the app module started importing, as it imports this module first,
+# which imports Reflex only when needed.
+STARTED = time.perf_counter()
+
+# Under the logger of Reflex, whose handlers print the report at the log level
+# of `reflex run`, while the loggers of the app only print warnings.
+logger = logging.getLogger("reflex").getChild(__name__)
+
+# The files whose changes invalidate the artifacts.
+SOURCES = ("rxconfig.py", "portofolio_reflex", "utils")
+
+# The data the pages are evaluated from, whose changes invalidate them too.
+DATA = ("content",)
+
+MANIFEST_NAME = "startup.json"
+
+
+class StartupTimings(NamedTuple):
+    """How long the backend took to start, in seconds."""
+
+    imports: float
+    compile: float
+    cached: bool
+
+
+def marker_path() -> Path:
+    """Get the routes creating state classes, written by Reflex."""
+    from reflex.utils import prerequisites
+    from reflex_base import constants
+
+    return prerequisites.get_backend_dir() / constants.Dirs.STATEFUL_PAGES
+
+
+def manifest_path() -> Path:
+    """Get the manifest of the artifacts prepared at build time."""
+    return marker_path().with_name(MANIFEST_NAME)
+
+
+def source_digest(root: Path = Path()) -> str:
+    """Hash the sources of the app and the version of Reflex.
+
+    Args:
+        root: The root of the app.
+
+    Returns:
+        The hexadecimal SHA-256 of the Python files of the sources and of
+        every data file, in path order.
+    """
+    digest = hashlib.sha256(importlib.metadata.version("reflex").encode())
+    for source, pattern in [
+        *((source, "*.py") for source in SOURCES),
+        *((data, "*") for data in DATA),
+    ]:
+        path = root / source
+        files = (
+            sorted(file for file in path.rglob(pattern) if file.is_file())
+            if path.is_dir()
+            else [path]
+            if path.is_file()
+            else []
+        )
+        for file in files:
+            digest.update(file.relative_to(root).as_posix().encode())
+            digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def load_artifacts() -> bool:
+    """Check the artifacts prepared at build time, discarding stale ones.
+
+    Returns:
+        Whether the backend skips evaluating the pages without state, from
+        the artifacts or the marker of a previous run.
+    """
+    try:
+        manifest = json.loads(manifest_path().read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return marker_path().exists()
+    if manifest.get("digest") == source_digest() and marker_path().exists():
+        return True
+    logger.warning("The sources changed since the build, evaluating every page.")
+    marker_path().unlink(missing_ok=True)
+    manifest_path().unlink(missing_ok=True)
+    return False
+
+
+class Startup:
+    """Record the phases of the startup, and report them once serving."""
+
+    def __init__(self):
+        """Start timing from the import of this module."""
+        self.imported: float | None = None
+        self.cached = False
+
+    def loaded(self):
+        """Record the end of the imports, and check the build artifacts."""
+        self.cached = load_artifacts()
+        self.imported = time.perf_counter()
+
+    def timings(self) -> StartupTimings:
+        """Get the durations of the phases up to now."""
+        imported = self.imported or time.perf_counter()
+        return StartupTimings(
+            imports=imported - STARTED,
+            compile=time.perf_counter() - imported,
+            cached=self.cached,
+        )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self):
+        """Report the timings when the app starts serving."""
+        timings = self.timings()
+        logger.info(
+            "Backend started in %.0f ms: imports %.0f ms, compile %.0f ms, %s.",
+            (timings.imports + timings.compile) * 1e3,
+            timings.imports * 1e3,
+            timings.compile * 1e3,
+            "reusing the stateful pages marker"
+            if timings.cached
+            else "evaluating every page",
+        )
+        yield
+
+
+startup = Startup()
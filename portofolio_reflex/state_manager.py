@@ -0,0 +1,386 @@
+"""Keep the session states in a bounded LRU, spilling to SQLite.
+
+The built-in managers of Reflex keep every session state tree alive in the
+backend process until it expires (memory and disk modes), or need a Redis
+server. ``BoundedStateManager`` keeps each session as a single compressed
+blob instead, deserialized only while an event is processed. The blobs live
+in an LRU capped to ``max_bytes``: the least recently used ones are written
+to a local SQLite database (WAL mode) by a worker thread when the cap is
+exceeded, and read back from it when the visitor comes back. Sessions idle
+for longer than ``token_expiration`` seconds are dropped from both.
+
+The whole store runs in the backend process, so the tests only need a
+temporary directory for the database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import reflex as rx
+from reflex.istate.manager import StateManager
+from reflex.istate.manager.token import BaseStateToken, StateToken
+from reflex_base.config import get_config
+from reflex_base.utils.exceptions import StateSchemaMismatchError
+
+DB_PATH = Path(os.environ.get("STATE_DB_PATH", ".data/states.sqlite3"))
+
+# Upper bound of the serialized states kept in memory, in bytes.
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Fast compression: the pickles are mostly names and schemas repeated by state.
+COMPRESSION_LEVEL = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS states (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+UPSERT = "INSERT OR REPLACE INTO states (key, data, expires_at) VALUES (?, ?, ?)"
+
+SELECT = "SELECT data FROM states WHERE key = ? AND expires_at > ?"
+
+PURGE = "DELETE FROM states WHERE expires_at <= ?"
+
+
+class StateStoreStats(NamedTuple):
+    """The counters of a bounded state manager."""
+
+    entries: int
+    bytes: int
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+def dump_state(token: StateToken, state: Any) -> bytes:
+    """Serialize the state tree of a session into a compressed blob.
+
+    Args:
+        token: The token of the session.
+        state: Its root state.
+
+    Returns:
+        The compressed states of the tree, by full name.
+    """
+    if not isinstance(token, BaseStateToken):
+        return zlib.compress(token.serialize(state), COMPRESSION_LEVEL)
+    # The pickle of a state leaves its parent and substates out.
+    states, stack = {}, [state]
+    while stack:
+        substate = stack.pop()
+        states[substate.get_full_name()] = token.serialize(substate)
+        stack.extend(substate.substates.values())
+    return zlib.compress(pickle.dumps(states), COMPRESSION_LEVEL)
+
+
+def load_state(token: StateToken, data: bytes) -> Any:
+    """Rebuild the state tree of a session from its blob.
+
+    The states missing from the blob, or whose class changed since it was
+    written, get their default values.
+
+    Args:
+        token: The token of the session.
+        data: The blob written by ``dump_state``.
+
+    Returns:
+        The root state.
+    """
+    if not isinstance(token, BaseStateToken):
+        return token.deserialize(zlib.decompress(data))
+    states = pickle.loads(zlib.decompress(data))
+    fresh = token.cls.get_root_state()(_reflex_internal_init=True)
+    return _restore(token, fresh, states, None)
+
+
+def _restore(
+    token: BaseStateToken, fresh: Any, states: dict[str, bytes], parent: Any
+) -> Any:
+    """Replace the states of a fresh tree with their stored copies."""
+    state = fresh
+    if (data := states.get(fresh.get_full_name())) is not None:
+        try:
+            state = token.deserialize(data)
+        except StateSchemaMismatchError:
+            state = fresh
+        else:
+            state.substates = fresh.substates
+    state.parent_state = parent
+    for name, substate in state.substates.items():
+        state.substates[name] = _restore(token, substate, states, state)
+    return state
+
+
+@dataclasses.dataclass
+class BoundedStateManager(StateManager):
+    """A state manager holding compressed states in a bounded LRU, backed by SQLite."""
+
+    # The SQLite database the evicted states are written to.
+    db_path: Path = DB_PATH
+
+    # Upper bound of the serialized states kept in memory, in bytes.
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    # Seconds a session is kept after its last event.
+    token_expiration: int = dataclasses.field(
+        default_factory=lambda: get_config().redis_token_expiration
+    )
+
+    # The blob and expiration deadline of each session, least recently used first.
+    _entries: OrderedDict[str, tuple[bytes, float]] = dataclasses.field(
+        default_factory=OrderedDict, init=False
+    )
+
+    # The evicted entries being written to the database.
+    _spilling: dict[str, tuple[bytes, float]] = dataclasses.field(
+        default_factory=dict, init=False
+    )
+
+    _bytes: int = dataclasses.field(default=0, init=False)
+    # The lock of each session being modified, and how many events hold or wait for it.
+    _locks: dict[str, tuple[asyncio.Lock, int]] = dataclasses.field(
+        default_factory=dict, init=False
+    )
+    _connection: sqlite3.Connection | None = dataclasses.field(default=None, init=False)
+    _connection_lock: threading.Lock = dataclasses.field(
+        default_factory=threading.Lock, init=False
+    )
+    _spills: set[asyncio.Task] = dataclasses.field(default_factory=set, init=False)
+
+    hits: int = dataclasses.field(default=0, init=False)
+    disk_hits: int = dataclasses.field(default=0, init=False)
+    misses: int = dataclasses.field(default=0, init=False)
+    evictions: int = dataclasses.field(default=0, init=False)
+    expirations: int = dataclasses.field(default=0, init=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database in WAL mode, creating it if needed."""
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Every use of the connection holds `_connection_lock`.
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _read(self, key: str) -> bytes | None:
+        """Read an evicted blob, if it did not expire."""
+        if self._connection is None and not self.db_path.exists():
+            return None
+        with self._connection_lock:
+            row = self._connect().execute(SELECT, (key, time.time())).fetchone()
+        return row[0] if row is not None else None
+
+    def _write(self, entries: list[tuple[str, bytes, float]]):
+        """Write evicted blobs and drop the expired ones in a single transaction."""
+        with self._connection_lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(UPSERT, entries)
+                connection.execute(PURGE, (time.time(),))
+
+    def _expire(self):
+        """Drop the sessions idle for longer than the token expiration.
+
+        Every access moves a session to the end of the LRU with a new deadline,
+        so the expired ones are at its start.
+        """
+        now = time.time()
+        while self._entries:
+            key, (data, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+            self._bytes -= len(data)
+            self.expirations += 1
+
+    def _evict(self):
+        """Spill the least recently used sessions until the cap is respected."""
+        evicted = []
+        # The most recent session stays in memory, even if larger than the cap.
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry[0])
+            self._spilling[key] = entry
+            evicted.append(key)
+        if not evicted:
+            return
+        self.evictions += len(evicted)
+        task = asyncio.get_running_loop().create_task(self._spill(evicted))
+        self._spills.add(task)
+        task.add_done_callback(self._spills.discard)
+
+    async def _spill(self, keys: list[str]):
+        """Write evicted sessions to the database."""
+        rows = [(key, *self._spilling[key]) for key in keys]
+        try:
+            await asyncio.to_thread(self._write, rows)
+        finally:
+            for key, data, _ in rows:
+                # Unless the session came back while it was written.
+                if self._spilling.get(key, (None,))[0] is data:
+                    del self._spilling[key]
+
+    def _store(self, token: StateToken, data: bytes):
+        """Put the blob of a session at the end of the LRU."""
+        key = token.cache_key
+        if (previous := self._entries.pop(key, None)) is not None:
+            self._bytes -= len(previous[0])
+        self._entries[key] = (data, time.time() + self.token_expiration)
+        self._bytes += len(data)
+        self._expire()
+        self._evict()
+
+    async def _load(self, token: StateToken) -> Any:
+        """Rebuild the state of a session from memory, the database or its defaults."""
+        key = token.cache_key
+        if (entry := self._entries.get(key)) is not None:
+            self.hits += 1
+            data = entry[0]
+        elif (entry := self._spilling.get(key)) is not None:
+            self.disk_hits += 1
+            data = entry[0]
+        elif (data := await asyncio.to_thread(self._read, key)) is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            if isinstance(token, BaseStateToken):
+                return token.cls.get_root_state()(_reflex_internal_init=True)
+            return token.cls()
+        self._store(token, data)
+        return load_state(token, data)
+
+    @contextlib.asynccontextmanager
+    async def _hold_lock(self, token: StateToken):
+        """Hold the lock of a session, dropped once no event holds or waits for it."""
+        key = token.lock_key
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def get_state(self, token: StateToken) -> Any:
+        """Get a copy of the state of a session.
+
+        Args:
+            token: The token of the session.
+
+        Returns:
+            Its root state, changes to it are only kept by ``set_state``.
+        """
+        return await self._load(self._coerce_token(token))
+
+    async def set_state(self, token: StateToken, state: Any, **context):
+        """Store the state of a session.
+
+        Args:
+            token: The token of the session.
+            state: Its root state.
+            context: The state modification context.
+        """
+        token = self._coerce_token(token)
+        self._store(token, dump_state(token, state))
+
+    @contextlib.asynccontextmanager
+    async def modify_state(self, token: StateToken, **context):
+        """Modify the state of a session while holding its lock.
+
+        Args:
+            token: The token of the session.
+            context: The state modification context.
+
+        Yields:
+            Its root state, stored again when the context exits.
+        """
+        token = self._coerce_token(token)
+        async with self._hold_lock(token):
+            state = await self._load(token)
+            yield state
+            await self.set_state(token, state, **context)
+
+    async def close(self):
+        """Write every session to the database, so they survive a restart."""
+        if self._spills:
+            await asyncio.gather(*self._spills, return_exceptions=True)
+        rows = [
+            (key, data, expires_at) for key, (data, expires_at) in self._entries.items()
+        ]
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+        self._entries.clear()
+        self._bytes = 0
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def stats(self) -> StateStoreStats:
+        """Get the counters of the store."""
+        return StateStoreStats(
+            len(self._entries),
+            self._bytes,
+            self.hits,
+            self.disk_hits,
+            self.misses,
+            self.evictions,
+            self.expirations,
+        )
+
+
+def install_state_manager(app: rx.App, manager: StateManager) -> StateManager:
+    """Make an app keep its session states in a manager.
+
+    Reflex picks the manager of an app among its built-in ones from
+    ``state_manager_mode`` and has no public setter, so this is the one place
+    setting the private attribute behind ``App.state_manager``;
+    ``tests/integration_tests/test_state_manager.py`` checks that Reflex still
+    reads it.
+
+    Args:
+        app: The Reflex app.
+        manager: The state manager.
+
+    Returns:
+        The installed manager.
+    """
+    app._state_manager = manager
+    return manager
+
+
+def installed_state_manager(app: rx.App) -> StateManager | None:
+    """Get the state manager of an app, without failing before it is set up.
+
+    Args:
+        app: The Reflex app.
+
+    Returns:
+        The state manager, or None if the app has no state.
+    """
+    return app._state_manager
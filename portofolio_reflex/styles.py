@@ -11,6 +11,21 @@ accent_color = rx.color("accent", 1)
 hover_accent_color = {"_hover": {"color": accent_text_color}}
 hover_accent_bg = {"_hover": {"background_color": accent_color}}
 content_width_vw = "90vw"
+card_box_shadow = "0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06)"
+container_max_width = rx.breakpoints(
+    {
+        "640px": {"max-width": "640px"},
+        "768px": {"max-width": "768px"},
+        "1024px": {"max-width": "1024px"},
+        "1280px": {"max-width": "1280px"},
+        "1536px": {"max-width": "1536px"},
+    }
+)
+focus_ring = {
+    "outline-style": "none",
+    "box-shadow": "var(--tw-ring-inset) 0 0 0 calc(2px + var(--tw-ring-offset-width)) var(--tw-ring-color)",
+    "--ring-color": "#6366F1",
+}
 sidebar_width = "20em"
 
 
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from portofolio_reflex import styles
 from typing import Callable
+from utils.fonts import font_head_tags
+from utils.routes import RouteIndex
 
 import reflex as rx
 
@@ -15,6 +17,48 @@ default_meta = [
     },
 ]
 
+# Every route registered through the template, used to build the sitemap and
+# the navigation tree.
+routes = RouteIndex()
+
+
+def _default_route(name: str) -> str:
+    """Get the route Reflex gives to a page registered without one.
+
+    Args:
+        name: The name of the page function.
+
+    Returns:
+        The route of the page.
+    """
+    return "/" if name == "index" else "/" + name.replace("_", "-")
+
+
+def layout(content: rx.Component) -> rx.Component:
+    """The layout shared by every page of the app.
+
+    Args:
+        content: The content of the page.
+
+    Returns:
+        The themed page around the content.
+    """
+    return rx.theme(
+        rx.hstack(
+            rx.box(
+                rx.box(
+                    content,
+                    **styles.template_content_style,
+                ),
+                **styles.template_page_style,
+            ),
+            align="start",
+            transition="left 0.5s, width 0.5s",
+            position="relative",
+        ),
+        accent_color="gray",  # ThemeState.accent_color,
+    )
+
 
 def template(
     route: str | None = None,
@@ -24,6 +68,8 @@ def template(
     meta: str | None = None,
     script_tags: list[rx.Component] | None = None,
     on_load: rx.event.EventHandler | list[rx.event.EventHandler] | None = None,
+    prerender: bool = False,
+    sections: dict[str, str] | None = None,
 ) -> Callable[[Callable[[], rx.Component]], rx.Component]:
     """The template for each page of the app.
 
@@ -35,6 +81,10 @@ def template(
         meta: Additionnal meta to add to the page.
         on_load: The event handler(s) called when the page load.
         script_tags: Scripts to attach to the page.
+        prerender: Whether to render the page to HTML at export time, with its
+            critical CSS inlined, so it paints before the JavaScript loads.
+        sections: The title of the sections of the page listed in the
+            navigation, by id.
 
     Returns:
         The template with the page content.
@@ -49,22 +99,16 @@ def template(
         Returns:
             The template with the page content.
         """
-        # Get the meta tags for the page.
-        all_meta = [*default_meta, *(meta or [])]
+        routes.add(
+            route if route is not None else _default_route(page_content.__name__),
+            title=title,
+            description=description,
+            prerender=prerender,
+            sections=sections,
+        )
 
-        def templated_page():
-            return rx.hstack(
-                rx.box(
-                    rx.box(
-                        page_content(),
-                        **styles.template_content_style,
-                    ),
-                    **styles.template_page_style,
-                ),
-                align="start",
-                transition="left 0.5s, width 0.5s",
-                position="relative",
-            )
+        # Get the meta tags for the page, preloading the self-hosted fonts.
+        all_meta = [*default_meta, *font_head_tags(), *(meta or [])]
 
         @rx.page(
             route=route,
@@ -76,10 +120,7 @@ def template(
             on_load=on_load,
         )
         def theme_wrap():
-            return rx.theme(
-                templated_page(),
-                accent_color="gray",  # ThemeState.accent_color,
-            )
+            return layout(page_content())
 
         return theme_wrap
 
@@ -1,5 +1,41 @@
 import reflex as rx
 
+from utils.assets import AssetsPlugin
+from utils.deferred import DeferredSectionsPlugin
+from utils.icons import IconsPlugin
+from utils.lazy_socket import LazySocketPlugin
+from utils.prerender import PrerenderPlugin
+from utils.sitemap import RouteFilesPlugin
+from utils.style_classes import StyleClassesPlugin
+
 config = rx.Config(
     app_name="portofolio_reflex",
+    # Write .zst, .br and .gz siblings of every text asset at export time,
+    # served as is by Caddy (`file_server precompressed`).
+    frontend_compression_formats=["zstd", "brotli", "gzip"],
+    plugins=[
+        # Compile Tailwind at export time: the utilities referenced by the
+        # `class_name` props of the compiled pages end up in the hashed CSS
+        # bundle instead of being generated in the browser by the CDN script.
+        rx.plugins.TailwindV4Plugin(config={"plugins": []}),
+        # Serve the images from hashed local copies, see `utils/assets.py`.
+        AssetsPlugin(),
+        # Fail the build on icons missing from the sprite, see `utils/icons.py`.
+        IconsPlugin(),
+        # sitemap.xml, robots.txt and navigation.json, see `utils/sitemap.py`.
+        RouteFilesPlugin(),
+        # Compile the static style props to shared classes, see
+        # `utils/style_classes.py`.
+        StyleClassesPlugin(),
+        # Load the content created with `create_deferred` as separate chunks,
+        # see `utils/deferred.py`.
+        DeferredSectionsPlugin(),
+        # Open the event websocket only when the visitor interacts with the
+        # backend and close it once idle, see `utils/lazy_socket.py`.
+        LazySocketPlugin(idle_timeout=60),
+        # Prerender the pages registered with `template(prerender=True)`.
+        PrerenderPlugin(),
+    ],
+    # Replaced by RouteFilesPlugin.
+    disable_plugins=[rx.plugins.SitemapPlugin],
 )
@@ -0,0 +1,877 @@
+"""Drive the deployment of the Dockerfile and Caddyfile with a reproducible load.
+
+Usage:
+    python -m tests.integration_tests.load [--duration S] [--static-rate R]
+        [--ping-rate R] [--sessions N] [--event-rate R]
+        [--url URL --forwarded-for] [--output FILE]
+
+The static pages and ``/ping`` are fetched at fixed rates, whether the previous
+requests were answered or not, and the latencies are measured from the time
+each request was due, so a slow backend can not hide its queueing. Each event
+session opens an ``/_event`` websocket like the lazy socket of the frontend,
+then sends a hydrate event at a fixed rate and times the state update it gets
+back. Every simulated visitor has its own IP, so the backend limits each
+one separately.
+
+Without ``--url``, a stand-in of the deployment is started on the loopback:
+the backend served by Granian like ``reflex run --env prod --backend-only``,
+behind ``front``, a stand-in of Caddy which forwards the paths of
+``@backend_routes`` in the Caddyfile and serves the others from the exported
+frontend, or from a generated page when the app was never exported. The
+states and contact messages go to a temporary directory. Each visitor
+connects from its own loopback address, which the stand-in forwards in
+``X-Forwarded-For`` like Caddy.
+
+A deployment given with ``--url`` sees every visitor with the IP of this
+machine, so the IPs of the visitors are sent in ``X-Forwarded-For`` instead.
+Caddy replaces that header unless ``trusted_proxies`` lists this machine,
+and all the visitors would then share the per-client limits, so
+``--forwarded-for`` is required to confirm the deployment trusts it.
+
+The report holds the requests per second, the p50/p95/p99 latencies and the
+error rate of each kind of request, as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+import wsproto
+from wsproto.events import (
+    AcceptConnection,
+    BytesMessage,
+    CloseConnection,
+    Message,
+    Ping,
+    RejectConnection,
+    Request,
+    TextMessage,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+CADDYFILE = ROOT / "Caddyfile"
+
+STATIC_DIR = ROOT / ".web" / "build" / "client"
+
+# The stand-in of Caddy, imported by Granian from the root of the repository.
+FRONT = "tests.integration_tests.load:front"
+
+# How the stand-in of Caddy finds the backend and the exported frontend.
+BACKEND_URL_ENV = "LOAD_BACKEND_URL"
+STATIC_DIR_ENV = "LOAD_STATIC_DIR"
+
+# Upper bound of every request, handshake and state update, in seconds.
+TIMEOUT = 10
+
+# How long the stand-in may take to start, importing the app included.
+STARTUP_TIMEOUT = 60
+
+HYDRATE = "reflex___state____state.hydrate"
+
+# The headers of a single hop, not forwarded by a proxy.
+HOP_BY_HOP = {
+    b"connection",
+    b"host",
+    b"keep-alive",
+    b"proxy-connection",
+    b"te",
+    b"trailer",
+    b"transfer-encoding",
+    b"upgrade",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    """The traffic sent to the deployment."""
+
+    # How long the load lasts, in seconds.
+    duration: float = 10
+    # Fetches of the static pages and of /ping, per second.
+    static_rate: float = 50
+    ping_rate: float = 20
+    # Concurrent websocket sessions, and the events each one sends per second.
+    sessions: int = 50
+    event_rate: float = 1
+    # How long it takes to open all the sessions, in seconds.
+    ramp_up: float = 1
+    # The number of distinct visitors the fetches come from.
+    visitors: int = 1000
+    # The pages fetched in turn.
+    static_paths: tuple[str, ...] = ("/",)
+    # Seeds the choice of the visitors, so two runs send the same traffic.
+    seed: int = 0
+
+
+class WebSocketRejected(ConnectionError):
+    """The server answered the handshake with an HTTP status."""
+
+    def __init__(self, status: int):
+        super().__init__(f"Handshake refused with status {status}")
+        self.status = status
+
+
+class WebSocket:
+    """A minimal asyncio websocket client."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._connection = wsproto.WSConnection(wsproto.ConnectionType.CLIENT)
+        self._events: collections.deque = collections.deque()
+        self.subprotocol: str | None = None
+
+    @classmethod
+    async def connect(
+        cls,
+        url: str,
+        headers: list[tuple[bytes, bytes]] | None = None,
+        subprotocols: list[str] | None = None,
+        local_address: str | None = None,
+    ) -> WebSocket:
+        """Open a websocket.
+
+        Args:
+            url: The ``ws://`` URL to connect to.
+            headers: The extra headers of the handshake.
+            subprotocols: The subprotocols offered to the server.
+            local_address: The IP to connect from, any by default.
+
+        Returns:
+            The connected websocket.
+
+        Raises:
+            WebSocketRejected: If the server refused the handshake.
+            ConnectionError: If the connection was lost during the handshake.
+        """
+        parts = urllib.parse.urlsplit(url)
+        reader, writer = await asyncio.open_connection(
+            parts.hostname,
+            parts.port or 80,
+            local_addr=(local_address, 0) if local_address else None,
+        )
+        websocket = cls(reader, writer)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        websocket._send(
+            Request(
+                host=parts.netloc,
+                target=target,
+                extra_headers=headers or [],
+                subprotocols=subprotocols or [],
+            )
+        )
+        event = await websocket._next_event()
+        if isinstance(event, AcceptConnection):
+            websocket.subprotocol = event.subprotocol
+            return websocket
+        writer.close()
+        if isinstance(event, RejectConnection):
+            raise WebSocketRejected(event.status_code)
+        raise ConnectionError("Connection lost during the handshake")
+
+    def _send(self, event):
+        self._writer.write(self._connection.send(event))
+
+    async def _next_event(self):
+        while not self._events:
+            data = await self._reader.read(65536)
+            if not data:
+                return None
+            self._connection.receive_data(data)
+            self._events.extend(self._connection.events())
+        return self._events.popleft()
+
+    async def send(self, data: str | bytes):
+        """Send a text or binary message."""
+        self._send(Message(data=data))
+        await self._writer.drain()
+
+    async def receive(self) -> str | bytes | None:
+        """Receive the next message, or None once the websocket is closed."""
+        parts = []
+        while (event := await self._next_event()) is not None:
+            if isinstance(event, (TextMessage, BytesMessage)):
+                parts.append(event.data)
+                if event.message_finished:
+                    return ("" if isinstance(event, TextMessage) else b"").join(parts)
+            elif isinstance(event, Ping):
+                self._send(event.response())
+            elif isinstance(event, CloseConnection):
+                if (
+                    self._connection.state
+                    is wsproto.connection.ConnectionState.REMOTE_CLOSING
+                ):
+                    self._send(event.response())
+                break
+        self._writer.close()
+        return None
+
+    async def close(self):
+        """Close the websocket, without waiting for the server."""
+        if self._connection.state is wsproto.connection.ConnectionState.OPEN:
+            with contextlib.suppress(ConnectionError):
+                self._send(CloseConnection(code=1000))
+                await self._writer.drain()
+        self._writer.close()
+
+
+def backend_paths(caddyfile: Path = CADDYFILE) -> tuple[str, ...]:
+    """Get the paths Caddy forwards to the backend, from ``@backend_routes``."""
+    match = re.search(
+        r"^@backend_routes path (.+)$", caddyfile.read_text(), re.MULTILINE
+    )
+    if match is None:
+        raise ValueError(f"No @backend_routes matcher in {caddyfile}")
+    return tuple(match.group(1).split())
+
+
+def matches(path: str, patterns: tuple[str, ...]) -> bool:
+    """Check a path against Caddy path patterns, with a trailing ``*`` for prefixes."""
+    return any(
+        path.startswith(pattern[:-1]) if pattern.endswith("*") else path == pattern
+        for pattern in patterns
+    )
+
+
+def forwarded_headers(scope: dict) -> list[tuple[bytes, bytes]]:
+    """Get the headers to send upstream, with the IP of the client.
+
+    Like Caddy without ``trusted_proxies``, the ``X-Forwarded-For`` of the
+    client is replaced by the address of the peer.
+    """
+    headers = [
+        (name, value)
+        for name, value in scope["headers"]
+        if name not in HOP_BY_HOP and name != b"x-forwarded-for"
+    ]
+    if scope.get("client"):
+        headers.append((b"x-forwarded-for", scope["client"][0].encode()))
+    return headers
+
+
+async def proxy_http(client: httpx.AsyncClient, scope: dict, receive, send):
+    """Forward an HTTP request to the backend and stream its response back."""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    url = scope["path"] + (
+        f"?{scope['query_string'].decode()}" if scope.get("query_string") else ""
+    )
+    request = client.build_request(
+        scope["method"], url, headers=forwarded_headers(scope), content=body
+    )
+    try:
+        response = await client.send(request, stream=True)
+    except httpx.HTTPError:
+        await send({"type": "http.response.start", "status": 502, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (name, value)
+                    for name, value in response.headers.raw
+                    if name.lower() not in HOP_BY_HOP
+                ],
+            }
+        )
+        async for chunk in response.aiter_raw():
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        await response.aclose()
+
+
+async def proxy_websocket(backend_url: str, scope: dict, receive, send):
+    """Relay the messages of a websocket between the client and the backend."""
+    await receive()
+    url = backend_url.replace("http", "ws", 1) + scope["path"]
+    if scope.get("query_string"):
+        url += f"?{scope['query_string'].decode()}"
+    headers = [
+        (name, value)
+        for name, value in forwarded_headers(scope)
+        if not name.startswith(b"sec-websocket-")
+    ]
+    try:
+        upstream = await WebSocket.connect(url, headers, scope.get("subprotocols"))
+    except (OSError, ConnectionError):
+        # Refused by the backend, e.g. rate limited.
+        await send({"type": "websocket.close", "code": 1013})
+        return
+    await send({"type": "websocket.accept", "subprotocol": upstream.subprotocol})
+
+    async def to_backend():
+        while (message := await receive())["type"] == "websocket.receive":
+            await upstream.send(message.get("text") or message.get("bytes") or b"")
+
+    async def to_client():
+        while (data := await upstream.receive()) is not None:
+            key = "text" if isinstance(data, str) else "bytes"
+            await send({"type": "websocket.send", key: data})
+        await send({"type": "websocket.close", "code": 1000})
+
+    tasks = [asyncio.create_task(to_backend()), asyncio.create_task(to_client())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await upstream.close()
+
+
+def front():
+    """Build the stand-in of Caddy, configured by the environment.
+
+    Returns:
+        The ASGI app, served by Granian with ``--factory``.
+    """
+    from starlette.middleware.gzip import GZipMiddleware
+    from starlette.staticfiles import StaticFiles
+
+    backend_url = os.environ[BACKEND_URL_ENV]
+    patterns = backend_paths()
+    client = httpx.AsyncClient(base_url=backend_url, timeout=TIMEOUT)
+    static = StaticFiles(directory=os.environ[STATIC_DIR_ENV], html=True)
+    # `encode gzip` of the backend routes.
+    forward = GZipMiddleware(
+        lambda scope, receive, send: proxy_http(client, scope, receive, send)
+    )
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await client.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+        elif not matches(scope["path"], patterns):
+            if scope["type"] == "http":
+                await static(scope, receive, send)
+            else:
+                await send({"type": "websocket.close", "code": 1000})
+        elif scope["type"] == "http":
+            await forward(scope, receive, send)
+        else:
+            await proxy_websocket(backend_url, scope, receive, send)
+
+    return app
+
+
+def free_port() -> int:
+    """Get a port of the loopback nothing listens on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def serve(
+    target: str, port: int, env: dict[str, str], log: Path, workers: int = 1
+) -> subprocess.Popen:
+    """Serve an ASGI app factory with Granian, in the background."""
+    with log.open("wb") as output:
+        return subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "granian",
+                "--interface",
+                "asgi",
+                "--factory",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+                target,
+            ],
+            cwd=ROOT,
+            env=env,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+        )
+
+
+def write_page(static_dir: Path):
+    """Write a page the size of the exported portfolio, with its 404 page."""
+    rng = random.Random(0)
+    words = [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))
+        )
+        for _ in range(500)
+    ]
+    sections = "\n".join(
+        f'<section id="s{index}"><h2>{rng.choice(words)}</h2><p>{" ".join(rng.choices(words, k=200))}</p></section>'
+        for index in range(20)
+    )
+    (static_dir / "index.html").write_text(
+        f"<!DOCTYPE html><html><body>{sections}</body></html>"
+    )
+    (static_dir / "404.html").write_text(
+        "<!DOCTYPE html><html><body>Not found</body></html>"
+    )
+
+
+def wait_ready(url: str, processes: list[subprocess.Popen], logs: list[Path]):
+    """Wait until the backend answers through the stand-in of Caddy."""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if any(process.poll() is not None for process in processes):
+            break
+        with contextlib.suppress(httpx.HTTPError):
+            if httpx.get(f"{url}/ping", timeout=1).is_success:
+                return
+        time.sleep(0.2)
+    output = "\n".join(log.read_text(errors="replace")[-2000:] for log in logs)
+    raise RuntimeError(f"The stand-in deployment did not start:\n{output}")
+
+
+@contextlib.contextmanager
+def stand_in(static_dir: Path | None = None, workers: int = 1) -> Iterator[str]:
+    """Start the backend behind a stand-in of Caddy, on the loopback.
+
+    Args:
+        static_dir: The exported frontend, by default the last export, or a
+            generated page if the app was never exported.
+        workers: The worker processes of the backend.
+
+    Yields:
+        The URL of the stand-in of Caddy.
+    """
+    from reflex.utils.exec import get_app_instance_from_file
+    from reflex_base.environment import environment
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if static_dir is None and STATIC_DIR.is_dir():
+            static_dir = STATIC_DIR
+        elif static_dir is None:
+            static_dir = tmp_dir / "client"
+            static_dir.mkdir()
+            write_page(static_dir)
+
+        backend_url = f"http://127.0.0.1:{free_port()}"
+        url = f"http://127.0.0.1:{free_port()}"
+        env = {
+            **os.environ,
+            # Like the production backend, which runs from the exported frontend.
+            environment.REFLEX_SKIP_COMPILE.name: "true",
+            environment.REFLEX_WEB_WORKDIR.name: str(tmp_dir / ".web"),
+            "STATE_DB_PATH": str(tmp_dir / "states.sqlite3"),
+            "CONTACT_DB_PATH": str(tmp_dir / "contact.sqlite3"),
+            BACKEND_URL_ENV: backend_url,
+            STATIC_DIR_ENV: str(static_dir),
+        }
+        logs = [tmp_dir / "backend.log", tmp_dir / "front.log"]
+        processes = [
+            serve(
+                get_app_instance_from_file(),
+                int(backend_url.rsplit(":", 1)[1]),
+                env,
+                logs[0],
+                workers,
+            ),
+            serve(FRONT, int(url.rsplit(":", 1)[1]), env, logs[1]),
+        ]
+        try:
+            wait_ready(url, processes, logs)
+            yield url
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+def visitor_ip(visitor: int) -> str:
+    """Get the IP of a simulated visitor, a loopback address other than 127.0.0.1."""
+    return f"127.{1 + (visitor >> 16) % 254}.{visitor >> 8 & 255}.{visitor & 255}"
+
+
+class Visitors:
+    """Send the requests of each simulated visitor with its own IP."""
+
+    def __init__(self, url: str, forwarded: bool = False):
+        """Prepare the clients of the visitors.
+
+        Args:
+            url: The URL of Caddy, or of its stand-in.
+            forwarded: Whether to send the IPs in ``X-Forwarded-For``, to a
+                deployment trusting it, instead of connecting from them.
+        """
+        self.url = url
+        self.forwarded = forwarded
+        self.clients: dict[str | None, httpx.AsyncClient] = {}
+
+    def client(self, ip: str) -> httpx.AsyncClient:
+        """Get the HTTP client of a visitor, connecting from its IP unless forwarded."""
+        local_address = None if self.forwarded else ip
+        if local_address not in self.clients:
+            self.clients[local_address] = httpx.AsyncClient(
+                base_url=self.url,
+                timeout=TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=None, max_keepalive_connections=200
+                ),
+                transport=httpx.AsyncHTTPTransport(local_address=local_address),
+            )
+        return self.clients[local_address]
+
+    def headers(self, ip: str) -> list[tuple[bytes, bytes]]:
+        """Get the headers carrying the IP of a visitor, if forwarded."""
+        return [(b"x-forwarded-for", ip.encode())] if self.forwarded else []
+
+    async def websocket(self, path: str, ip: str) -> WebSocket:
+        """Open a websocket as a visitor."""
+        return await WebSocket.connect(
+            f"{self.url.replace('http', 'ws', 1)}{path}",
+            self.headers(ip),
+            local_address=None if self.forwarded else ip,
+        )
+
+    async def aclose(self):
+        """Close the connections of the visitors."""
+        await asyncio.gather(*(client.aclose() for client in self.clients.values()))
+
+
+def percentile(ordered: list[float], quantile: float) -> float:
+    """Get a percentile of sorted values, by the nearest rank."""
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+class Recorder:
+    """Collect the latency or the error of each request, by kind."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = collections.defaultdict(list)
+        self.errors: dict[str, collections.Counter] = collections.defaultdict(
+            collections.Counter
+        )
+
+    def record(self, kind: str, due: float, error: str | None = None):
+        """Record a request.
+
+        Args:
+            kind: The kind of request, e.g. ``ping``.
+            due: When the request was due to be sent, in the time of the loop.
+            error: Why the request failed, e.g. its HTTP status.
+        """
+        if error is None:
+            self.latencies[kind].append(asyncio.get_running_loop().time() - due)
+        else:
+            self.errors[kind][error] += 1
+
+    def report(self, duration: float) -> dict[str, Any]:
+        """Summarize the requests of each kind.
+
+        Args:
+            duration: How long the load lasted, in seconds.
+
+        Returns:
+            The requests per second, the error rate, the errors by reason and
+            the latencies in milliseconds of the successful requests.
+        """
+        report = {}
+        for kind in sorted(self.latencies.keys() | self.errors.keys()):
+            ordered = sorted(self.latencies[kind])
+            errors = sum(self.errors[kind].values())
+            requests = len(ordered) + errors
+            report[kind] = {
+                "requests": requests,
+                "rps": round(requests / duration, 2),
+                "error_rate": round(errors / requests, 4),
+                "errors": dict(sorted(self.errors[kind].items())),
+                "latency_ms": {
+                    name: round(percentile(ordered, quantile) * 1e3, 2)
+                    if ordered
+                    else None
+                    for name, quantile in (
+                        ("p50", 0.5),
+                        ("p95", 0.95),
+                        ("p99", 0.99),
+                        ("max", 1),
+                    )
+                },
+            }
+        return report
+
+
+async def at_rate(rate: float, duration: float, fire):
+    """Start ``fire(due)`` at a fixed rate, without waiting for the previous ones."""
+    if rate <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for index in range(int(rate * duration)):
+        due = start + index / rate
+        await asyncio.sleep(max(0.0, due - loop.time()))
+        tasks.append(asyncio.create_task(fire(due)))
+    await asyncio.gather(*tasks)
+
+
+async def fetch(
+    visitors: Visitors, recorder: Recorder, kind: str, path: str, ip: str, due: float
+):
+    """Fetch a path as a visitor, and record its latency or error."""
+    try:
+        response = await visitors.client(ip).get(path, headers=visitors.headers(ip))
+    except httpx.HTTPError as error:
+        recorder.record(kind, due, type(error).__name__)
+        return
+    recorder.record(
+        kind, due, None if response.is_success else str(response.status_code)
+    )
+
+
+async def session(
+    visitors: Visitors, recorder: Recorder, profile: Profile, index: int, start: float
+):
+    """Open an event websocket as a visitor and send hydrate events at a fixed rate."""
+    loop = asyncio.get_running_loop()
+    due = start + profile.ramp_up * index / max(profile.sessions, 1)
+    await asyncio.sleep(max(0.0, due - loop.time()))
+
+    query = urllib.parse.urlencode(
+        {"EIO": 4, "transport": "websocket", "token": f"load-{os.getpid()}-{index}"}
+    )
+    ip = visitor_ip(profile.visitors + index)
+    try:
+        websocket = await asyncio.wait_for(
+            visitors.websocket(f"/_event/?{query}", ip), TIMEOUT
+        )
+    except WebSocketRejected as error:
+        recorder.record("connect", due, str(error.status))
+        return
+    except (OSError, ConnectionError, asyncio.TimeoutError) as error:
+        recorder.record("connect", due, type(error).__name__)
+        return
+
+    updates: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def read():
+        # The Engine.IO open packet, then the Socket.IO packets of the namespace.
+        while (packet := await websocket.receive()) is not None:
+            if packet == "2":
+                await websocket.send("3")
+            elif isinstance(packet, str) and packet.startswith(
+                ("40/_event", "42/_event")
+            ):
+                updates.put_nowait(packet)
+        updates.put_nowait(None)
+
+    reader = asyncio.create_task(read())
+    try:
+        await websocket.send("40/_event,")
+        if await asyncio.wait_for(updates.get(), TIMEOUT) is None:
+            recorder.record("connect", due, "closed")
+            return
+        recorder.record("connect", due)
+
+        event = json.dumps(
+            [
+                "event",
+                {"name": HYDRATE, "payload": {}, "router_data": {"pathname": "/"}},
+            ]
+        )
+        count = int(profile.event_rate * (profile.duration - (due - start)))
+        for tick in range(count):
+            event_due = due + tick / profile.event_rate
+            await asyncio.sleep(max(0.0, event_due - loop.time()))
+            # Drop the updates arriving after a timeout.
+            while not updates.empty():
+                if updates.get_nowait() is None:
+                    recorder.record("event", event_due, "closed")
+                    return
+            await websocket.send(f"42/_event,{event}")
+            try:
+                update = await asyncio.wait_for(updates.get(), TIMEOUT)
+            except asyncio.TimeoutError:
+                recorder.record("event", event_due, "timeout")
+                continue
+            if update is None:
+                recorder.record("event", event_due, "closed")
+                return
+            recorder.record("event", event_due)
+    except (OSError, ConnectionError, asyncio.TimeoutError) as error:
+        recorder.record("event", due, type(error).__name__)
+    finally:
+        reader.cancel()
+        await websocket.close()
+
+
+async def drive(url: str, profile: Profile, forwarded: bool = False) -> dict[str, Any]:
+    """Send the load of a profile to a deployment.
+
+    Args:
+        url: The URL of Caddy, or of its stand-in.
+        profile: The traffic to send.
+        forwarded: Whether to send the IPs of the visitors in
+            ``X-Forwarded-For``, see ``Visitors``.
+
+    Returns:
+        The report of each kind of request.
+    """
+    recorder = Recorder()
+    rng = random.Random(profile.seed)
+    paths = iter(
+        profile.static_paths * math.ceil(profile.static_rate * profile.duration)
+    )
+    visitors = Visitors(url, forwarded)
+    try:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(
+            at_rate(
+                profile.static_rate,
+                profile.duration,
+                lambda due: fetch(
+                    visitors,
+                    recorder,
+                    "static",
+                    next(paths),
+                    visitor_ip(rng.randrange(profile.visitors)),
+                    due,
+                ),
+            ),
+            at_rate(
+                profile.ping_rate,
+                profile.duration,
+                lambda due: fetch(
+                    visitors,
+                    recorder,
+                    "ping",
+                    "/ping",
+                    visitor_ip(rng.randrange(profile.visitors)),
+                    due,
+                ),
+            ),
+            *(
+                session(visitors, recorder, profile, index, start)
+                for index in range(profile.sessions)
+            ),
+        )
+        elapsed = loop.time() - start
+    finally:
+        await visitors.aclose()
+    return recorder.report(max(elapsed, profile.duration))
+
+
+def run(profile: Profile, url: str | None = None, workers: int = 1) -> dict[str, Any]:
+    """Run a load test.
+
+    Args:
+        profile: The traffic to send.
+        url: The deployment to send it to, by default a stand-in started on
+            the loopback.
+        workers: The worker processes of the backend of the stand-in.
+
+    Returns:
+        The profile, the target and the report of each kind of request.
+    """
+    with contextlib.ExitStack() as stack:
+        target = url or stack.enter_context(stand_in(workers=workers))
+        # A deployment only sees this machine, see `Visitors`.
+        results = asyncio.run(drive(target, profile, forwarded=url is not None))
+    return {
+        "python": sys.version.split()[0],
+        "target": url or "stand-in",
+        "workers": None if url else workers,
+        "profile": asdict(profile),
+        "requests": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = Profile()
+    parser.add_argument("--duration", type=float, default=defaults.duration)
+    parser.add_argument("--static-rate", type=float, default=defaults.static_rate)
+    parser.add_argument("--ping-rate", type=float, default=defaults.ping_rate)
+    parser.add_argument("--sessions", type=int, default=defaults.sessions)
+    parser.add_argument(
+        "--event-rate",
+        type=float,
+        default=defaults.event_rate,
+        help="Events per session per second.",
+    )
+    parser.add_argument("--ramp-up", type=float, default=defaults.ramp_up)
+    parser.add_argument("--visitors", type=int, default=defaults.visitors)
+    parser.add_argument(
+        "--static-path",
+        action="append",
+        dest="static_paths",
+        help="A page to fetch, / by default.",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--url", help="A running deployment, instead of the stand-in.")
+    parser.add_argument(
+        "--forwarded-for",
+        action="store_true",
+        help="Confirm the Caddy of --url trusts the X-Forwarded-For of this machine (trusted_proxies).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes of the stand-in backend.",
+    )
+    parser.add_argument("--output", type=Path, help="File to write the report to.")
+    args = parser.parse_args()
+    if args.url and not args.forwarded_for:
+        parser.error(
+            "--url needs --forwarded-for: unless the Caddyfile of the deployment lists this machine in "
+            "trusted_proxies, every visitor shares its IP and the per-client limits of the backend."
+        )
+
+    profile = Profile(
+        duration=args.duration,
+        static_rate=args.static_rate,
+        ping_rate=args.ping_rate,
+        sessions=args.sessions,
+        event_rate=args.event_rate,
+        ramp_up=args.ramp_up,
+        visitors=args.visitors,
+        static_paths=tuple(args.static_paths or defaults.static_paths),
+        seed=args.seed,
+    )
+    results = json.dumps(run(profile, args.url, args.workers), indent=2)
+    if args.output:
+        args.output.write_text(results + "\n")
+    print(results)
+
+
+if __name__ == "__main__":
+    main()
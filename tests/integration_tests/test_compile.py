@@ -0,0 +1,102 @@
+"""Compilation of the real app in a fresh process, as done by the benchmarks and the budget."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+from PIL import Image
+
+from portofolio_reflex.pages.index.page import create_portfolio_page
+from utils.assets import is_remote, iter_image_sources
+
+ROOT = Path(__file__).resolve().parents[2]
+
+TIME_COMPILE = "from benchmarks.build import time_compile; print(time_compile())"
+
+MEASURE_APP = """\
+import json, sys
+from pathlib import Path
+
+from portofolio_reflex.portofolio_reflex import app
+from utils.budget import measure_app
+
+reports = measure_app(app, Path(sys.argv[1]))
+print(json.dumps({report.route: report.missing for report in reports}))
+"""
+
+
+def mirror(root: Path):
+    """Stand in for the remote images of the page, laid out like ``utils.assets`` expects."""
+    for url in iter_image_sources(create_portfolio_page()):
+        if not is_remote(url):
+            continue
+        parsed = urlparse(url)
+        path = root / parsed.netloc / parsed.path.lstrip("/")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".svg":
+            path.write_text(
+                '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 50"/>'
+            )
+        else:
+            image = io.BytesIO()
+            Image.new("RGB", (64, 64), "orange").save(image, "WEBP")
+            path.write_bytes(image.getvalue())
+
+
+@pytest.fixture(scope="module")
+def app_copy(tmp_path_factory):
+    root = tmp_path_factory.mktemp("app")
+    for source in ("portofolio_reflex", "utils", "assets", "content", "benchmarks"):
+        shutil.copytree(
+            ROOT / source, root / source, ignore=shutil.ignore_patterns("__pycache__")
+        )
+    shutil.copy(ROOT / "rxconfig.py", root)
+    mirror(root / "mirror")
+    run(root, "-m", "utils.assets", "--from-dir", "mirror")
+    return root
+
+
+def run(root: Path, *args: str) -> str:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(root),
+        "REFLEX_WEB_WORKDIR": str(root / ".web"),
+        "REFLEX_CHECK_LATEST_VERSION": "false",
+    }
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def test_the_app_compiles(app_copy):
+    seconds = float(run(app_copy, "-c", TIME_COMPILE).splitlines()[-1])
+
+    assert seconds > 0
+
+
+def test_the_pages_of_the_app_are_measured(app_copy, tmp_path):
+    (tmp_path / "index.html").write_text(
+        "<!doctype html><html><head></head><body></body></html>"
+    )
+
+    missing = json.loads(
+        run(app_copy, "-c", MEASURE_APP, str(tmp_path)).splitlines()[-1]
+    )
+
+    assert set(missing) == {"/", "/404"}
+    # The page loads the mirrored copies of the remote images, which the
+    # stand-in export lacks.
+    assert any(url.startswith("/remote/") for url in missing["/"])
@@ -0,0 +1,223 @@
+"""Load test of the contact form pipeline, with a disk blocked on demand."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from portofolio_reflex.contact import (
+    ContactError,
+    QueueFullError,
+    SubmissionQueue,
+    validate,
+)
+
+# Upper bound of a wait on the disk, so a broken writer fails the test instead
+# of hanging it.
+TIMEOUT = 10
+
+FORM = {"name": "Ada", "email": "ada@example.com", "message": "Hello!"}
+
+
+class BlockedDiskQueue(SubmissionQueue):
+    """A queue whose batch writes block their thread until the disk is opened."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened = threading.Event()
+        self.writing = threading.Event()
+        self.batch_sizes = []
+
+    def _write(self, batch):
+        self.writing.set()
+        if not self.opened.wait(TIMEOUT):
+            raise TimeoutError("The disk was never opened.")
+        super()._write(batch)
+        self.batch_sizes.append(len(batch))
+
+
+def count_rows(db_path) -> int:
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+
+@pytest.mark.parametrize(
+    "form",
+    [
+        {**FORM, "name": "  "},
+        {**FORM, "email": "not an email"},
+        {**FORM, "message": "x" * 5001},
+        {"name": "Ada", "email": "ada@example.com"},
+    ],
+)
+def test_invalid_forms_are_refused(form):
+    with pytest.raises(ContactError):
+        validate(form)
+
+
+def test_burst_is_accepted_before_it_is_written(tmp_path):
+    db_path = tmp_path / "contact.sqlite3"
+    submissions = 500
+
+    async def burst():
+        queue = BlockedDiskQueue(db_path, maxsize=submissions, batch_size=50)
+        await asyncio.gather(
+            *(
+                queue.submit(validate({**FORM, "message": f"Message {index}"}))
+                for index in range(submissions)
+            )
+        )
+        accepted = queue.stats()
+        # The event loop keeps running while a batch write is blocked.
+        await asyncio.to_thread(queue.writing.wait, TIMEOUT)
+        blocked = queue.stats()
+        queue.opened.set()
+        await queue.drain()
+        await queue.close()
+        return accepted, blocked, queue
+
+    accepted, blocked, queue = asyncio.run(burst())
+
+    # Every submission was answered before a single batch was written.
+    assert accepted.accepted == submissions
+    assert accepted.written == blocked.written == 0
+    # Everything was eventually written, by full batches.
+    after = queue.stats()
+    assert after.written == count_rows(db_path) == submissions
+    assert queue.batch_sizes == [50] * (submissions // 50)
+    assert after.batches == submissions // 50
+    assert after.queued == after.rejected == after.failed == 0
+
+
+def test_full_queue_refuses_submissions(tmp_path):
+    db_path = tmp_path / "contact.sqlite3"
+
+    async def flood():
+        queue = BlockedDiskQueue(db_path, maxsize=10, batch_size=5, submit_timeout=0.01)
+
+        async def submit():
+            try:
+                await queue.submit(validate(FORM))
+            except QueueFullError:
+                return False
+            return True
+
+        results = await asyncio.gather(*(submit() for _ in range(100)))
+        queue.opened.set()
+        await queue.close()
+        return results, queue.stats()
+
+    results, stats = asyncio.run(flood())
+
+    assert stats.rejected == results.count(False) > 0
+    assert stats.accepted == results.count(True) == count_rows(db_path)
+
+
+def test_database_uses_wal(tmp_path):
+    db_path = tmp_path / "contact.sqlite3"
+
+    async def submit_one():
+        queue = SubmissionQueue(db_path, flush_interval=0)
+        await queue.submit(validate(FORM))
+        await queue.close()
+
+    asyncio.run(submit_one())
+
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        row = connection.execute(
+            "SELECT name, email, message FROM submissions"
+        ).fetchone()
+    assert row == (FORM["name"], FORM["email"], FORM["message"])
+
+
+class CrashingQueue(SubmissionQueue):
+    """A queue whose batch writes fail with an unexpected error while broken."""
+
+    def __init__(self, *args, failures: int, **kwargs):
+        super().__init__(*args, retry_delay=0.001, **kwargs)
+        # The number of writes that fail, all of them if negative.
+        self.failures = failures
+
+    def _write(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("disk unplugged")
+        super()._write(batch)
+
+
+def test_failed_batches_are_retried(tmp_path, caplog):
+    db_path = tmp_path / "contact.sqlite3"
+
+    async def crash():
+        queue = CrashingQueue(db_path, batch_size=1, flush_interval=0, failures=2)
+        for _ in range(7):
+            await queue.submit(validate(FORM))
+        await queue.close()
+        return queue.stats()
+
+    stats = asyncio.run(crash())
+
+    assert stats.written == count_rows(db_path) == 7
+    assert stats.failed == 0
+    assert "disk unplugged" in caplog.text
+
+
+def test_batches_failing_every_retry_are_counted(tmp_path, caplog):
+    db_path = tmp_path / "contact.sqlite3"
+
+    async def crash():
+        queue = CrashingQueue(
+            db_path, batch_size=1, flush_interval=0, retries=2, failures=-1
+        )
+        for _ in range(3):
+            await queue.submit(validate(FORM))
+        await queue.drain()
+        # The writer survived the lost batches.
+        queue.failures = 0
+        await queue.submit(validate(FORM))
+        await queue.close()
+        return queue.stats()
+
+    stats = asyncio.run(crash())
+
+    assert stats.failed == 3
+    assert stats.written == count_rows(db_path) == 1
+    assert stats.accepted == stats.written + stats.failed
+    assert caplog.text.count("Lost 1 contact messages") == 3
+
+
+class StoppingQueue(SubmissionQueue):
+    """A queue whose writer stops on its first batch."""
+
+    stopped = False
+
+    async def _next_batch(self):
+        if not self.stopped:
+            self.stopped = True
+            raise RuntimeError("writer bug")
+        return await super()._next_batch()
+
+
+def test_restarted_writer_keeps_queued_submissions(tmp_path, caplog):
+    db_path = tmp_path / "contact.sqlite3"
+
+    async def crash():
+        queue = StoppingQueue(db_path, flush_interval=0)
+        await queue.submit(validate(FORM))
+        while not queue._writer.done():
+            await asyncio.sleep(0.01)
+        waiting = queue.stats().queued
+        await queue.submit(validate(FORM))
+        await queue.close()
+        return waiting, queue.stats()
+
+    waiting, stats = asyncio.run(crash())
+
+    assert waiting == 1
+    assert stats.written == count_rows(db_path) == 2
+    assert "writer bug" in caplog.text
+    assert "1 messages wait" in caplog.text
@@ -0,0 +1,86 @@
+"""Fingerprints of the export inputs, computed in fresh processes."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+FINGERPRINT = "import json; from utils.export_cache import fingerprint; print(json.dumps(fingerprint()))"
+
+
+@pytest.fixture(scope="module")
+def app_copy(tmp_path_factory):
+    root = tmp_path_factory.mktemp("app")
+    for source in ("portofolio_reflex", "utils", "assets", "content"):
+        shutil.copytree(
+            ROOT / source, root / source, ignore=shutil.ignore_patterns("__pycache__")
+        )
+    shutil.copy(ROOT / "rxconfig.py", root)
+    return root
+
+
+def fingerprint(root: Path) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(root),
+        "REFLEX_WEB_WORKDIR": str(root / ".web"),
+        "REFLEX_CHECK_LATEST_VERSION": "false",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", FINGERPRINT],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def edit(path: Path, old: str, new: str):
+    text = path.read_text()
+    assert old in text
+    path.write_text(text.replace(old, new))
+
+
+def test_fingerprints_follow_the_sources(app_copy):
+    built = fingerprint(app_copy)
+    assert fingerprint(app_copy) == built
+
+    edit(
+        app_copy / "portofolio_reflex" / "components" / "test.py",
+        "a Data Engineer at Orange",
+        "an engineer at Orange",
+    )
+    page_changed = fingerprint(app_copy)
+    assert page_changed["pages"]["index"]["code"] != built["pages"]["index"]["code"]
+    assert page_changed["layout"] == built["layout"]
+    assert page_changed["build"] == built["build"]
+
+    edit(
+        app_copy / "portofolio_reflex" / "templates" / "template.py",
+        'accent_color="gray"',
+        'accent_color="blue"',
+    )
+    (app_copy / "assets" / "photo_mehdi.jpg").write_bytes(b"not a photo")
+    layout_changed = fingerprint(app_copy)
+    assert layout_changed["layout"] != page_changed["layout"]
+    assert (
+        layout_changed["assets"]["/photo_mehdi.jpg"]
+        != page_changed["assets"]["/photo_mehdi.jpg"]
+    )
+
+    edit(
+        app_copy / "portofolio_reflex" / "portofolio_reflex.py",
+        "app = RateLimitedApp(",
+        "app = RateLimitedApp(\n    html_lang='fr',",
+    )
+    assert fingerprint(app_copy)["build"] != layout_changed["build"]
@@ -0,0 +1,81 @@
+"""Short runs of the load harness against the stand-in deployment."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from tests.integration_tests.load import (
+    Profile,
+    backend_paths,
+    drive,
+    matches,
+    percentile,
+    stand_in,
+)
+
+
+@pytest.fixture(scope="module")
+def deployment():
+    with stand_in() as url:
+        yield url
+
+
+def test_routes_follow_the_caddyfile():
+    patterns = backend_paths()
+
+    assert matches("/_event/", patterns)
+    assert matches("/ping", patterns)
+    assert matches("/_upload/file", patterns)
+    assert not matches("/", patterns)
+    assert not matches("/pingu", patterns)
+    assert not matches("/metrics", patterns)
+
+
+def test_percentiles_by_nearest_rank():
+    ordered = [float(value) for value in range(1, 101)]
+
+    assert percentile(ordered, 0.5) == 50
+    assert percentile(ordered, 0.99) == 99
+    assert percentile(ordered, 1) == 100
+    assert percentile([7.0], 0.95) == 7
+
+
+def test_mixed_load_is_served(deployment):
+    profile = Profile(
+        duration=2, static_rate=20, ping_rate=10, sessions=10, event_rate=2
+    )
+
+    report = asyncio.run(drive(deployment, profile))
+
+    assert report.keys() == {"static", "ping", "connect", "event"}
+    assert report["static"]["requests"] == 40
+    assert report["ping"]["requests"] == 20
+    assert report["connect"]["requests"] == 10
+    assert report["event"]["requests"] >= 20
+    for kind in report.values():
+        assert kind["error_rate"] == 0
+        latency = kind["latency_ms"]
+        assert 0 < latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+
+def test_limited_visitor_errors_are_reported(deployment):
+    profile = Profile(duration=1, static_rate=0, ping_rate=30, sessions=0, visitors=1)
+
+    report = asyncio.run(drive(deployment, profile))
+
+    # The burst of /ping, then the requests refused by the limits of the backend.
+    assert report["ping"]["errors"]["429"] >= 15
+    assert report["ping"]["error_rate"] > 0.5
+
+
+def test_forwarded_ips_are_replaced_like_caddy(deployment):
+    profile = Profile(
+        duration=1, static_rate=0, ping_rate=30, sessions=0, visitors=1000
+    )
+
+    report = asyncio.run(drive(deployment, profile, forwarded=True))
+
+    # Without trusted_proxies, the visitors share the IP of the load generator.
+    assert report["ping"]["errors"]["429"] >= 15
@@ -0,0 +1,260 @@
+"""Scrapes of the metrics endpoint of the backend."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+import reflex as rx
+from reflex.istate.manager.memory import StateManagerMemory
+from reflex.istate.manager.token import BaseStateToken
+from reflex_base.event import Event
+from reflex_base.registry import RegistrationContext
+from reflex_base.utils.format import format_event_handler
+
+from portofolio_reflex.metrics import (
+    CONTENT_TYPE,
+    MAX_SERIES,
+    PATH,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    TimedEventProcessor,
+    process_metrics,
+)
+from portofolio_reflex.rate_limit import (
+    EventLimiter,
+    Limit,
+    LimitedEventProcessor,
+    RateLimitedApp,
+    RateLimitMiddleware,
+)
+
+
+class TimedState(rx.State):
+    """A state whose event takes a while to process."""
+
+    @rx.event
+    async def wait(self):
+        await asyncio.sleep(0.01)
+
+
+WAIT = format_event_handler(TimedState.wait)
+
+
+class LimitedTimedProcessor(TimedEventProcessor, LimitedEventProcessor):
+    """The processor of the app, timing the events admitted by the limiter."""
+
+
+async def backend(scope, receive, send):
+    """An ASGI app answering pong to HTTP and accepting the websockets of /_event."""
+    if scope["type"] == "websocket":
+        if scope["path"].startswith("/_event"):
+            await send({"type": "websocket.accept"})
+        await send({"type": "websocket.close", "code": 1000})
+        return
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"pong"})
+
+
+async def request(
+    app, path: str, type_: str = "http"
+) -> tuple[int | None, dict, bytes]:
+    """Send a request from the local host.
+
+    Returns:
+        The status, headers and body of the response.
+    """
+    scope = {
+        "type": type_,
+        "method": "GET",
+        "path": path,
+        "client": ("127.0.0.1", 50000),
+        "headers": [],
+    }
+    status, headers, body = None, {}, b""
+
+    async def receive():
+        if type_ == "websocket":
+            return {"type": "websocket.connect"}
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        nonlocal status, headers, body
+        if message["type"] == "http.response.start":
+            status, headers = message["status"], dict(message["headers"])
+        elif message["type"] == "http.response.body":
+            body += message["body"]
+
+    await app(scope, receive, send)
+    return status, headers, body
+
+
+def scrape(app) -> tuple[dict, dict[str, float]]:
+    """Get the headers and the samples of the metrics endpoint, by name and labels."""
+    status, headers, body = asyncio.run(request(app, PATH))
+    assert status == 200
+    samples = {}
+    for line in body.decode().splitlines():
+        if line and not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return headers, samples
+
+
+def test_requests_are_counted_by_route_and_status():
+    app = MetricsMiddleware(
+        RateLimitMiddleware(backend, limits={"/ping": Limit(1, 3)}), metrics=Registry()
+    )
+
+    async def run():
+        for _ in range(5):
+            await request(app, "/ping")
+        await request(app, "/_event/", "websocket")
+        await request(app, "/elsewhere", "websocket")
+        await request(app, "/favicon.ico")
+
+    asyncio.run(run())
+    headers, samples = scrape(app)
+
+    assert headers[b"content-type"] == CONTENT_TYPE
+    assert (
+        samples['portfolio_requests_total{route="/ping",type="http",status="200"}'] == 3
+    )
+    assert (
+        samples['portfolio_requests_total{route="/ping",type="http",status="429"}'] == 2
+    )
+    assert (
+        samples[
+            'portfolio_requests_total{route="/_event",type="websocket",status="101"}'
+        ]
+        == 1
+    )
+    assert (
+        samples['portfolio_requests_total{route="other",type="websocket",status="403"}']
+        == 1
+    )
+    assert (
+        samples['portfolio_requests_total{route="other",type="http",status="200"}'] == 1
+    )
+    # The scrape is counted once answered.
+    _, samples = scrape(app)
+    assert (
+        samples['portfolio_requests_total{route="/metrics",type="http",status="200"}']
+        == 1
+    )
+
+
+def test_histogram_buckets_are_cumulated():
+    histogram = Histogram("duration_seconds", "Durations.", "handler", buckets=(0.1, 1))
+    metrics = Registry()
+    metrics.register(lambda: [histogram.collect()])
+    for amount in (0.05, 0.1, 0.5, 2):
+        histogram.observe('say "hi"', amount)
+
+    _, samples = scrape(MetricsMiddleware(backend, metrics=metrics))
+
+    handler = 'handler="say \\"hi\\""'
+    assert samples[f'duration_seconds_bucket{{{handler},le="0.1"}}'] == 2
+    assert samples[f'duration_seconds_bucket{{{handler},le="1"}}'] == 3
+    assert samples[f'duration_seconds_bucket{{{handler},le="+Inf"}}'] == 4
+    assert samples[f"duration_seconds_count{{{handler}}}"] == 4
+    assert samples[f"duration_seconds_sum{{{handler}}}"] == pytest.approx(2.65)
+
+
+def test_histogram_series_are_bounded():
+    histogram = Histogram("duration_seconds", "Durations.", "handler")
+
+    for index in range(MAX_SERIES * 5):
+        histogram.observe(f"handler-{index}", 0.01)
+
+    counts = {
+        labels["handler"]: value
+        for name, labels, value in histogram.collect().samples
+        if name == "duration_seconds_count"
+    }
+    assert len(counts) == MAX_SERIES + 1
+    assert counts["other"] == MAX_SERIES * 4
+
+
+def test_process_metrics_are_scraped():
+    metrics = Registry()
+    metrics.register(process_metrics)
+
+    _, samples = scrape(MetricsMiddleware(backend, metrics=metrics))
+
+    assert samples["process_resident_memory_bytes"] > 0
+    assert 'python_gc_pending_objects{generation="0"}' in samples
+    assert 'python_gc_collections_total{generation="2"}' in samples
+
+
+def test_rebuilt_middleware_replaces_its_collector():
+    metrics = Registry()
+    MetricsMiddleware(backend, metrics=metrics)
+    app = MetricsMiddleware(backend, metrics=metrics)
+    asyncio.run(request(app, "/ping"))
+
+    _, _, body = asyncio.run(request(app, PATH))
+
+    assert body.decode().count("# TYPE portfolio_requests counter") == 1
+    assert (
+        'portfolio_requests_total{route="/ping",type="http",status="200"} 1'
+        in body.decode()
+    )
+
+
+def process(processor, events: int) -> list:
+    """Enqueue events from a single visitor and wait for them to be processed."""
+
+    async def run():
+        state_manager = StateManagerMemory()
+        # The visitor already loaded the page.
+        async with state_manager.modify_state(
+            BaseStateToken(ident="session", cls=TimedState)
+        ) as root:
+            root.router_data = {"ip": "10.0.0.1"}
+        async with processor.configure(state_manager=state_manager):
+            futures = [
+                await processor.enqueue(
+                    "session", Event(name=WAIT, router_data={"ip": "10.0.0.1"})
+                )
+                for _ in range(events)
+            ]
+            await asyncio.gather(*futures, return_exceptions=True)
+        return futures
+
+    return asyncio.run(run())
+
+
+def test_event_handlers_are_timed():
+    durations = Histogram(
+        "duration_seconds", "Durations.", "handler", buckets=(0.005, 1)
+    )
+    metrics = Registry()
+    metrics.register(lambda: [durations.collect()])
+
+    futures = process(TimedEventProcessor(durations=durations), 3)
+    assert [future.exception() for future in futures] == [None] * 3
+    _, samples = scrape(MetricsMiddleware(backend, metrics=metrics))
+
+    handler = f'handler="{WAIT}"'
+    assert samples[f'duration_seconds_bucket{{{handler},le="0.005"}}'] == 0
+    assert samples[f'duration_seconds_bucket{{{handler},le="1"}}'] == 3
+    assert samples[f"duration_seconds_count{{{handler}}}"] == 3
+    assert samples[f"duration_seconds_sum{{{handler}}}"] >= 0.03
+
+
+def test_refused_events_are_not_timed():
+    durations = Histogram("duration_seconds", "Durations.", "handler")
+    limiter = EventLimiter(Limit(0.1, 2))
+
+    # An app per registration context, the other tests may have created one.
+    with RegistrationContext.get().fork():
+        app = RateLimitedApp(event_limiter=limiter)
+
+    futures = process(LimitedTimedProcessor(durations=durations, middleware=app), 5)
+
+    assert sum(future.cancelled() for future in futures) == 3
+    assert limiter.stats().in_flight == 0
+    counts = {name: value for name, _, value in durations.collect().samples}
+    assert counts["duration_seconds_count"] == 2
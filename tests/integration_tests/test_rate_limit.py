@@ -0,0 +1,249 @@
+"""Load tests of the per-client limits of the backend traffic."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import reflex as rx
+from reflex.istate.manager.token import BaseStateToken
+from reflex_base.event import Event
+from reflex_base.registry import RegistrationContext
+from reflex_base.utils.format import format_event_handler
+
+from portofolio_reflex.rate_limit import (
+    EventLimiter,
+    Limit,
+    LimitedEventProcessor,
+    RateLimitedApp,
+    RateLimiter,
+    RateLimitMiddleware,
+)
+from portofolio_reflex.state_manager import BoundedStateManager, install_state_manager
+
+# How long the backend takes to answer a request or process an event.
+WORK_DELAY = 0.02
+
+
+class LoadState(rx.State):
+    """A state whose event takes a while to process."""
+
+    processed: int = 0
+
+    @rx.event
+    async def work(self):
+        await asyncio.sleep(WORK_DELAY)
+        self.processed += 1
+
+
+WORK = format_event_handler(LoadState.work)
+
+
+class SlowBackend:
+    """An ASGI app answering every request after a delay, tracking its concurrency."""
+
+    def __init__(self):
+        self.in_flight = self.peak = 0
+
+    async def __call__(self, scope, receive, send):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(WORK_DELAY)
+        self.in_flight -= 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"pong"})
+
+
+async def get(app, path: str, ip: str) -> tuple[int, float]:
+    """Send a request through Caddy from a client IP.
+
+    Returns:
+        The status of the response and how long it took.
+    """
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "client": ("127.0.0.1", 50000),
+        "headers": [(b"x-forwarded-for", ip.encode())],
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, time.perf_counter() - start
+
+
+class Frontend:
+    """Collect the events sent back to the visitors."""
+
+    def __init__(self):
+        self.updates = []
+
+    async def emit_update(self, update, token):
+        self.updates.append((token, update))
+
+
+def test_bucket_refills_over_time():
+    limiter = RateLimiter(Limit(rate=2, burst=3))
+
+    assert [limiter.acquire("ip", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("ip", now=0) == 0.5
+    assert limiter.acquire("ip", now=0.5) == 0
+    assert limiter.acquire("other", now=0.5) == 0
+
+
+def test_buckets_are_bounded():
+    limiter = RateLimiter(Limit(rate=1, burst=1), max_keys=100)
+
+    for index in range(10_000):
+        limiter.acquire(f"10.0.{index // 256}.{index % 256}", now=0)
+
+    assert len(limiter) == 100
+
+
+def test_abusive_client_does_not_starve_the_others():
+    async def run():
+        backend = SlowBackend()
+        app = RateLimitMiddleware(
+            backend, limits={"/ping": Limit(5, 10)}, max_in_flight=1000
+        )
+        abusive = [get(app, "/ping", "6.6.6.6") for _ in range(900)]
+        others = [get(app, "/ping", f"10.0.0.{index}") for index in range(100)]
+        start = time.perf_counter()
+        results = await asyncio.gather(*abusive, *others)
+        return results[:900], results[900:], time.perf_counter() - start
+
+    abusive, others, elapsed = asyncio.run(run())
+
+    accepted = [status for status, _ in abusive if status == 200]
+    assert len(accepted) <= 10 + 5 * elapsed + 1
+    assert {status for status, _ in abusive} == {200, 429}
+    assert all(status == 200 for status, _ in others)
+    # The refused requests never reached the slow backend.
+    assert max(latency for status, latency in abusive if status == 429) < WORK_DELAY
+
+
+def test_overload_is_shed():
+    async def run():
+        backend = SlowBackend()
+        app = RateLimitMiddleware(
+            backend, limits={"/ping": Limit(5, 10)}, max_in_flight=20
+        )
+        results = await asyncio.gather(
+            *(
+                get(app, "/ping", f"10.0.{index // 256}.{index % 256}")
+                for index in range(500)
+            )
+        )
+        return backend, app, results
+
+    backend, app, results = asyncio.run(run())
+
+    statuses = [status for status, _ in results]
+    assert backend.peak == 20
+    assert statuses.count(200) >= 20
+    assert statuses.count(503) == app.overloaded > 0
+    assert max(latency for status, latency in results if status == 503) < WORK_DELAY
+    assert app.in_flight == 0
+
+
+def test_unlimited_paths_pass_through():
+    async def run():
+        app = RateLimitMiddleware(SlowBackend(), limits={"/ping": Limit(1, 1)})
+        return await asyncio.gather(
+            *(get(app, "/pinged", "6.6.6.6") for _ in range(50))
+        )
+
+    assert {status for status, _ in asyncio.run(run())} == {200}
+
+
+def test_event_flood_is_limited(tmp_path):
+    sessions, events = 50, 20
+
+    async def run():
+        limiter = EventLimiter(
+            limits={WORK: Limit(10, 5)}, max_session_in_flight=2, max_in_flight=40
+        )
+        frontend = Frontend()
+        state_manager = BoundedStateManager(tmp_path / "states.sqlite3")
+        # The visitors already loaded the page.
+        for session in range(sessions):
+            token = BaseStateToken(ident=f"session-{session}", cls=LoadState)
+            async with state_manager.modify_state(token) as root:
+                root.router_data = {"ip": f"10.0.0.{session}"}
+        # An app per registration context, the other tests may have created one.
+        with RegistrationContext.get().fork():
+            processor = LimitedEventProcessor(
+                middleware=RateLimitedApp(event_limiter=limiter)
+            )
+        peak = 0
+        async with processor.configure(
+            state_manager=state_manager, event_namespace=frontend
+        ):
+            futures = []
+            for _ in range(events):
+                for session in range(sessions):
+                    event = Event(name=WORK, router_data={"ip": f"10.0.0.{session}"})
+                    futures.append(await processor.enqueue(f"session-{session}", event))
+                    peak = max(peak, limiter.in_flight)
+                # Each visitor keeps clicking while the backend is busy.
+                await asyncio.sleep(WORK_DELAY / 4)
+            await asyncio.gather(*futures, return_exceptions=True)
+        return limiter, frontend, futures, peak
+
+    limiter, frontend, futures, peak = asyncio.run(run())
+
+    stats = limiter.stats()
+    refused = [future for future in futures if future.cancelled()]
+    assert (
+        stats.accepted + stats.rate_limited + stats.session_busy + stats.overloaded
+        == (sessions * events)
+    )
+    assert stats.accepted == sessions * events - len(refused)
+    assert stats.session_busy > 0
+    assert stats.overloaded > 0
+    assert peak <= 40
+    # Every accepted event was processed, then released.
+    assert stats.in_flight == 0
+    assert limiter._session_in_flight == {}
+    # Each visitor was told at most once why its events were refused.
+    notified = [token for token, update in frontend.updates if update.events]
+    assert 0 < len(notified) == len(set(notified)) <= sessions
+
+
+def test_app_processes_the_events_through_the_limiter(tmp_path):
+    """``RateLimitedApp`` must be updated along with Reflex when this fails."""
+
+    class Processor(LimitedEventProcessor):
+        pass
+
+    limiter = EventLimiter()
+    # An app per registration context, the other tests may have created one.
+    with RegistrationContext.get().fork():
+        app = RateLimitedApp(event_limiter=limiter, event_processor_class=Processor)
+    install_state_manager(app, BoundedStateManager(tmp_path / "states.sqlite3"))
+
+    async def run():
+        async with app._setup_event_processor():
+            processor = app.event_processor
+            future = await processor.enqueue(
+                "session", Event(name=WORK, router_data={"ip": "10.0.0.1"})
+            )
+            await asyncio.gather(future, return_exceptions=True)
+            return processor
+
+    processor = asyncio.run(run())
+    assert type(processor) is Processor
+    assert processor.middleware is app
+    assert processor.backend_exception_handler == app.backend_exception_handler
+    assert processor.limiter is limiter
+    assert (limiter.stats().accepted, limiter.stats().in_flight) == (1, 0)
@@ -0,0 +1,156 @@
+"""Eviction, expiration and spilling of the bounded state manager."""
+
+from __future__ import annotations
+
+import asyncio
+
+import reflex as rx
+from reflex.istate.manager.token import BaseStateToken
+from reflex.state import State
+
+from portofolio_reflex.contact import ContactState
+from portofolio_reflex.state_manager import (
+    BoundedStateManager,
+    dump_state,
+    install_state_manager,
+    installed_state_manager,
+)
+
+
+def token(index: int) -> BaseStateToken:
+    return BaseStateToken(ident=f"session-{index}", cls=ContactState)
+
+
+async def send(manager: BoundedStateManager, index: int):
+    """Simulate an event changing the state of a session."""
+    async with manager.modify_state(token(index)) as root:
+        contact = await root.get_state(ContactState)
+        contact.status = f"Message {index}"
+
+
+async def status(manager: BoundedStateManager, index: int) -> str:
+    root = await manager.get_state(token(index))
+    return (await root.get_state(ContactState)).status
+
+
+def session_size() -> int:
+    return len(dump_state(token(0), State(_reflex_internal_init=True)))
+
+
+def test_state_round_trip(tmp_path):
+    async def run():
+        manager = BoundedStateManager(tmp_path / "states.sqlite3")
+        await send(manager, 0)
+        root = await manager.get_state(token(0))
+        await manager.close()
+        return root, manager.stats()
+
+    root, stats = asyncio.run(run())
+
+    contact = root.substates[ContactState.get_name()]
+    assert contact.status == "Message 0"
+    assert contact.parent_state is root
+    assert stats.misses == 1
+    assert stats.hits == 1
+
+
+def test_memory_is_capped_and_spills_to_disk(tmp_path):
+    sessions = 50
+
+    async def run():
+        manager = BoundedStateManager(
+            tmp_path / "states.sqlite3", max_bytes=session_size() * 5
+        )
+        for index in range(sessions):
+            await send(manager, index)
+        during = manager.stats()
+        statuses = [await status(manager, index) for index in range(sessions)]
+        after = manager.stats()
+        await manager.close()
+        return during, statuses, after
+
+    during, statuses, after = asyncio.run(run())
+
+    assert during.entries <= 6
+    assert during.bytes <= session_size() * 5
+    assert during.evictions >= sessions - 6
+    # Every session came back from the database.
+    assert statuses == [f"Message {index}" for index in range(sessions)]
+    assert after.disk_hits >= sessions - 6
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    db_path = tmp_path / "states.sqlite3"
+
+    async def run():
+        manager = BoundedStateManager(db_path)
+        await send(manager, 0)
+        await manager.close()
+        restarted = BoundedStateManager(db_path)
+        result = await status(restarted, 0)
+        await restarted.close()
+        return result, restarted.stats()
+
+    result, stats = asyncio.run(run())
+
+    assert result == "Message 0"
+    assert stats.disk_hits == 1
+
+
+def test_idle_sessions_expire(tmp_path):
+    async def run():
+        manager = BoundedStateManager(tmp_path / "states.sqlite3", token_expiration=0)
+        await send(manager, 0)
+        await send(manager, 1)
+        result = await status(manager, 0)
+        await manager.close()
+        return result, manager.stats()
+
+    result, stats = asyncio.run(run())
+
+    assert result == ""
+    assert stats.expirations >= 1
+    assert stats.misses == 3
+
+
+def test_locks_are_dropped_once_released(tmp_path):
+    async def append(manager: BoundedStateManager):
+        async with manager.modify_state(token(0)) as root:
+            contact = await root.get_state(ContactState)
+            status = contact.status
+            await asyncio.sleep(0)
+            contact.status = status + "x"
+
+    async def run():
+        manager = BoundedStateManager(
+            tmp_path / "states.sqlite3", max_bytes=session_size() * 2
+        )
+        await asyncio.gather(*(append(manager) for _ in range(20)))
+        for index in range(1, 200):
+            await send(manager, index)
+        locks = len(manager._locks)
+        result = await status(manager, 0)
+        await manager.close()
+        return locks, result, manager.stats()
+
+    locks, result, stats = asyncio.run(run())
+
+    # The concurrent events on a session were serialized by its lock.
+    assert result == "x" * 20
+    assert stats.evictions > 0
+    assert locks == 0
+
+
+def test_app_uses_the_installed_state_manager(tmp_path):
+    """Reflex reads the private attribute set by ``install_state_manager``."""
+    app = rx.App()
+    manager = install_state_manager(
+        app, BoundedStateManager(tmp_path / "states.sqlite3")
+    )
+
+    async def run():
+        async with app._setup_event_processor():
+            return app._event_processor._root_context.state_manager
+
+    assert app.state_manager is installed_state_manager(app) is manager
+    assert asyncio.run(run()) is manager
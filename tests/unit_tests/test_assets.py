@@ -0,0 +1,66 @@
+"""Sizes of the mirrored images and rewrite of the image sources."""
+
+from __future__ import annotations
+
+import pytest
+import reflex as rx
+
+from utils import assets
+from utils.assets import AssetsPlugin, ImageSizeError, MissingAssetError, image_size
+
+
+@pytest.mark.parametrize(
+    ("svg", "size"),
+    [
+        (
+            b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 12"></svg>',
+            (24, 12),
+        ),
+        (b"<svg viewBox='-5,-5, 30.5,20'/>", (30, 20)),
+        (b'<?xml version="1.0"?>\n<svg width="40px" height="20"></svg>', (40, 20)),
+        (b'<svg viewBox="0 0 0 0" width="10" height="5"/>', (10, 5)),
+    ],
+)
+def test_svg_sizes(svg, size):
+    assert image_size(svg) == size
+
+
+def test_svg_without_size_is_rejected():
+    with pytest.raises(ImageSizeError):
+        image_size(b'<svg width="100%"><path d="M0 0"/></svg>')
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "ASSETS_DIR", tmp_path)
+    (tmp_path / "logo.svg").write_text('<svg viewBox="0 0 8 8"/>')
+    plugin = AssetsPlugin()
+    plugin.manifest = {
+        "https://cdn.example.com/photo.png": {
+            "src": "/remote/0123.png",
+            "width": 640,
+            "height": 480,
+        },
+    }
+    return plugin
+
+
+def enter(plugin: AssetsPlugin, src: str) -> rx.Component:
+    image = rx.image(src=src)
+    plugin.enter_component(image, page_context=None, compile_context=None)
+    return image
+
+
+def test_remote_sources_point_to_their_copy(plugin):
+    image = enter(plugin, "https://cdn.example.com/photo.png")
+
+    assert str(image.src) == '"/remote/0123.png"'
+    assert image.custom_attrs == {"width": 640, "height": 480}
+    assert str(enter(plugin, "/logo.svg").src) == '"/logo.svg"'
+
+
+def test_missing_images_fail_the_build(plugin):
+    with pytest.raises(MissingAssetError, match="not mirrored"):
+        enter(plugin, "https://cdn.example.com/other.png")
+    with pytest.raises(MissingAssetError, match="does not exist"):
+        enter(plugin, "/missing.png")
@@ -0,0 +1,204 @@
+"""Weighing of an exported page against the performance budget."""
+
+from __future__ import annotations
+
+import gzip
+
+import pytest
+import reflex as rx
+
+from utils.budget import (
+    Resource,
+    check_budget,
+    document_resources,
+    measure_route,
+    transferred_size,
+    tree_resources,
+)
+
+DOCUMENT = """\
+<!doctype html>
+<html>
+<head>
+  <link rel="stylesheet" href="/assets/root.css">
+  <link rel="stylesheet" href="/assets/print.css" media="print">
+  <link rel="modulepreload" href="/assets/entry.js">
+  <link rel="preload" href="/fonts/inter.woff2" as="font">
+  <link rel="icon" href="/favicon.ico">
+  <script src="/assets/sync.js"></script>
+  <script type="module" src="/assets/entry.js"></script>
+  <script src="https://cdn.example.com/widget.js" async></script>
+</head>
+<body>
+  <img src="/img/photo.webp">
+  <img src="data:image/webp;base64,AAAA">
+  <script src="/assets/late.js"></script>
+</body>
+</html>
+"""
+
+# A repetitive script, compressed well below its size.
+SCRIPT = b"console.log('portfolio');\n" * 200
+
+
+@pytest.fixture
+def export(tmp_path):
+    """A small export: one prerendered page and the files it loads."""
+    files = {
+        "index.html": DOCUMENT.encode(),
+        "assets/root.css": b"body { margin: 0; }\n" * 50,
+        "assets/print.css": b"nav { display: none; }\n",
+        "assets/entry.js": SCRIPT,
+        "assets/entry.js.br": b"b" * 100,
+        "assets/entry.js.gz": b"g" * 120,
+        "assets/sync.js": b"var sync = 1;\n",
+        "assets/late.js": b"var late = 1;\n",
+        "fonts/inter.woff2": b"w" * 3000,
+        "img/photo.webp": b"p" * 5000,
+    }
+    for name, data in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return tmp_path
+
+
+def page_resources(static_dir):
+    document = static_dir / "index.html"
+    return [Resource("/index.html"), *document_resources(document)]
+
+
+def test_document_resources(export):
+    parsed = {
+        resource.url: resource.blocking
+        for resource in document_resources(export / "index.html")
+    }
+
+    assert parsed == {
+        "/assets/root.css": True,
+        "/assets/print.css": False,
+        "/assets/entry.js": False,
+        "/fonts/inter.woff2": False,
+        "/assets/sync.js": True,
+        "https://cdn.example.com/widget.js": False,
+        "/img/photo.webp": False,
+        "data:image/webp;base64,AAAA": False,
+        # Only scripts in the head block the first paint.
+        "/assets/late.js": False,
+    }
+
+
+def test_tree_resources():
+    page = rx.box(
+        rx.el.picture(
+            rx.el.source(
+                src_set="/img/a-48.avif 48w, /img/a-96.avif 96w", type="image/avif"
+            ),
+            rx.el.source(src_set="/img/a-96.webp 96w", type="image/webp"),
+            rx.el.img(src="/a.jpg"),
+        ),
+        rx.el.img(src="/logo.svg"),
+        # Only known at runtime.
+        rx.el.img(src=rx.Var("state.photo")),
+    )
+    head = [
+        rx.el.script(src="/head.js"),
+        rx.el.script(src="/deferred.js", defer=True),
+        rx.el.link(rel="stylesheet", href="/fonts.css"),
+        rx.el.link(rel="preload", href="/fonts/inter.woff2"),
+    ]
+
+    assert tree_resources([page, *head]) == [
+        # The widest candidate of the preferred source of the picture.
+        Resource("/img/a-96.avif"),
+        Resource("/logo.svg"),
+        Resource("/head.js", blocking=True),
+        Resource("/deferred.js"),
+        Resource("/fonts.css", blocking=True),
+        Resource("/fonts/inter.woff2"),
+    ]
+
+
+def test_transferred_size(export):
+    # The smallest precompressed copy.
+    assert transferred_size(export / "assets/entry.js") == 100
+    # Binary formats are sent as is.
+    assert transferred_size(export / "img/photo.webp") == 5000
+    # Other text files are compressed like the server would.
+    css = (export / "assets/root.css").read_bytes()
+    assert transferred_size(export / "assets/root.css") == len(
+        gzip.compress(css, compresslevel=9)
+    )
+
+
+def test_route_weight(export):
+    report = measure_route(
+        "/", page_resources(export), export, origin="https://portfolio.example"
+    )
+
+    text = [
+        transferred_size(export / name)
+        for name in ("index.html", "assets/root.css", "assets/print.css")
+    ]
+    scripts = [
+        100,
+        transferred_size(export / "assets/sync.js"),
+        transferred_size(export / "assets/late.js"),
+    ]
+    assert report.bytes_by_kind == {
+        "js": sum(scripts),
+        "css": sum(text[1:]),
+        "font": 3000,
+        "image": 5000,
+    }
+    assert report.compressed_bytes == sum(text) + sum(scripts) + 3000 + 5000
+    assert report.raw_bytes == sum(
+        (export / name).stat().st_size
+        for name in (
+            "index.html",
+            "assets/root.css",
+            "assets/print.css",
+            "assets/entry.js",
+            "assets/sync.js",
+            "assets/late.js",
+            "fonts/inter.woff2",
+            "img/photo.webp",
+        )
+    )
+    assert report.third_party_origins == {"https://cdn.example.com"}
+    assert report.render_blocking == 2
+    assert report.missing == []
+
+
+def test_within_budget(export):
+    report = measure_route("/", page_resources(export), export)
+    metrics = report.metrics()
+
+    assert check_budget([report], {"default": metrics}) == []
+
+
+def test_over_budget(export):
+    (export / "assets/late.js").unlink()
+    report = measure_route("/", page_resources(export), export)
+    budget = {
+        "default": {
+            "image_bytes": 4999,
+            "third_party_origins": 0,
+            "render_blocking": 5,
+        },
+        "routes": {"/": {"render_blocking": 1}},
+    }
+
+    assert check_budget([report], budget) == [
+        "/: image_bytes is 5000, over 4999",
+        "/: third_party_origins is 1, over 0",
+        "/: render_blocking is 2, over 1",
+        "/: /assets/late.js is not exported",
+    ]
+
+
+def test_unknown_metrics_are_refused(export):
+    report = measure_route("/", page_resources(export), export)
+
+    with pytest.raises(ValueError, match="Unknown budget metric js_kb"):
+        check_budget([report], {"default": {"js_kb": 100}})
@@ -0,0 +1,47 @@
+"""Caching of the exported frontend by Caddy."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+
+STATIC_CADDY = Path(__file__).resolve().parents[2] / "caddy" / "static.caddy"
+
+
+def matcher(name: str) -> str:
+    """Get the regular expression of a ``path_regexp`` matcher of static.caddy."""
+    match = re.search(
+        rf"^@{name} (?:not )?path_regexp (\S+)$", STATIC_CADDY.read_text(), re.MULTILINE
+    )
+    assert match, f"No @{name} path_regexp matcher in {STATIC_CADDY}"
+    return match.group(1)
+
+
+def test_every_url_gets_a_single_policy():
+    assert matcher("revalidated") == matcher("fingerprinted")
+
+
+@pytest.mark.parametrize(
+    ("path", "immutable"),
+    [
+        ("/assets/index-BXk3_aB1.js", True),
+        ("/fonts/inter-400.3f2a9c81d0.woff2", True),
+        ("/img/photo_mehdi-160.8c9cf5c6ac.webp", True),
+        ("/icons/sprite.0a1b2c3d4e.svg", True),
+        ("/remote/0123456789abcdef.webp", True),
+        # The manifests keep their name across builds.
+        ("/fonts/manifest.json", False),
+        ("/img/manifest.json", False),
+        ("/icons/manifest.json", False),
+        ("/remote/manifest.json", False),
+        ("/", False),
+        ("/index.html", False),
+        ("/sitemap.xml", False),
+        ("/photo_mehdi.jpg", False),
+        ("/img/photo.webp", False),
+    ],
+)
+def test_only_hashed_names_are_immutable(path, immutable):
+    assert bool(re.fullmatch(matcher("fingerprinted"), path)) is immutable
@@ -0,0 +1,40 @@
+"""Walk of the component trees inspected at build time."""
+
+from __future__ import annotations
+
+import reflex as rx
+from reflex_components_core.base.error_boundary import ErrorBoundary
+
+from utils.assets import iter_image_sources
+from utils.components import iter_text
+
+
+class GalleryState(rx.State):
+    """A state picking which images are shown."""
+
+    mode: str = ""
+    photos: list[str] = []
+
+
+def test_every_branch_is_walked():
+    page = rx.box(
+        rx.cond(
+            GalleryState.mode == "photo",
+            rx.image(src="/photo.webp"),
+            rx.match(
+                GalleryState.mode,
+                ("logo", rx.image(src="/logo.svg")),
+                rx.foreach(GalleryState.photos, lambda _: rx.image(src="/item.webp")),
+            ),
+        ),
+    )
+
+    assert list(iter_image_sources(page)) == ["/photo.webp", "/logo.svg", "/item.webp"]
+
+
+def test_components_passed_in_props_are_walked():
+    page = ErrorBoundary.create(
+        rx.text("Portfolio"), fallback_render=rx.text("Something went wrong")
+    )
+
+    assert list(iter_text(page)) == ["Portfolio", "Something went wrong"]
@@ -0,0 +1,156 @@
+"""Loading and validation of the content files of the portfolio."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from portofolio_reflex import content
+from portofolio_reflex.content import (
+    CONTENT_DIR,
+    SECTIONS,
+    ContentError,
+    Project,
+    Skill,
+    load,
+)
+
+PROJECTS_TOML = """\
+[[projects]]
+title = "Spark pipeline"
+description = "Batch ingestion."
+tags = ["Spark", "Airflow"]
+
+[[projects]]
+title = "Dashboard"
+description = "Live metrics."
+"""
+
+PROJECTS = (
+    Project("Spark pipeline", "Batch ingestion.", ("Spark", "Airflow")),
+    Project("Dashboard", "Live metrics."),
+)
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count the content files parsed."""
+    calls = []
+    parse = content._parse
+
+    def counting_parse(path, data):
+        calls.append(path.name)
+        return parse(path, data)
+
+    monkeypatch.setattr(content, "_parse", counting_parse)
+    return calls
+
+
+@pytest.mark.parametrize(
+    ("name", "text"),
+    [
+        ("projects.toml", PROJECTS_TOML),
+        (
+            "projects.json",
+            json.dumps(
+                [
+                    {
+                        "title": "Spark pipeline",
+                        "description": "Batch ingestion.",
+                        "tags": ["Spark", "Airflow"],
+                    },
+                    {"title": "Dashboard", "description": "Live metrics."},
+                ]
+            ),
+        ),
+        (
+            "projects.yaml",
+            "projects:\n"
+            "  - title: Spark pipeline\n"
+            "    description: Batch ingestion.\n"
+            "    tags: [Spark, Airflow]\n"
+            "  - title: Dashboard\n"
+            "    description: Live metrics.\n",
+        ),
+    ],
+)
+def test_every_format_loads_the_same_entries(tmp_path, name, text):
+    (tmp_path / name).write_text(text)
+
+    assert load("projects", tmp_path) == PROJECTS
+
+
+def test_toml_wins_over_the_other_formats(tmp_path):
+    (tmp_path / "projects.toml").write_text(PROJECTS_TOML)
+    (tmp_path / "projects.json").write_text("[]")
+
+    assert load("projects", tmp_path) == PROJECTS
+
+
+@pytest.mark.parametrize(
+    ("entry", "message"),
+    [
+        ('title = "Dashboard"', "missing field description"),
+        ('title = "Dashboard"\ndescription = "x"\nstars = "5"', "unknown fields stars"),
+        ('title = 3\ndescription = "x"', "title must be a string"),
+        (
+            'title = "Dashboard"\ndescription = "x"\ntags = "Spark"',
+            "tags must be a list of strings",
+        ),
+        (
+            'title = "Dashboard"\ndescription = "x"\ntags = ["Spark", 3]',
+            "tags must be a list of strings",
+        ),
+    ],
+)
+def test_invalid_entries_name_their_file_and_index(tmp_path, entry, message):
+    path = tmp_path / "projects.toml"
+    path.write_text(f"{PROJECTS_TOML}\n[[projects]]\n{entry}\n")
+
+    with pytest.raises(ContentError) as error:
+        load("projects", tmp_path)
+
+    assert str(error.value) == f"{path}[2]: {message}."
+
+
+def test_invalid_files_are_refused(tmp_path):
+    (tmp_path / "skills.json").write_text("{")
+    with pytest.raises(ContentError, match=r"skills\.json: "):
+        load("skills", tmp_path)
+
+    (tmp_path / "skills.json").write_text('{"projects": []}')
+    with pytest.raises(ContentError, match="expected a list of skills"):
+        load("skills", tmp_path)
+
+    (tmp_path / "skills.json").write_text('["Python"]')
+    with pytest.raises(
+        ContentError, match=r"skills\.json\[0\]: expected a table, got str"
+    ):
+        load("skills", tmp_path)
+
+    with pytest.raises(ContentError, match="No content file for projects"):
+        load("projects", tmp_path)
+
+
+def test_unchanged_files_are_not_parsed_again(tmp_path, parses):
+    path = tmp_path / "skills.json"
+    path.write_text(
+        '[{"name": "Python", "logo": "/python.svg", "logo_alt": "Python logo"}]'
+    )
+
+    first = load("skills", tmp_path)
+    assert first == (Skill("Python", "/python.svg", "Python logo"),)
+    # Rewritten with the same content: the digest, not the mtime, is compared.
+    path.write_text(path.read_text())
+    assert load("skills", tmp_path) is first
+    assert parses == ["skills.json"]
+
+    path.write_text('[{"name": "SQL", "logo": "/sql.svg", "logo_alt": "SQL logo"}]')
+    assert load("skills", tmp_path) == (Skill("SQL", "/sql.svg", "SQL logo"),)
+    assert parses == ["skills.json", "skills.json"]
+
+
+@pytest.mark.parametrize("section", SECTIONS)
+def test_the_portfolio_content_is_valid(section):
+    assert load(section, CONTENT_DIR)
@@ -0,0 +1,86 @@
+"""Split of the deferred content of the pages into lazily imported modules."""
+
+from __future__ import annotations
+
+import reflex as rx
+from reflex_base.plugins.compiler import CompileContext, CompilerHooks, PageContext
+
+from portofolio_reflex import content
+from portofolio_reflex.components.deferred import (
+    DeferredSection,
+    create_deferred,
+    create_section,
+)
+from portofolio_reflex.pages.index.page import create_portfolio_page
+from utils.components import iter_text
+from utils.deferred import DeferredSectionsPlugin
+
+
+def compile_page(root: rx.Component) -> tuple[rx.Component, dict]:
+    """Compile a page with the plugin.
+
+    Returns:
+        The compiled page and the content moved to modules, by export name.
+    """
+    page = PageContext(name="index", route="/", root_component=root)
+    context = CompileContext(pages=[])
+    with context, page:
+        compiled = CompilerHooks(plugins=(DeferredSectionsPlugin(),)).compile_component(
+            root, page_context=page, compile_context=context
+        )
+    modules = {
+        name: definition.component
+        for (name, _), definition in context.auto_memo_components.items()
+    }
+    return compiled, modules
+
+
+def test_deferred_content_is_moved_to_its_module():
+    root = create_section(
+        rx.heading("Get in Touch"),
+        create_deferred(
+            rx.text("The form"), name="contact_form", intrinsic_size="auto 30rem"
+        ),
+        id="contact",
+    )
+
+    compiled, modules = compile_page(root)
+
+    heading, placeholder = compiled.render()["children"]
+    assert heading["children"] == [{"contents": '"Get in Touch"'}]
+    assert placeholder["name"] == "DeferredSection"
+    assert placeholder["children"] == []
+    assert sorted(placeholder["props"]) == [
+        'intrinsicSize:"auto 30rem"',
+        'load:(() => import("$/utils/components/ContactForm"))',
+        'name:"ContactForm"',
+    ]
+    assert list(iter_text(modules["ContactForm"])) == ["The form"]
+    # The tree of the app is left as is.
+    assert list(iter_text(root)) == ["Get in Touch", "The form"]
+
+
+def test_empty_placeholders_are_left_alone():
+    _, modules = compile_page(rx.box(DeferredSection.create(name="empty")))
+
+    assert modules == {}
+
+
+def test_only_the_contact_form_is_deferred():
+    compiled, modules = compile_page(create_portfolio_page())
+
+    assert list(modules) == ["ContactForm"]
+    text = " ".join(iter_text(compiled))
+    for heading in (
+        "About Me",
+        "Work Experience",
+        "Skills",
+        "Featured Projects",
+        "Get in Touch",
+    ):
+        assert heading in text
+    # The content of the sections is prerendered.
+    for entry in content.load("experience"):
+        assert entry.title in text
+    for project in content.load("projects"):
+        assert project.title in text
@@ -0,0 +1,85 @@
+"""Choice of a static or backend deployment from the pages of the app."""
+
+from __future__ import annotations
+
+import pytest
+import reflex as rx
+from reflex_base.registry import RegistrationContext
+from reflex_components_core.base.error_boundary import ErrorBoundary
+
+from utils.deploy import backend_requirements, resolve_mode
+
+
+class FormState(rx.State):
+    """A state behind a form of the pages."""
+
+    sent: bool = False
+    items: list[str] = []
+
+    @rx.event
+    def send(self):
+        self.sent = True
+
+
+def home() -> rx.Component:
+    return rx.box(
+        rx.heading("Portfolio"), rx.cond(True, rx.text("Static"), rx.text("Never"))
+    )
+
+
+def send_button() -> rx.Component:
+    return rx.button("Send", on_click=FormState.send)
+
+
+@pytest.fixture
+def app():
+    """An app of its own, without the states and pages of the other tests."""
+    with RegistrationContext():
+        app = rx.App()
+        app.add_page(home, route="/")
+        yield app
+
+
+def test_static_pages_need_no_backend(app, capsys):
+    assert backend_requirements(app) == []
+    assert resolve_mode(app) == "static"
+    assert resolve_mode(app, "static") == "static"
+    assert capsys.readouterr().err == ""
+
+
+@pytest.mark.parametrize(
+    "contact",
+    [
+        lambda: rx.box(rx.cond(True, rx.box(send_button()), rx.text("Closed"))),
+        lambda: rx.box(rx.match("form", ("form", send_button()), rx.text("Closed"))),
+        lambda: rx.box(rx.foreach(["Send"], lambda _: send_button())),
+        lambda: ErrorBoundary.create(rx.text("Contact"), fallback_render=send_button()),
+        lambda: rx.text(rx.cond(FormState.sent, "Sent", "Not sent")),
+    ],
+    ids=["cond", "match", "foreach", "prop", "var"],
+)
+def test_nested_state_requires_the_backend(app, contact):
+    app.add_page(contact, route="/contact")
+
+    assert backend_requirements(app) == ["page /contact uses state or server events"]
+
+
+def test_on_load_handlers_require_the_backend(app):
+    app.add_page(home, route="/sent", on_load=FormState.send)
+
+    assert backend_requirements(app) == ["page /sent has on_load handlers"]
+
+
+def test_resolve_mode(app, capsys):
+    app.add_page(send_button, route="/contact")
+
+    assert resolve_mode(app, "backend") == "backend"
+    assert resolve_mode(app) == "backend"
+    assert capsys.readouterr().err == (
+        "WARNING: falling back to a backend deployment because:\n"
+        "  - page /contact uses state or server events\n"
+    )
+    with pytest.raises(
+        SystemExit, match="can not be deployed without a backend:\n  - page /contact"
+    ):
+        resolve_mode(app, "static")
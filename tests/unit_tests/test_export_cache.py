@@ -0,0 +1,89 @@
+"""Reuse and invalidation of the cached frontend export."""
+
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from utils.export_cache import CACHE_VERSION, compare, load_manifest, restore, store
+
+
+@pytest.fixture
+def fingerprints():
+    return {
+        "version": CACHE_VERSION,
+        "build": "build",
+        "state": "state",
+        "layout": "layout",
+        "assets": {"/photo.jpg": "photo", "/logo.svg": "logo", "/robots.txt": "robots"},
+        "pages": {
+            "index": {"code": "index", "assets": ["/logo.svg", "/photo.jpg"]},
+            "about": {"code": "about", "assets": ["/logo.svg"]},
+        },
+    }
+
+
+def test_unchanged_sources_reuse_the_export(fingerprints):
+    assert compare(fingerprints, copy.deepcopy(fingerprints)) == {}
+
+
+def test_changes_are_explained_by_page(fingerprints):
+    current = copy.deepcopy(fingerprints)
+    current["pages"]["about"]["code"] = "edited"
+    current["pages"]["blog"] = {"code": "blog", "assets": []}
+    current["assets"]["/photo.jpg"] = "retouched"
+
+    assert compare(fingerprints, current) == {
+        "index": "assets changed: /photo.jpg",
+        "about": "page changed",
+        "blog": "new page",
+    }
+
+
+def test_shared_changes_export_every_page(fingerprints):
+    current = copy.deepcopy(fingerprints)
+    current["layout"] = "edited"
+
+    assert compare(fingerprints, current) == dict.fromkeys(
+        ["*", "index", "about"], "layout changed"
+    )
+    assert compare(None, current)["index"] == "no cached export"
+    assert compare({**fingerprints, "version": 0}, current)["*"] == "no cached export"
+
+
+def test_unreferenced_assets_are_reported(fingerprints):
+    current = copy.deepcopy(fingerprints)
+    current["assets"]["/robots.txt"] = "edited"
+    del current["pages"]["about"]
+
+    assert compare(fingerprints, current) == {
+        "about": "page removed",
+        "*": "assets changed: /robots.txt",
+    }
+
+
+def test_stored_export_is_restored(tmp_path, fingerprints):
+    cache, static = tmp_path / "cache", tmp_path / "client"
+    (static / "assets").mkdir(parents=True)
+    (static / "index.html").write_text("<html></html>")
+    (static / "assets" / "app.js").write_text("render()")
+    store(cache, fingerprints, static)
+    (static / "index.html").write_text("stale")
+
+    manifest = load_manifest(cache)
+    assert compare(manifest, fingerprints) == {}
+    assert restore(cache, manifest, static)
+    assert (static / "index.html").read_text() == "<html></html>"
+
+
+def test_tampered_export_is_discarded(tmp_path, fingerprints):
+    cache, static = tmp_path / "cache", tmp_path / "client"
+    static.mkdir()
+    (static / "index.html").write_text("<html></html>")
+    store(cache, fingerprints, static)
+    (cache / "client" / "index.html").write_text("truncated")
+
+    assert not restore(cache, load_manifest(cache), static)
+    assert not static.exists()
+    assert load_manifest(tmp_path / "empty") is None
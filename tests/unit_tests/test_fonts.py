@@ -0,0 +1,176 @@
+"""Vendoring and subsetting of the web fonts."""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+import reflex as rx
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import TTFont
+
+from utils import fonts
+from utils.fonts import (
+    SYSTEM_FONTS,
+    ChecksumError,
+    FontSource,
+    build_fonts,
+    font_head_tags,
+    font_stack,
+    read_source,
+    subset_woff2,
+    used_weights,
+)
+
+
+def make_font(text: str) -> bytes:
+    """Build a TrueType font with a square glyph for each character."""
+    names = [".notdef", *(f"glyph{index}" for index in range(len(text)))]
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(char): name for char, name in zip(text, names[1:])})
+    pen = TTGlyphPen(None)
+    pen.moveTo((100, 0))
+    pen.lineTo((100, 700))
+    pen.lineTo((500, 700))
+    pen.lineTo((500, 0))
+    pen.closePath()
+    square = pen.glyph()
+    builder.setupGlyf({name: square for name in names})
+    builder.setupHorizontalMetrics({name: (600, 100) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    output = io.BytesIO()
+    builder.save(output)
+    return output.getvalue()
+
+
+def characters(woff2: bytes) -> set[str]:
+    return {chr(code) for code in TTFont(io.BytesIO(woff2)).getBestCmap()}
+
+
+FONT = make_font("ABCabc-é")
+
+
+@pytest.fixture
+def release(tmp_path):
+    """A release archive in a local directory and its pinned source."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as release:
+        release.writestr("Test-1.0/ttf/Test-Regular.ttf", FONT)
+        release.writestr("Test-1.0/ttf/Test-Bold.ttf", FONT)
+    data = archive.getvalue()
+    (tmp_path / "Test-1.0.zip").write_bytes(data)
+    return FontSource(
+        family="Test",
+        version="1.0",
+        url="https://fonts.example/Test-1.0.zip",
+        sha256=hashlib.sha256(data).hexdigest(),
+        files={400: "ttf/Test-Regular.ttf", 700: "ttf/Test-Bold.ttf"},
+    )
+
+
+def test_pinned_release_is_unpacked(release, tmp_path):
+    assert read_source(release, tmp_path) == {400: FONT, 700: FONT}
+
+
+def test_tampered_release_is_refused(release, tmp_path, monkeypatch):
+    (tmp_path / "Test-1.0.zip").write_bytes(b"not the release")
+    with pytest.raises(ChecksumError, match=f"expected {release.sha256}"):
+        read_source(release, tmp_path)
+
+    # A download not matching the digest is not cached either.
+    monkeypatch.setattr(fonts, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(
+        fonts.urllib.request, "urlopen", lambda url: io.BytesIO(b"not the release")
+    )
+    with pytest.raises(ChecksumError, match="https://fonts.example/Test-1.0.zip"):
+        read_source(release)
+    assert not (tmp_path / "cache").exists()
+
+
+def test_subset_keeps_the_used_glyphs():
+    subset = subset_woff2(FONT, "Abé")
+
+    assert subset[:4] == b"wOF2"
+    assert characters(subset) == {"A", "b", "é"}
+    assert len(subset) < len(FONT)
+
+
+def test_used_weights():
+    page = rx.box(
+        rx.heading("Mehdi", font_weight="700"), rx.text("Data", font_weight="bold")
+    )
+
+    # Only numeric weights are matched to font files.
+    assert used_weights(page) == {400, 700}
+
+
+@pytest.fixture
+def fonts_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fonts, "ASSETS_DIR", tmp_path / "assets")
+    monkeypatch.setattr(fonts, "FONTS_DIR", tmp_path / "assets" / "fonts")
+    monkeypatch.setattr(
+        fonts, "MANIFEST_PATH", tmp_path / "assets" / "fonts" / "manifest.json"
+    )
+    return tmp_path / "assets" / "fonts"
+
+
+def test_manifest_and_head_tags(release, tmp_path, fonts_dir, monkeypatch):
+    monkeypatch.setattr(fonts, "FONTS", [release])
+    (tmp_path / "assets" / "fonts").mkdir(parents=True)
+    (tmp_path / "assets" / "fonts" / "test-400.stale.woff2").write_bytes(b"")
+
+    manifest = build_fonts(rx.text("abc", font_weight="700"), tmp_path)
+
+    files = sorted(
+        path.name for path in (tmp_path / "assets" / "fonts").glob("*.woff2")
+    )
+    assert [font["src"] for font in manifest["fonts"]] == [
+        f"/fonts/{name}" for name in files
+    ]
+    assert [
+        (font["family"], font["version"], font["weight"]) for font in manifest["fonts"]
+    ] == [
+        ("Test", "1.0", 400),
+        ("Test", "1.0", 700),
+    ]
+    assert (
+        json.loads((tmp_path / "assets" / "fonts" / "manifest.json").read_text())
+        == manifest
+    )
+
+    *preloads, style = font_head_tags()
+    assert [str(preload.href).strip('"') for preload in preloads] == [
+        f"/fonts/{name}" for name in files
+    ]
+    assert all(preload.custom_attrs == {"as": "font"} for preload in preloads)
+    css = str(style.children[0].contents)
+    assert css.count("@font-face") == 2
+    assert "font-weight: 700; font-display: optional; src: url(/fonts/test-700." in css
+    assert font_stack() == f"'Test', {SYSTEM_FONTS}"
+
+
+def test_unpinned_releases_are_skipped(
+    release, tmp_path, fonts_dir, monkeypatch, caplog
+):
+    monkeypatch.setattr(fonts, "FONTS", [dataclasses.replace(release, sha256="")])
+
+    assert build_fonts(rx.text("abc"), tmp_path) == {"fonts": []}
+    assert "Test 1.0 is skipped, its digest is not pinned" in caplog.text
+    assert list(fonts_dir.glob("*.woff2")) == []
+    # The page does not name a font it does not serve.
+    assert font_head_tags() == []
+    assert font_stack() == SYSTEM_FONTS
+
+
+def test_system_fonts_before_the_fonts_are_built(fonts_dir):
+    assert font_head_tags() == []
+    assert font_stack() == SYSTEM_FONTS
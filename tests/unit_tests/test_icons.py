@@ -0,0 +1,124 @@
+"""Checks of the icon references against the sprite at compile time."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import tarfile
+
+import pytest
+import reflex as rx
+
+from utils import icons
+from utils.icons import ChecksumError, IconsPlugin, MissingIconError
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    path = tmp_path / "manifest.json"
+    monkeypatch.setattr(icons, "MANIFEST_PATH", path)
+    icons.load_manifest.cache_clear()
+    yield path
+    icons.load_manifest.cache_clear()
+
+
+@pytest.fixture
+def release(tmp_path, monkeypatch):
+    """A cached Lucide release holding a single icon, pinned by its integrity."""
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"><path d="M0 0h24"/></svg>'
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w:gz") as archive:
+        member = tarfile.TarInfo("package/icons/mail.svg")
+        member.size = len(svg)
+        archive.addfile(member, io.BytesIO(svg))
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / icons.LUCIDE_URL.rsplit("/", 1)[-1]).write_bytes(data.getvalue())
+    integrity = (
+        "sha512-" + base64.b64encode(hashlib.sha512(data.getvalue()).digest()).decode()
+    )
+    monkeypatch.setattr(icons, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(icons, "LUCIDE_INTEGRITY", integrity)
+    return svg
+
+
+def enter(plugin: IconsPlugin, href: str):
+    plugin.enter_component(
+        rx.el.svg.use(href=href), page_context=None, compile_context=None
+    )
+
+
+def test_icons_of_the_sprite_pass(manifest_path):
+    manifest_path.write_text(
+        json.dumps({"src": "/icons/sprite.abc.svg", "icons": ["mail"]})
+    )
+
+    enter(IconsPlugin(), "/icons/sprite.abc.svg#mail")
+
+
+def test_missing_icon_fails_the_build(manifest_path):
+    manifest_path.write_text(
+        json.dumps({"src": "/icons/sprite.abc.svg", "icons": ["mail"]})
+    )
+
+    with pytest.raises(MissingIconError, match="github"):
+        enter(IconsPlugin(), "/icons/sprite.abc.svg#github")
+    with pytest.raises(MissingIconError, match="mail"):
+        enter(IconsPlugin(), "/icons/sprite.old.svg#mail")
+
+
+def test_unbuilt_sprite_only_warns(manifest_path, caplog):
+    plugin = IconsPlugin()
+
+    with caplog.at_level("WARNING"):
+        enter(plugin, "#mail")
+        enter(plugin, "#github")
+
+    assert plugin.warned
+    assert caplog.text.count("python -m utils.icons") == 1
+
+
+def test_pinned_release_is_read(release):
+    assert icons.read_icons(["mail"]) == {"mail": release}
+
+
+def test_tampered_release_is_rejected(release, monkeypatch):
+    monkeypatch.setattr(
+        icons, "LUCIDE_INTEGRITY", "sha512-" + base64.b64encode(bytes(64)).decode()
+    )
+
+    with pytest.raises(ChecksumError, match="lucide-static"):
+        icons.read_icons(["mail"])
+
+
+def test_unpinned_release_is_not_downloaded(manifest_path, monkeypatch, caplog):
+    monkeypatch.setattr(icons, "LUCIDE_INTEGRITY", "")
+
+    with caplog.at_level("WARNING"):
+        assert icons.build_sprite(rx.el.svg.use(href="#mail")) == {}
+
+    assert "not pinned" in caplog.text
+    assert not manifest_path.exists()
+
+
+def test_manifest_is_read_once_per_build(manifest_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(icons, "ASSETS_DIR", tmp_path)
+    monkeypatch.setattr(icons, "ICONS_DIR", tmp_path / "icons")
+    source = tmp_path / "lucide"
+    source.mkdir()
+    (source / "mail.svg").write_text(
+        '<svg viewBox="0 0 24 24"><path d="M0 0h24"/></svg>'
+    )
+    manifest_path.write_text(
+        json.dumps({"src": "/icons/sprite.old.svg", "icons": ["mail"]})
+    )
+
+    assert icons.icon_href("mail") == "/icons/sprite.old.svg#mail"
+    manifest_path.unlink()
+    assert icons.icon_href("map_pin") == "/icons/sprite.old.svg#map-pin"
+
+    manifest = icons.build_sprite(rx.el.svg.use(href="#mail"), source)
+    assert icons.icon_href("mail") == f"{manifest['src']}#mail"
+    assert manifest["src"] != "/icons/sprite.old.svg"
@@ -0,0 +1,32 @@
+"""Variants of the local photos, encoded across processes."""
+
+from __future__ import annotations
+
+from PIL import Image
+
+from utils.images import FORMATS, encode_variants
+
+
+def test_variants_do_not_depend_on_the_jobs(tmp_path):
+    photo = tmp_path / "photo.png"
+    Image.new("RGB", (120, 60), "orange").save(photo)
+    serial_dir, parallel_dir = tmp_path / "serial", tmp_path / "parallel"
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+
+    serial, serial_report = encode_variants([photo], serial_dir, jobs=1)
+    parallel, parallel_report = encode_variants([photo], parallel_dir, jobs=3)
+
+    assert serial == parallel
+    assert serial[photo]["size"] == (120, 60)
+    for fmt in FORMATS:
+        assert [width for _, width in serial[photo]["sources"][fmt]] == [48, 96, 120]
+    assert sorted(path.name for path in parallel_dir.iterdir()) == sorted(
+        path.name for path in serial_dir.iterdir()
+    )
+    # Every format and width is its own job.
+    assert (serial_report.items, parallel_report.items, parallel_report.jobs) == (
+        6,
+        6,
+        3,
+    )
@@ -0,0 +1,188 @@
+"""Patch of the Reflex client connecting the event socket on demand."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from reflex_base.constants import Templates
+
+from utils.lazy_socket import MARKER, WARMUP_ATTRIBUTE, LazySocketError, lazy_connect
+
+# The parts of utils/state.js touched by the patch, as generated by Reflex.
+STATE_JS = """\
+const SYNC_LOCAL_STORAGE = "_sync_local_storage";
+
+let warmSocket = null;
+
+// Start only the transport while React is still preparing to mount. The
+// namespace stays disconnected until connect() installs all its handlers.
+if (typeof window !== "undefined") {
+  queueMicrotask(() => {
+    if (
+      socketStarted ||
+      document.visibilityState === "hidden"
+    ) {
+      return;
+    }
+    warmSocket = createSocket(getBackendURL(EVENTURL));
+  });
+}
+
+if (import.meta.hot) {
+  import.meta.hot.dispose(() => discardWarmSocket());
+}
+
+export const processEvent = async (socket, navigate, params) => {
+  if (!(socket && socket.connected) && isStateful()) {
+    return;
+  }
+};
+
+const connect = () => {
+  const pagehideHandler = () => {
+    if (document.visibilityState === "visible") {
+      socket.current.connect();
+    }
+  };
+};
+
+export const useEventLoop = () => {
+  const ensureSocketConnected = useCallback(async () => {
+    await connect();
+  });
+
+  const addEvents = (_events, event_actions) => {
+    if (!event_actions?.temporal) {
+      // Reconnect socket if needed for non-temporal events.
+      ensureSocketConnected();
+    }
+  };
+
+  useEffect(() => {
+    mounted.current = true;
+    ensureSocketConnected();
+    return () => {
+      mounted.current = false;
+    };
+  });
+};
+"""
+
+
+def test_client_connects_on_demand():
+    patched = lazy_connect(STATE_JS, idle_timeout=30)
+
+    # The warm-up block is removed, the rest of the module is kept.
+    assert "queueMicrotask" not in patched
+    assert "Start only the transport" not in patched
+    assert "let warmSocket = null;\n\nif (import.meta.hot) {\n" in patched
+    # The helpers follow the event queue constants.
+    assert f'const SYNC_LOCAL_STORAGE = "_sync_local_storage";\n\n{MARKER}\n' in patched
+    assert "idleTimeout: 30000" in patched
+    assert 'document.visibilityState === "visible" && !lazySocket.idle' in patched
+    assert "useCallback(async () => {\n    scheduleIdleDisconnect(socket);\n" in patched
+    assert "if (!event_actions?.temporal && _events.some(needsBackend)) {" in patched
+    assert "isStateful() &&\n    needsBackend(event_queue[0])\n" in patched
+    # Mounting no longer connects, focusing a marked element does.
+    assert "mounted.current = true;\n    ensureSocketConnected();" not in patched
+    assert f'closest?.("[{WARMUP_ATTRIBUTE}]")' in patched
+    assert 'document.removeEventListener("focusin", warmUp);' in patched
+
+
+def test_patch_is_applied_once():
+    patched = lazy_connect(STATE_JS)
+
+    assert lazy_connect(patched) == patched
+    assert patched.count(MARKER) == 1
+
+
+@pytest.mark.parametrize(
+    "anchor",
+    [
+        'const SYNC_LOCAL_STORAGE = "_sync_local_storage";\n',
+        "// Start only the transport while React is still preparing to mount.",
+        "      // Reconnect socket if needed for non-temporal events.\n",
+        "  if (!(socket && socket.connected) && isStateful()) {\n",
+        "    mounted.current = true;\n    ensureSocketConnected();\n",
+    ],
+)
+def test_missing_anchors_fail_clearly(anchor):
+    with pytest.raises(
+        LazySocketError, match="update utils/lazy_socket.py for this Reflex version"
+    ):
+        lazy_connect(STATE_JS.replace(anchor, ""))
+
+
+def test_unterminated_removal_fails_clearly():
+    with pytest.raises(LazySocketError, match="import.meta.hot"):
+        lazy_connect(STATE_JS.replace("if (import.meta.hot) {", "if (hot) {"))
+
+
+def test_installed_reflex_client_can_be_patched():
+    state_js = (Path(Templates.Dirs.WEB_TEMPLATE) / "utils" / "state.js").read_text()
+
+    patched = lazy_connect(state_js)
+
+    assert MARKER in patched
+    assert "queueMicrotask" not in patched
+
+
+def declaration(js: str, start: str) -> str:
+    """Get a top-level declaration of the client, from its start to its closing brace."""
+    begin = js.index(start)
+    return js[begin : js.index("\n};\n", begin) + 4].removeprefix("export ")
+
+
+def process_disconnected(state_js: str, events: list[str]) -> dict:
+    """Run ``processEvent`` of a client without socket on a queue of events."""
+    script = "\n".join(
+        [
+            'const SYNC_LOCAL_STORAGE = "_sync_local_storage";',
+            "let backend_state_mismatch = false;",
+            f"const event_queue = {json.dumps([{'name': name} for name in events])};",
+            "const applied = [];",
+            "const applyEvent = async (event) => { applied.push(event.name); };",
+            "const applyRestEvent = applyEvent;",
+            declaration(state_js, MARKER) if MARKER in state_js else "",
+            declaration(state_js, "export const isStateful"),
+            declaration(state_js, "export const processEvent"),
+            "processEvent({ connected: false }).then(() => console.log(JSON.stringify(",
+            "  { applied, queued: event_queue.map((event) => event.name) })));",
+        ]
+    )
+    output = subprocess.run(
+        ["node", "--input-type=module"],
+        input=script,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is not installed")
+def test_frontend_events_do_not_wait_for_the_socket():
+    state_js = (Path(Templates.Dirs.WEB_TEMPLATE) / "utils" / "state.js").read_text()
+    events = [
+        "_call_script",
+        "reflex___state____state.contact_state.submit",
+        "_redirect",
+    ]
+
+    # The Reflex client holds every event until the socket is connected.
+    assert process_disconnected(state_js, events) == {"applied": [], "queued": events}
+    # The patched one applies the events before the first one needing the backend.
+    assert process_disconnected(lazy_connect(state_js), events) == {
+        "applied": ["_call_script"],
+        "queued": events[1:],
+    }
+    assert process_disconnected(
+        lazy_connect(state_js), ["_call_script", "_redirect"]
+    ) == {
+        "applied": ["_call_script", "_redirect"],
+        "queued": [],
+    }
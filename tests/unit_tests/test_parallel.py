@@ -0,0 +1,39 @@
+"""Order and timing of the stages run across processes."""
+
+from __future__ import annotations
+
+import os
+import time
+
+from utils.parallel import run_stage
+
+
+def slow_square(value: int) -> tuple[int, int]:
+    # The first items finish last.
+    time.sleep(0.01 * (5 - value))
+    return value * value, os.getpid()
+
+
+def test_results_follow_the_items():
+    items = range(5)
+
+    serial, serial_report = run_stage("squares", slow_square, items, jobs=1)
+    parallel, parallel_report = run_stage("squares", slow_square, items, jobs=3)
+
+    assert (
+        [square for square, _ in parallel]
+        == [square for square, _ in serial]
+        == [0, 1, 4, 9, 16]
+    )
+    assert {pid for _, pid in serial} == {os.getpid()}
+    assert os.getpid() not in {pid for _, pid in parallel}
+    assert (serial_report.jobs, parallel_report.jobs) == (1, 3)
+    assert parallel_report.items == 5
+
+
+def test_jobs_are_capped_by_the_items():
+    results, report = run_stage("empty", slow_square, [], jobs=4)
+
+    assert results == []
+    assert report.jobs == 1
+    assert report.work == 0
@@ -0,0 +1,80 @@
+"""Selection of the prerendered routes and of their exported files."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from utils.prerender import page_files, prerendered_routes, restrict_prerender
+from utils.routes import RouteIndex
+
+CONFIG_JS = 'export default {"basename": "/", "future": {}, "ssr": false, "prerender": true, "build": "build"};'
+
+
+def test_only_opted_in_static_routes_are_prerendered():
+    routes = RouteIndex(
+        [
+            {"route": "/", "prerender": True},
+            {"route": "/projects", "prerender": False},
+            {"route": "/projects/[slug]", "prerender": True},
+            {"route": "/blog"},
+            {"route": "/about", "prerender": True},
+        ]
+    )
+
+    assert sorted(prerendered_routes(routes)) == ["/", "/about"]
+
+
+def test_the_config_lists_the_routes_to_prerender():
+    config_js = restrict_prerender(CONFIG_JS, ["/", "/about"])
+
+    assert config_js.startswith("export default ")
+    assert config_js.endswith(";")
+    config = json.loads(config_js.removeprefix("export default ").removesuffix(";"))
+    assert config == {
+        "basename": "/",
+        "future": {},
+        "ssr": False,
+        "prerender": ["/", "/about"],
+        "build": "build",
+    }
+
+
+def test_no_route_disables_prerendering():
+    config_js = restrict_prerender(CONFIG_JS, [])
+
+    config = json.loads(config_js.removeprefix("export default ").removesuffix(";"))
+    assert config["prerender"] is False
+
+
+def test_the_config_is_unchanged_when_the_build_does_not_prerender():
+    config_js = 'export default {"basename": "/", "ssr": false};'
+
+    assert restrict_prerender(config_js, ["/"]) == config_js
+
+
+def test_an_unexpected_config_is_an_error():
+    with pytest.raises(ValueError, match="export default"):
+        restrict_prerender('module.exports = {"prerender": true};', ["/"])
+
+
+def test_page_files(tmp_path):
+    (tmp_path / "about").mkdir()
+    (tmp_path / "index.html").write_text("<html></html>")
+    (tmp_path / "about" / "index.html").write_text("<html></html>")
+    (tmp_path / "about.html").write_text("<html></html>")
+    (tmp_path / "blog").mkdir()
+    (tmp_path / "blog" / "index.html").write_text("<html></html>")
+
+    assert page_files(tmp_path, "/") == [tmp_path / "index.html"]
+    assert page_files(tmp_path, "/about") == [
+        tmp_path / "about" / "index.html",
+        tmp_path / "about.html",
+    ]
+    assert page_files(tmp_path, "/about/") == [
+        tmp_path / "about" / "index.html",
+        tmp_path / "about.html",
+    ]
+    assert page_files(tmp_path, "/blog") == [tmp_path / "blog" / "index.html"]
+    assert page_files(tmp_path, "/missing") == []
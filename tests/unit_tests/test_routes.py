@@ -0,0 +1,71 @@
+"""Matching of paths against the route trie."""
+
+from __future__ import annotations
+
+import pytest
+
+from utils.routes import RouteIndex
+
+
+@pytest.fixture
+def index():
+    return RouteIndex(
+        [
+            {"route": "/"},
+            {"route": "/projects/new"},
+            {"route": "/projects/[slug]"},
+            {"route": "/projects/[slug]/edit"},
+            {"route": "/docs/[[...path]]"},
+            {"route": "/files/[...path]"},
+            {"route": "/files/readme"},
+        ]
+    )
+
+
+def test_static_segments_win_over_parameters(index):
+    assert index.match("/projects/new").route == "/projects/new"
+    assert index.match("/projects/new").params == {}
+    assert index.match("/projects/spark").params == {"slug": "spark"}
+
+
+def test_dead_end_static_branch_backtracks(index):
+    found = index.match("/projects/new/edit")
+
+    assert found.route == "/projects/[slug]/edit"
+    assert found.params == {"slug": "new"}
+    assert index.match("/projects/new/delete") is None
+
+
+def test_catch_alls(index):
+    assert index.match("/docs").params == {"path": []}
+    assert index.match("/docs/guide/setup").params == {"path": ["guide", "setup"]}
+    assert index.match("/files") is None
+    assert index.match("/files/readme").route == "/files/readme"
+    assert index.match("/files/readme/old").params == {"path": ["readme", "old"]}
+
+
+def test_longest_prefix(index):
+    assert index.longest_prefix("/projects/new/edit/draft") == "/projects/[slug]/edit"
+    assert index.longest_prefix("/projects/new/delete") == "/projects/new"
+    assert index.longest_prefix("/files/readme") == "/files/readme"
+    assert index.longest_prefix("/files/a/b") == "/files/[...path]"
+    assert index.longest_prefix("/unknown/page") == "/"
+
+
+def test_longest_prefix_of_a_deep_ambiguous_path():
+    # Every level has a static branch and a parameter branch.
+    chain = [["a"] * depth for depth in range(1, 13)]
+    index = RouteIndex(
+        [{"route": "/" + "/".join(segments)} for segments in chain]
+        + [
+            {"route": "/" + "/".join([*segments[:-1], "[p]", "edit"])}
+            for segments in chain
+        ]
+    )
+    deep = "/" + "/".join(chain[-1])
+
+    assert index.longest_prefix(deep + "/b/c") == deep
+    assert index.longest_prefix(deep + "/edit") == "/" + "/".join(
+        ["a"] * 11 + ["[p]", "edit"]
+    )
+    assert index.longest_prefix("/a/a/a/a/a/x/edit/more") == "/a/a/a/a/a/[p]/edit"
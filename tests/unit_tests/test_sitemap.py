@@ -0,0 +1,125 @@
+"""Route files and navigation generated from the route trie."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from utils.routes import RouteIndex
+from utils.sitemap import (
+    NAVIGATION_PATH,
+    ROBOTS_PATH,
+    SITEMAP_PATH,
+    RouteFiles,
+    build_route_files,
+    changed_files,
+    navigation_links,
+    navigation_tree,
+)
+
+
+@pytest.fixture
+def index():
+    return RouteIndex(
+        [
+            {
+                "route": "/",
+                "title": "Home",
+                "sections": {"about": "About", "contact": "Contact"},
+            },
+            {"route": "/projects", "title": "Projects", "description": "Side projects"},
+            {"route": "/projects/[slug]"},
+            {"route": "/blog/posts/first", "title": "First post"},
+        ]
+    )
+
+
+def test_routes_nest_under_their_closest_registered_ancestor(index):
+    assert navigation_tree(index) == [
+        {
+            "route": "/",
+            "title": "Home",
+            "sections": [
+                {"id": "about", "title": "About"},
+                {"id": "contact", "title": "Contact"},
+            ],
+            "children": [
+                # /blog and /blog/posts are not registered.
+                {"route": "/blog/posts/first", "title": "First post", "children": []},
+                {
+                    "route": "/projects",
+                    "title": "Projects",
+                    "description": "Side projects",
+                    "children": [{"route": "/projects/[slug]", "children": []}],
+                },
+            ],
+        }
+    ]
+
+
+def test_route_files_list_the_static_routes(index):
+    files = build_route_files(index, "https://example.com/")
+
+    assert files[SITEMAP_PATH] == (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        "  <url><loc>https://example.com/</loc></url>\n"
+        "  <url><loc>https://example.com/blog/posts/first</loc></url>\n"
+        "  <url><loc>https://example.com/projects</loc></url>\n"
+        "</urlset>\n"
+    )
+    assert files[ROBOTS_PATH].splitlines() == [
+        "User-agent: *",
+        "Disallow: /_event/",
+        "Sitemap: https://example.com/sitemap.xml",
+    ]
+    assert json.loads(files[NAVIGATION_PATH]) == navigation_tree(index)
+
+
+def test_only_the_changed_routes_are_serialized_again(index):
+    route_files = RouteFiles()
+    first = route_files.build(index, "https://example.com")
+    assert route_files.serialized == [
+        "/",
+        "/blog/posts/first",
+        "/projects",
+        "/projects/[slug]",
+    ]
+
+    assert route_files.build(index, "https://example.com") == first
+    assert route_files.serialized == []
+
+    index.add("/projects", title="Work")
+    changed = route_files.build(index, "https://example.com")
+    assert route_files.serialized == ["/projects"]
+    assert changed == build_route_files(index, "https://example.com")
+
+    route_files.build(index, "https://example.org")
+    assert len(route_files.serialized) == 4
+
+
+def test_identical_files_are_not_written_again(index, tmp_path):
+    files = build_route_files(index, "https://example.com")
+    assert changed_files(files, tmp_path) == files
+
+    for path, content in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(content)
+    assert changed_files(files, tmp_path) == {}
+
+    (tmp_path / ROBOTS_PATH).write_text("User-agent: *\n")
+    assert changed_files(files, tmp_path) == {ROBOTS_PATH: files[ROBOTS_PATH]}
+
+
+def test_navigation_links_follow_the_routes(index):
+    assert navigation_links(index, "/") == [
+        ("#about", "About"),
+        ("#contact", "Contact"),
+        ("/blog/posts/first", "First post"),
+        ("/projects", "Projects"),
+    ]
+    assert navigation_links(index, "/projects") == [
+        ("/", "Home"),
+        ("/blog/posts/first", "First post"),
+    ]
@@ -0,0 +1,65 @@
+"""Reuse and invalidation of the backend artifacts prepared at build time."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from portofolio_reflex.startup import (
+    load_artifacts,
+    manifest_path,
+    marker_path,
+    source_digest,
+)
+
+
+@pytest.fixture
+def backend_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("REFLEX_WEB_WORKDIR", str(tmp_path / ".web"))
+    marker_path().parent.mkdir(parents=True)
+    marker_path().write_text("[]")
+    return marker_path().parent
+
+
+def test_digest_follows_the_sources(tmp_path):
+    (tmp_path / "rxconfig.py").write_text("config = None\n")
+    (tmp_path / "portofolio_reflex" / "pages").mkdir(parents=True)
+    page = tmp_path / "portofolio_reflex" / "pages" / "index.py"
+    page.write_text("TITLE = 'Home'\n")
+    built = source_digest(tmp_path)
+
+    assert source_digest(tmp_path) == built
+    page.write_text("TITLE = 'About'\n")
+    assert source_digest(tmp_path) != built
+
+
+def test_digest_follows_the_content(tmp_path):
+    (tmp_path / "content").mkdir()
+    projects = tmp_path / "content" / "projects.toml"
+    projects.write_text('[[projects]]\ntitle = "Spark"\n')
+    built = source_digest(tmp_path)
+
+    projects.write_text('[[projects]]\ntitle = "Flink"\n')
+    assert source_digest(tmp_path) != built
+
+
+def test_artifacts_matching_the_sources_are_reused(backend_dir):
+    manifest_path().write_text(json.dumps({"digest": source_digest()}))
+
+    assert load_artifacts()
+    assert marker_path().exists()
+
+
+def test_stale_artifacts_are_discarded(backend_dir):
+    manifest_path().write_text(json.dumps({"digest": "stale"}))
+
+    assert not load_artifacts()
+    assert not marker_path().exists()
+    assert not manifest_path().exists()
+
+
+def test_marker_of_a_previous_run_is_reused(backend_dir):
+    assert load_artifacts()
+    marker_path().unlink()
+    assert not load_artifacts()
@@ -0,0 +1,38 @@
+"""Static styles compiled to shared classes across compiles of one process."""
+
+from __future__ import annotations
+
+import reflex as rx
+
+from portofolio_reflex.components.factory import component_factory
+from utils.components import iter_components
+from utils.style_classes import StyleClassesPlugin
+
+
+@component_factory
+def card(title: str) -> rx.Component:
+    return rx.box(
+        rx.text(title, color="gray", font_size="1.2em"),
+        padding="1em",
+        class_name="card",
+    )
+
+
+def compile_stylesheet(plugin: StyleClassesPlugin) -> str:
+    page = rx.vstack(card("Spark"), card("Airflow"), card("Spark"))
+    for component in iter_components(page):
+        plugin.enter_component(component, page_context=None, compile_context=None)
+    _, stylesheet = plugin.stylesheet_task()
+    return stylesheet
+
+
+def test_memoized_components_keep_their_classes():
+    plugin = StyleClassesPlugin()
+
+    first = compile_stylesheet(plugin)
+    second = compile_stylesheet(plugin)
+
+    assert second == first
+    assert "padding:1em" in first
+    assert "color:gray" in first
+    assert card("Spark").class_name.startswith("card s-")
@@ -0,0 +1,304 @@
+"""Mirror the remote images of the portfolio into hashed local assets.
+
+Every external ``src`` of the image components is downloaded once, stored
+under ``assets/remote`` with a content-hashed name and recorded in a manifest
+together with its intrinsic size. At compile time, ``AssetsPlugin`` rewrites
+the image sources to the local copies and fails the build if an image is
+neither mirrored nor present in ``assets/``.
+
+Usage:
+    python -m utils.assets [--from-dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import re
+import urllib.request
+from pathlib import Path
+from typing import Iterator, Protocol
+from urllib.parse import urlparse
+
+import reflex as rx
+from reflex.plugins import Plugin
+
+from utils.components import iter_components, literal
+
+ASSETS_DIR = Path("assets")
+REMOTE_DIR = ASSETS_DIR / "remote"
+MANIFEST_PATH = REMOTE_DIR / "manifest.json"
+
+
+# An SVG length or coordinate, e.g. `-0.5`, `24` or `1e2`.
+SVG_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+
+
+class MissingAssetError(FileNotFoundError):
+    """An image source is neither mirrored nor part of the assets."""
+
+
+class ImageSizeError(ValueError):
+    """The intrinsic size of an image can not be read."""
+
+
+class Fetcher(Protocol):
+    """Something able to download the content of a URL."""
+
+    def fetch(self, url: str) -> bytes:
+        """Download a remote file.
+
+        Args:
+            url: The URL of the file.
+
+        Returns:
+            The content of the file.
+        """
+
+
+class HttpFetcher:
+    """Fetch files over the network."""
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+
+    def fetch(self, url: str) -> bytes:
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return response.read()
+
+
+class DirectoryFetcher:
+    """Fetch files from a local mirror laid out as ``<root>/<host>/<path>``, for offline builds."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def fetch(self, url: str) -> bytes:
+        parsed = urlparse(url)
+        path = self.root / parsed.netloc / parsed.path.lstrip("/")
+        if not path.is_file():
+            raise MissingAssetError(f"{url} is not mirrored in {self.root}")
+        return path.read_bytes()
+
+
+def is_remote(src: str) -> bool:
+    """Whether an image source points to another origin."""
+    return src.startswith(("http://", "https://", "//"))
+
+
+def iter_image_sources(root: rx.Component) -> Iterator[str]:
+    """Get the static sources of the images of a page.
+
+    Args:
+        root: The compiled page tree.
+
+    Yields:
+        The ``src`` of every image with a literal source.
+    """
+    for component in iter_components(root):
+        if getattr(component, "tag", None) == "img":
+            src = literal(getattr(component, "src", None))
+            if isinstance(src, str):
+                yield src
+
+
+def svg_size(data: bytes) -> tuple[int, int]:
+    """Get the intrinsic size of an SVG image.
+
+    Args:
+        data: The content of the image.
+
+    Returns:
+        The width and height of its ``viewBox``, or else of its ``width`` and
+        ``height`` attributes in pixels.
+
+    Raises:
+        ImageSizeError: If the image has neither.
+    """
+    tag = re.search(rb"<svg\b[^>]*>", data)
+    attributes = (
+        dict(re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag[0].decode()))
+        if tag
+        else {}
+    )
+
+    view_box = re.split(r"[\s,]+", attributes.get("viewBox", "").strip())
+    if len(view_box) == 4 and all(
+        re.fullmatch(SVG_NUMBER, value) for value in view_box
+    ):
+        width, height = float(view_box[2]), float(view_box[3])
+        if width > 0 and height > 0:
+            return int(width), int(height)
+
+    lengths = [
+        re.fullmatch(rf"\s*({SVG_NUMBER})\s*(?:px)?\s*", attributes.get(name, ""))
+        for name in ("width", "height")
+    ]
+    if all(lengths) and all(float(length[1]) > 0 for length in lengths):
+        return int(float(lengths[0][1])), int(float(lengths[1][1]))
+    raise ImageSizeError(
+        "The SVG image has neither a viewBox nor a width and height in pixels."
+    )
+
+
+def image_size(data: bytes) -> tuple[int, int]:
+    """Get the intrinsic size of an image.
+
+    Args:
+        data: The content of a raster or SVG image.
+
+    Returns:
+        The width and height of the image, in pixels.
+
+    Raises:
+        ImageSizeError: If an SVG image has no size, see ``svg_size``.
+    """
+    if data.lstrip().startswith((b"<svg", b"<?xml")):
+        return svg_size(data)
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return image.size
+
+
+def image_extension(data: bytes) -> str:
+    """Get the file extension matching the format of an image."""
+    if data.lstrip().startswith((b"<svg", b"<?xml")):
+        return "svg"
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return image.format.lower().replace("jpeg", "jpg")
+
+
+def load_manifest() -> dict[str, dict]:
+    """Load the mirrored images.
+
+    Returns:
+        The local source, size and hash of each mirrored URL.
+    """
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def ingest(urls: list[str], fetcher: Fetcher) -> dict[str, dict]:
+    """Mirror remote images into the assets.
+
+    Args:
+        urls: The remote images to mirror.
+        fetcher: How to download them.
+
+    Returns:
+        The updated manifest.
+
+    Raises:
+        ImageSizeError: If the size of an image can not be read.
+    """
+    manifest = load_manifest()
+    REMOTE_DIR.mkdir(parents=True, exist_ok=True)
+
+    for url in sorted(set(urls)):
+        data = fetcher.fetch(url)
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{digest[:16]}.{image_extension(data)}"
+        (REMOTE_DIR / name).write_bytes(data)
+        try:
+            width, height = image_size(data)
+        except ImageSizeError as error:
+            raise ImageSizeError(f"{url}: {error}") from error
+        manifest[url] = {
+            "src": f"/{REMOTE_DIR.relative_to(ASSETS_DIR).as_posix()}/{name}",
+            "width": width,
+            "height": height,
+            "sha256": digest,
+        }
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return manifest
+
+
+def resolve(src: str, manifest: dict[str, dict]) -> dict:
+    """Get the local asset serving an image source.
+
+    Args:
+        src: The source used by the component.
+        manifest: The mirrored images.
+
+    Returns:
+        The local source of the image, with its intrinsic size when known.
+
+    Raises:
+        MissingAssetError: If the image is not available locally.
+    """
+    if is_remote(src):
+        if src not in manifest:
+            raise MissingAssetError(
+                f"{src} is not mirrored, run `python -m utils.assets` first."
+            )
+        return manifest[src]
+
+    if not (ASSETS_DIR / src.lstrip("/")).is_file():
+        raise MissingAssetError(f"{src} does not exist in {ASSETS_DIR}/.")
+    return {"src": src}
+
+
+class AssetsPlugin(Plugin):
+    """Serve every image from the local assets, failing the build on missing ones."""
+
+    manifest: dict[str, dict] | None = None
+
+    def enter_component(
+        self, comp, /, *, page_context, compile_context, in_prop_tree=False
+    ):
+        """Point an image to its local copy and set its intrinsic size.
+
+        Args:
+            comp: The component being compiled.
+            page_context: The active page compilation state.
+            compile_context: The active compile-run state.
+            in_prop_tree: Whether the component is visited through a prop subtree.
+
+        Raises:
+            MissingAssetError: If the image is not available locally.
+        """
+        if getattr(comp, "tag", None) != "img":
+            return
+        src = literal(getattr(comp, "src", None))
+        if not isinstance(src, str) or src.startswith("data:"):
+            return
+
+        if self.manifest is None:
+            self.manifest = load_manifest()
+        asset = resolve(src, self.manifest)
+        comp.src = rx.Var.create(asset["src"])
+        if "width" in asset:
+            comp.custom_attrs.setdefault("width", asset["width"])
+            comp.custom_attrs.setdefault("height", asset["height"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--from-dir",
+        type=Path,
+        help="Local mirror laid out as <dir>/<host>/<path>, for offline builds.",
+    )
+    args = parser.parse_args()
+
+    from portofolio_reflex.pages.index.page import create_portfolio_page
+
+    fetcher = DirectoryFetcher(args.from_dir) if args.from_dir else HttpFetcher()
+    urls = [
+        src for src in iter_image_sources(create_portfolio_page()) if is_remote(src)
+    ]
+    for url, asset in ingest(urls, fetcher).items():
+        print(f"{asset['src']} ({asset['width']}x{asset['height']}) <- {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Prepare the backend at build time, so the container starts without compiling.
+
+Evaluates the pages like the production backend does when it starts, which
+writes the routes creating state classes to ``.web/backend``, compiles the
+bytecode of the app, and writes a manifest of the routes with a digest of
+the sources and of ``content/``. At startup, ``portofolio_reflex/startup.py``
+checks the manifest and the backend only evaluates the stateful pages.
+
+Usage:
+    python -m utils.backend
+"""
+
+from __future__ import annotations
+
+import argparse
+import compileall
+import json
+import time
+from pathlib import Path
+
+from portofolio_reflex.startup import SOURCES, manifest_path, marker_path, source_digest
+
+
+def prepare() -> dict:
+    """Write the artifacts of the backend.
+
+    Returns:
+        The manifest, with the routes, the stateful routes and how long the
+        imports and the evaluation of the pages took.
+    """
+    from reflex_base.environment import environment
+
+    # Evaluate every page instead of reusing the marker of a previous build.
+    marker_path().unlink(missing_ok=True)
+    manifest_path().unlink(missing_ok=True)
+    environment.REFLEX_SKIP_COMPILE.set(True)
+
+    start = time.perf_counter()
+    from portofolio_reflex.portofolio_reflex import app
+
+    imported = time.perf_counter()
+    app._compile()
+    compiled = time.perf_counter()
+
+    for source in SOURCES:
+        path = Path(source)
+        if path.is_dir():
+            compileall.compile_dir(path, quiet=1)
+        else:
+            compileall.compile_file(path, quiet=1)
+
+    manifest = {
+        "digest": source_digest(),
+        "routes": list(app._unevaluated_pages),
+        "stateful_routes": json.loads(marker_path().read_text()),
+        "import_s": round(imported - start, 3),
+        "compile_s": round(compiled - imported, 3),
+    }
+    manifest_path().write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    manifest = prepare()
+    print(
+        f"Prepared the backend: {len(manifest['routes'])} routes, "
+        f"{len(manifest['stateful_routes'])} stateful, "
+        f"imports {manifest['import_s']} s, compile {manifest['compile_s']} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
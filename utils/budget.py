@@ -0,0 +1,351 @@
+"""Check the weight of each exported page against a performance budget.
+
+The resources of a route are read from its exported HTML document and from
+its compiled component tree: images, scripts, stylesheets and preloaded fonts.
+Each resource is weighed from the export, compressed with the precompressed
+copy served by Caddy when there is one. Resources on another origin can not be
+weighed and are counted as third-party origins instead.
+
+Usage:
+    python -m utils.budget [--static-dir DIR] [--budget FILE] [--output FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import reflex as rx
+
+from utils.components import iter_components, literal
+from utils.prerender import page_files
+
+STATIC_DIR = Path(".web") / "build" / "client"
+BUDGET_PATH = Path("budget.json")
+
+KINDS = {
+    "js": {".js", ".mjs"},
+    "css": {".css"},
+    "font": {".woff2", ".woff", ".ttf", ".otf"},
+    "image": {".avif", ".webp", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico"},
+}
+
+# Formats already compressed, sent as is.
+BINARY_SUFFIXES = (KINDS["font"] | KINDS["image"]) - {".svg"}
+
+PRECOMPRESSED_SUFFIXES = (".zst", ".br", ".gz")
+
+
+@dataclass
+class Resource:
+    """A file loaded by a page."""
+
+    url: str
+    # Whether the page waits for the resource before its first paint.
+    blocking: bool = False
+
+
+@dataclass
+class RouteReport:
+    """The weight of a route."""
+
+    route: str
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    bytes_by_kind: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(KINDS, 0)
+    )
+    third_party_origins: set[str] = field(default_factory=set)
+    render_blocking: int = 0
+    # The local resources missing from the export.
+    missing: list[str] = field(default_factory=list)
+
+    def metrics(self) -> dict[str, int]:
+        """Get the metrics compared to the budget.
+
+        Returns:
+            The value of each metric, the bytes per kind being compressed.
+        """
+        return {
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            **{f"{kind}_bytes": size for kind, size in self.bytes_by_kind.items()},
+            "third_party_origins": len(self.third_party_origins),
+            "render_blocking": self.render_blocking,
+        }
+
+
+class _DocumentParser(HTMLParser):
+    """Collect the resources referenced by an HTML document."""
+
+    def __init__(self):
+        super().__init__()
+        self.resources: list[Resource] = []
+        self.in_head = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "head":
+            self.in_head = True
+        elif tag == "body":
+            self.in_head = False
+        elif tag == "script" and attrs.get("src"):
+            deferred = (
+                "async" in attrs or "defer" in attrs or attrs.get("type") == "module"
+            )
+            self.resources.append(
+                Resource(attrs["src"], blocking=self.in_head and not deferred)
+            )
+        elif tag == "link" and attrs.get("href"):
+            rel = set((attrs.get("rel") or "").lower().split())
+            if "stylesheet" in rel:
+                blocking = attrs.get("media", "all") in ("all", "screen")
+                self.resources.append(Resource(attrs["href"], blocking=blocking))
+            elif rel & {"modulepreload", "preload"}:
+                self.resources.append(Resource(attrs["href"]))
+        elif tag == "img" and attrs.get("src"):
+            self.resources.append(Resource(attrs["src"]))
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_head = False
+
+
+def document_resources(document: Path) -> list[Resource]:
+    """Get the resources referenced by an exported HTML document.
+
+    Args:
+        document: The HTML file.
+
+    Returns:
+        The scripts, stylesheets, preloads and images of the document.
+    """
+    parser = _DocumentParser()
+    parser.feed(document.read_text())
+    return parser.resources
+
+
+def _largest_candidate(src_set: str) -> str | None:
+    """Get the widest candidate of a ``srcset``, the worst case download."""
+    candidates = []
+    for candidate in src_set.split(","):
+        url, _, descriptor = candidate.strip().partition(" ")
+        width = descriptor.strip().rstrip("wx") or "1"
+        candidates.append((float(width), url))
+    return max(candidates)[1] if candidates else None
+
+
+def tree_resources(components: list[rx.Component]) -> list[Resource]:
+    """Get the resources referenced by compiled components.
+
+    A ``<picture>`` counts only the widest candidate of its preferred source,
+    since the browser downloads a single image out of it.
+
+    Args:
+        components: The page and its head components.
+
+    Returns:
+        The images, scripts and stylesheets of the components.
+    """
+    resources, covered = [], set()
+    for root in components:
+        for component in iter_components(root):
+            if component.tag == "picture":
+                sources = [
+                    child for child in component.children if child.tag == "source"
+                ]
+                url = sources and _largest_candidate(literal(sources[0].src_set) or "")
+                if url:
+                    resources.append(Resource(url))
+                    covered.update(id(child) for child in component.children)
+            elif id(component) in covered:
+                continue
+            elif component.tag == "img" and isinstance(literal(component.src), str):
+                resources.append(Resource(literal(component.src)))
+            elif component.tag == "script" and isinstance(literal(component.src), str):
+                deferred = literal(component.async_) or literal(component.defer)
+                resources.append(
+                    Resource(literal(component.src), blocking=not deferred)
+                )
+            elif component.tag == "link" and isinstance(literal(component.href), str):
+                rel = str(literal(component.rel) or "").lower().split()
+                resources.append(
+                    Resource(literal(component.href), blocking="stylesheet" in rel)
+                )
+    return resources
+
+
+def transferred_size(path: Path) -> int:
+    """Get the number of bytes sent for a file.
+
+    Args:
+        path: The exported file.
+
+    Returns:
+        The size of its smallest precompressed copy, or of the file compressed
+        with gzip when it was not precompressed and is not a binary format.
+    """
+    sizes = [
+        path.with_name(path.name + suffix).stat().st_size
+        for suffix in PRECOMPRESSED_SUFFIXES
+        if path.with_name(path.name + suffix).is_file()
+    ]
+    if sizes:
+        return min(sizes)
+    if path.suffix in BINARY_SUFFIXES:
+        return path.stat().st_size
+    return len(gzip.compress(path.read_bytes(), compresslevel=9))
+
+
+def measure_route(
+    route: str, resources: list[Resource], static_dir: Path, origin: str = ""
+) -> RouteReport:
+    """Weigh the resources of a route.
+
+    Args:
+        route: The route.
+        resources: The resources of the route, its document included.
+        static_dir: The exported frontend.
+        origin: The origin of the deployed site, counted as first party.
+
+    Returns:
+        The report of the route.
+    """
+    report, seen = RouteReport(route), set()
+    local_origin = urlsplit(origin).netloc
+    for resource in resources:
+        url = urlsplit(resource.url)
+        if url.scheme == "data" or resource.url in seen:
+            continue
+        seen.add(resource.url)
+        report.render_blocking += resource.blocking
+        if url.netloc and url.netloc != local_origin:
+            report.third_party_origins.add(f"{url.scheme}://{url.netloc}")
+            continue
+
+        path = static_dir / url.path.lstrip("/")
+        if not path.is_file():
+            report.missing.append(resource.url)
+            continue
+        size, transferred = path.stat().st_size, transferred_size(path)
+        report.raw_bytes += size
+        report.compressed_bytes += transferred
+        for kind, suffixes in KINDS.items():
+            if path.suffix in suffixes:
+                report.bytes_by_kind[kind] += transferred
+    return report
+
+
+def route_document(static_dir: Path, route: str) -> Path:
+    """Get the HTML document served for a route.
+
+    Args:
+        static_dir: The exported frontend.
+        route: The route.
+
+    Returns:
+        The prerendered document of the route, or the SPA entry point.
+    """
+    return next(iter(page_files(static_dir, route)), static_dir / "index.html")
+
+
+def measure_app(app: rx.App, static_dir: Path, origin: str = "") -> list[RouteReport]:
+    """Weigh every page of the app.
+
+    Args:
+        app: The app.
+        static_dir: The exported frontend.
+        origin: The origin of the deployed site.
+
+    Returns:
+        The report of each route.
+    """
+    app._compile(dry_run=True, use_rich=False)
+    reports = []
+    for key, page in app._pages.items():
+        route = "/" if key == "index" else f"/{key}"
+        document = route_document(static_dir, route)
+        meta = app._unevaluated_pages[key].meta or []
+        head = [tag for tag in meta if isinstance(tag, rx.Component)]
+        resources = [
+            Resource("/" + document.relative_to(static_dir).as_posix()),
+            *document_resources(document),
+            *tree_resources([page, *head]),
+        ]
+        reports.append(measure_route(route, resources, static_dir, origin))
+    return reports
+
+
+def check_budget(reports: list[RouteReport], budget: dict) -> list[str]:
+    """Compare the reports to the budget.
+
+    Args:
+        reports: The report of each route.
+        budget: The ``default`` limits, overridden per route under ``routes``.
+
+    Returns:
+        A human readable message for each exceeded limit or missing resource.
+    """
+    failures = []
+    for report in reports:
+        limits = {
+            **budget.get("default", {}),
+            **budget.get("routes", {}).get(report.route, {}),
+        }
+        metrics = report.metrics()
+        for metric, limit in limits.items():
+            if metric not in metrics:
+                raise ValueError(f"Unknown budget metric {metric}.")
+            if metrics[metric] > limit:
+                failures.append(
+                    f"{report.route}: {metric} is {metrics[metric]}, over {limit}"
+                )
+        failures.extend(
+            f"{report.route}: {url} is not exported" for url in report.missing
+        )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--static-dir", type=Path, default=STATIC_DIR)
+    parser.add_argument("--budget", type=Path, default=BUDGET_PATH)
+    parser.add_argument("--output", type=Path, help="File to write the report to.")
+    args = parser.parse_args()
+
+    from reflex.config import get_config
+
+    from portofolio_reflex.portofolio_reflex import app
+
+    if not (args.static_dir / "index.html").is_file():
+        raise SystemExit(
+            f"No export found in {args.static_dir}, run `reflex export` first."
+        )
+
+    reports = measure_app(app, args.static_dir, get_config().deploy_url or "")
+    results = {
+        report.route: {
+            **report.metrics(),
+            "origins": sorted(report.third_party_origins),
+        }
+        for report in reports
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+
+    failures = check_budget(reports, json.loads(args.budget.read_text()))
+    if failures:
+        print("Performance budget exceeded:", *failures, sep="\n  - ", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Helpers to inspect a compiled Reflex component tree at build time."""
+
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import reflex as rx
+
+
+def subtrees(component: rx.Component) -> list[rx.Component]:
+    """Get the components rendered by a component.
+
+    Args:
+        component: A component of the tree.
+
+    Returns:
+        Its children, then the components passed in its props, e.g. the
+        content of an accordion item or a component held by a Var.
+    """
+    children = list(getattr(component, "children", None) or [])
+    get_components_in_props = getattr(component, "_get_components_in_props", None)
+    if get_components_in_props is not None:
+        children.extend(get_components_in_props())
+    return children
+
+
+def iter_components(root: rx.Component) -> Iterator[rx.Component]:
+    """Walk a component tree depth first without recursion.
+
+    The branches of ``rx.cond`` and the cases of ``rx.match`` are children of
+    the component they create, like the component rendered by ``rx.foreach``
+    for an item. The components passed in props are walked after the children.
+
+    Args:
+        root: The root of the tree.
+
+    Yields:
+        Every component of the tree, parents before their children.
+    """
+    stack = [root]
+    while stack:
+        component = stack.pop()
+        yield component
+        stack.extend(reversed(subtrees(component)))
+
+
+def literal(value: Any) -> Any:
+    """Get the Python value behind a literal Var.
+
+    Args:
+        value: A prop value, either a plain Python value or a Var.
+
+    Returns:
+        The literal value, or None if the Var is computed at runtime.
+    """
+    if isinstance(value, rx.Var):
+        return getattr(value, "_var_value", None)
+    return value
+
+
+def iter_text(root: rx.Component) -> Iterator[str]:
+    """Get the static text rendered by a component tree.
+
+    Args:
+        root: The root of the tree.
+
+    Yields:
+        The content of every literal text node.
+    """
+    for component in iter_components(root):
+        contents = literal(getattr(component, "contents", None))
+        if isinstance(contents, str):
+            yield contents
@@ -0,0 +1,53 @@
+"""Split the deferred content of the pages into their own modules.
+
+The children of a ``DeferredSection`` are compiled once the other plugins
+processed them, into a memo module of their own. The placeholder then only
+keeps a dynamic ``import()`` of that module, which the bundler emits as a
+separate chunk fetched when it approaches the viewport. The children are
+therefore not prerendered: ``create_deferred`` is only used for interactive
+content, the text of the sections stays in the page. The libraries used by
+the children are still imported by the page, since the hero and the
+navigation share them.
+"""
+
+from __future__ import annotations
+
+import reflex as rx
+from reflex.plugins import Plugin
+from reflex_base.components.memo import create_component_memo
+
+from utils.components import literal
+
+TAG = "DeferredSection"
+
+
+class DeferredSectionsPlugin(Plugin):
+    """Compile the deferred content to lazily imported modules."""
+
+    def leave_component(
+        self, comp, children, /, *, page_context, compile_context, in_prop_tree=False
+    ):
+        """Move the compiled children of a deferred placeholder to their own module.
+
+        Args:
+            comp: The component being compiled.
+            children: Its compiled children.
+            page_context: The active page compilation state.
+            compile_context: The active compile-run state.
+            in_prop_tree: Whether the component is visited through a prop subtree.
+
+        Returns:
+            The placeholder without children, loading them from their module.
+        """
+        if getattr(comp, "tag", None) != TAG or not children:
+            return None
+
+        definition = create_component_memo(rx.fragment(*children), literal(comp.name))
+        name = definition.export_name
+        compile_context.auto_memo_components[name, None] = definition
+
+        section = page_context.own(comp)
+        section.name = rx.Var.create(name)
+        section.load = rx.Var(f'(() => import("$/utils/components/{name}"))')
+        section.children = []
+        return section, ()
@@ -0,0 +1,119 @@
+"""Pick how the app is deployed from what its pages actually need.
+
+A page needs the backend when one of its components reads a state var or
+triggers a server event, or when it has on_load handlers. The components of
+both branches of ``rx.cond``, of every case of ``rx.match``, rendered by
+``rx.foreach`` or passed in props count too. When no page does,
+the export is a complete static site: Caddy serves it alone with
+``Caddyfile.static`` and no Python process or websocket runs next to it.
+
+Usage:
+    python -m utils.deploy [--mode {auto,static,backend}] [--output FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import reflex as rx
+
+from utils.components import iter_components
+
+MODES = ("auto", "static", "backend")
+
+
+def _uses_state(component: rx.Component) -> bool:
+    """Whether a component renders a state var or sends a server event."""
+    if component.event_triggers and component._event_trigger_values_use_state():
+        return True
+    for var in component._get_vars():
+        var_data = var._get_all_var_data()
+        if var_data is not None and var_data.state:
+            return True
+    return False
+
+
+def _user_states(state: type[rx.State] | None) -> list[type[rx.State]]:
+    """Get the state classes defined by the app rather than by Reflex."""
+    states, stack = [], [state] if state is not None else []
+    while stack:
+        current = stack.pop()
+        if not current.__module__.startswith("reflex"):
+            states.append(current)
+        stack.extend(current.get_substates())
+    return states
+
+
+def backend_requirements(app: rx.App) -> list[str]:
+    """List why the app can not be served as a static site.
+
+    Args:
+        app: The app, with its pages registered.
+
+    Returns:
+        A human readable reason for each thing requiring the backend.
+    """
+    app._apply_decorated_pages()
+    reasons = [
+        f"state {state.__module__}.{state.__name__} is defined"
+        for state in _user_states(app._state)
+    ]
+    for route, page in app._unevaluated_pages.items():
+        if page.on_load:
+            reasons.append(f"page /{route} has on_load handlers")
+        component = page.component() if callable(page.component) else page.component
+        if any(_uses_state(child) for child in iter_components(component)):
+            reasons.append(f"page /{route} uses state or server events")
+    return reasons
+
+
+def resolve_mode(app: rx.App, mode: str = "auto") -> str:
+    """Resolve the deployment mode of the app.
+
+    Args:
+        app: The app, with its pages registered.
+        mode: The requested mode, ``auto`` picking static whenever possible.
+
+    Returns:
+        Either ``static`` or ``backend``.
+
+    Raises:
+        SystemExit: If a static deployment is requested for an app needing the backend.
+    """
+    if mode == "backend":
+        return mode
+
+    reasons = backend_requirements(app)
+    if not reasons:
+        return "static"
+
+    details = "\n".join(f"  - {reason}" for reason in reasons)
+    if mode == "static":
+        raise SystemExit(f"The app can not be deployed without a backend:\n{details}")
+    print(
+        f"WARNING: falling back to a backend deployment because:\n{details}",
+        file=sys.stderr,
+    )
+    return "backend"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=MODES, default="auto")
+    parser.add_argument(
+        "--output", type=Path, help="File to write the resolved mode to."
+    )
+    args = parser.parse_args()
+
+    from portofolio_reflex.portofolio_reflex import app
+
+    mode = resolve_mode(app, args.mode)
+    if args.output:
+        args.output.write_text(mode + "\n")
+    print(f"Deployment mode: {mode}")
+
+
+if __name__ == "__main__":
+    main()
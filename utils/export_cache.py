@@ -0,0 +1,404 @@
+"""Reuse the frontend export of a previous build when its inputs are unchanged.
+
+Every image build ran ``reflex export`` from scratch, even when only the
+backend changed. The inputs of the export are fingerprinted:
+
+- the code of each page, rendered on its own, with the assets it references,
+- the layout shared by the pages, ``layout`` in ``templates/template.py``,
+- the initial state compiled for the frontend,
+- every file of ``assets/``,
+- the build configuration: Reflex, Node, the plugins in ``utils/``, the app
+  module with its frontend options (stylesheets, head components, app wraps),
+  the requirements and the environment read by the export.
+
+When every fingerprint matches the manifest of the cache, the cached export
+is restored instead of exporting again. The bundler builds the chunks of all
+the pages together and the hashes of the shared chunks end up in every page,
+so the outputs of two builds cannot be mixed: any change exports the whole
+frontend again, and the report tells which pages changed and why.
+
+The cache is safe to persist across builds, e.g. in a BuildKit cache mount.
+The manifest records the hash of every exported file and is written last, so
+an interrupted store leaves no manifest, and a restored export that does not
+match it is discarded and exported again.
+
+Each page is rendered on its own for its fingerprint. This is not the code the
+export writes: ``reflex export`` compiles the pages together, with the
+memoized components, app wraps and imports they share and the compile plugins
+of ``rxconfig.py``, whose sources are part of the build fingerprint instead.
+
+Usage:
+    python -m utils.export_cache --cache DIR [--check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+# Bumped when the manifest changes, to discard the caches of older builds.
+CACHE_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+OUTPUT_NAME = "client"
+
+ASSETS_DIR = Path("assets")
+STATIC_DIR = Path(".web") / "build" / "client"
+
+# The files configuring the export, besides the pages.
+BUILD_SOURCES = (
+    "rxconfig.py",
+    "portofolio_reflex/portofolio_reflex.py",
+    "utils",
+    "requirements.txt",
+    "requirements_build.txt",
+)
+
+# The environment variables read by the export.
+BUILD_ENV = ("API_URL", "REFLEX_API_URL", "REFLEX_DEPLOY_URL", "REFLEX_ENV_MODE")
+
+
+def digest(*parts: str | bytes) -> str:
+    """Hash some strings or bytes.
+
+    Args:
+        parts: The content to hash, in order.
+
+    Returns:
+        The hexadecimal SHA-256 of the parts, each prefixed by its length.
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        hasher.update(len(data).to_bytes(8, "big"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+def file_digests(directory: Path) -> dict[str, str]:
+    """Hash every file under a directory.
+
+    Args:
+        directory: The directory.
+
+    Returns:
+        The hash of each file by its POSIX path relative to the directory, in
+        path order.
+    """
+    return {
+        path.relative_to(directory).as_posix(): digest(path.read_bytes())
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
+
+
+def node_version() -> str:
+    """Get the version of Node, empty if it is not installed."""
+    try:
+        return subprocess.run(
+            ["node", "--version"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_app():
+    """Import the app without compiling it, and register its pages.
+
+    Returns:
+        The app, its pages not evaluated yet.
+    """
+    from reflex_base.environment import environment
+
+    environment.REFLEX_SKIP_COMPILE.set(True)
+    from portofolio_reflex.portofolio_reflex import app
+
+    if not app._unevaluated_pages:
+        app._apply_decorated_pages()
+    return app
+
+
+def page_code(route: str) -> str:
+    """Evaluate a page and render it.
+
+    Args:
+        route: The route of the page.
+
+    Returns:
+        The code of the page module, without the components Reflex memoizes
+        across the pages of a full compile.
+    """
+    from reflex.compiler.compiler import compile_page, compile_unevaluated_page
+
+    app = load_app()
+    page = app._unevaluated_pages[route]
+    _, code = compile_page(
+        route, compile_unevaluated_page(route, page, app.style, app.theme)
+    )
+    return code
+
+
+def render_pages() -> dict[str, str]:
+    """Evaluate and render every page of the app on its own, to fingerprint it.
+
+    Returns:
+        The code of each page by route, in route order.
+    """
+    return {route: page_code(route) for route in sorted(load_app()._unevaluated_pages)}
+
+
+def build_fingerprint(root: Path = Path()) -> str:
+    """Hash the configuration of the export.
+
+    Args:
+        root: The root of the app.
+
+    Returns:
+        The hash of the versions, build sources and environment variables.
+    """
+    parts = [importlib.metadata.version("reflex"), node_version()]
+    for source in BUILD_SOURCES:
+        path = root / source
+        files = (
+            sorted(path.rglob("*.py"))
+            if path.is_dir()
+            else [path]
+            if path.is_file()
+            else []
+        )
+        for file in files:
+            parts += [file.relative_to(root).as_posix(), file.read_bytes()]
+    for name in BUILD_ENV:
+        parts += [name, os.environ.get(name, "")]
+    return digest(*parts)
+
+
+def layout_fingerprint(app) -> str:
+    """Hash the layout shared by the pages, around an empty page.
+
+    Args:
+        app: The app, for its style.
+
+    Returns:
+        The hash of the code of the layout.
+    """
+    import reflex as rx
+    from reflex.compiler.compiler import compile_page
+
+    from portofolio_reflex.templates.template import layout
+
+    component = layout(rx.fragment())
+    component._add_style_recursive(app.style, app.theme)
+    _, code = compile_page("layout", component)
+    return digest(code)
+
+
+def state_fingerprint(app) -> str:
+    """Hash the initial state and contexts compiled for the frontend.
+
+    Args:
+        app: The app.
+
+    Returns:
+        The hash of the compiled contexts.
+    """
+    from reflex.compiler.compiler import _compile_contexts
+
+    return digest(_compile_contexts(app._state, app.theme))
+
+
+def fingerprint(root: Path = Path()) -> dict:
+    """Fingerprint the inputs of the export.
+
+    Args:
+        root: The root of the app.
+
+    Returns:
+        The fingerprints, in the format of the manifest.
+    """
+    app = load_app()
+    assets = {
+        f"/{path}": value for path, value in file_digests(root / ASSETS_DIR).items()
+    }
+    codes = render_pages()
+    return {
+        "version": CACHE_VERSION,
+        "build": build_fingerprint(root),
+        "state": state_fingerprint(app),
+        "layout": layout_fingerprint(app),
+        "assets": assets,
+        "pages": {
+            route: {
+                "code": digest(code),
+                "assets": [src for src in assets if src in code],
+            }
+            for route, code in codes.items()
+        },
+    }
+
+
+def compare(previous: dict | None, current: dict) -> dict[str, str]:
+    """Explain why the export cannot be reused.
+
+    Args:
+        previous: The fingerprints of the cached export, if any.
+        current: The fingerprints of the sources.
+
+    Returns:
+        The reason each changed page is exported again, by route, and the
+        reason of the changes not specific to a page, under ``*``. Empty
+        when the cached export can be reused.
+    """
+    shared = None
+    if previous is None or previous.get("version") != CACHE_VERSION:
+        shared = "no cached export"
+    elif previous["build"] != current["build"]:
+        shared = "build configuration changed"
+    elif previous["state"] != current["state"]:
+        shared = "initial state changed"
+    elif previous["layout"] != current["layout"]:
+        shared = "layout changed"
+    if shared:
+        return {"*": shared, **dict.fromkeys(current["pages"], shared)}
+
+    old_assets, assets = previous["assets"], current["assets"]
+    changed_assets = {
+        src
+        for src in old_assets.keys() | assets.keys()
+        if old_assets.get(src) != assets.get(src)
+    }
+
+    changes = {}
+    referenced = set()
+    for route, page in current["pages"].items():
+        referenced.update(page["assets"])
+        old_page = previous["pages"].get(route)
+        if old_page is None:
+            changes[route] = "new page"
+        elif old_page["code"] != page["code"]:
+            changes[route] = "page changed"
+        elif changed := sorted(changed_assets.intersection(page["assets"])):
+            changes[route] = f"assets changed: {', '.join(changed)}"
+    for route in previous["pages"].keys() - current["pages"].keys():
+        changes[route] = "page removed"
+    if unreferenced := sorted(changed_assets - referenced):
+        changes["*"] = f"assets changed: {', '.join(unreferenced)}"
+    return changes
+
+
+def load_manifest(cache_dir: Path) -> dict | None:
+    """Load the manifest of the cached export.
+
+    Args:
+        cache_dir: The directory of the cache.
+
+    Returns:
+        The manifest, or None if the cache is empty or unreadable.
+    """
+    try:
+        return json.loads((cache_dir / MANIFEST_NAME).read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def restore(cache_dir: Path, manifest: dict, static_dir: Path = STATIC_DIR) -> bool:
+    """Copy the cached export to the frontend directory.
+
+    Args:
+        cache_dir: The directory of the cache.
+        manifest: The manifest of the cache.
+        static_dir: Where the export writes the frontend.
+
+    Returns:
+        Whether the restored files match the manifest. Otherwise they are
+        removed.
+    """
+    output = cache_dir / OUTPUT_NAME
+    if not output.is_dir():
+        return False
+    shutil.rmtree(static_dir, ignore_errors=True)
+    shutil.copytree(output, static_dir)
+    if file_digests(static_dir) == manifest.get("output"):
+        return True
+    shutil.rmtree(static_dir)
+    return False
+
+
+def store(cache_dir: Path, fingerprints: dict, static_dir: Path = STATIC_DIR):
+    """Replace the cached export with the frontend just exported.
+
+    Args:
+        cache_dir: The directory of the cache.
+        fingerprints: The fingerprints of the export.
+        static_dir: Where the export wrote the frontend.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Invalidate the cache first, so an interrupted store is never reused.
+    (cache_dir / MANIFEST_NAME).unlink(missing_ok=True)
+    output = cache_dir / OUTPUT_NAME
+    shutil.rmtree(output, ignore_errors=True)
+    shutil.copytree(static_dir, output)
+
+    manifest = {**fingerprints, "output": file_digests(output)}
+    partial = cache_dir / f"{MANIFEST_NAME}.partial"
+    partial.write_text(json.dumps(manifest, indent=2) + "\n")
+    partial.replace(cache_dir / MANIFEST_NAME)
+
+
+def export():
+    """Export the frontend, compiling the app."""
+    from reflex_base.environment import environment
+
+    # Set when the pages were loaded for their fingerprints.
+    env = {
+        name: value
+        for name, value in os.environ.items()
+        if name != environment.REFLEX_SKIP_COMPILE.name
+    }
+    subprocess.run(
+        [sys.executable, "-m", "reflex", "export", "--frontend-only", "--no-zip"],
+        env=env,
+        check=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--cache", type=Path, required=True, help="Directory of the cache."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report the changes, without exporting.",
+    )
+    args = parser.parse_args()
+
+    current = fingerprint()
+    manifest = load_manifest(args.cache)
+    changes = compare(manifest, current)
+    for route in sorted(current["pages"].keys() | changes.keys() - {"*"}):
+        print(f"{route}: {changes.get(route, 'unchanged')}")
+    if "*" in changes:
+        print(f"Export: {changes['*']}")
+
+    if args.check:
+        return
+    if not changes:
+        if restore(args.cache, manifest):
+            print("Reused the cached export.")
+            return
+        print("The cached export does not match its manifest, exporting again.")
+    export()
+    store(args.cache, current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Vendor, subset and self-host the web fonts of the portfolio.
+
+The pinned font release is downloaded once (or read from a local directory
+for offline builds) and checked against its pinned SHA-256 digest before it
+is unpacked, then subset to the glyphs and weights the compiled page
+actually uses and written as WOFF2 files under ``assets/fonts``, together
+with a manifest read by the page template. A release without a pinned
+digest is skipped, and the page uses the system fonts of ``font_stack``
+until its files are vendored.
+
+Usage:
+    python -m utils.fonts [--source DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import string
+import urllib.request
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import reflex as rx
+
+from utils.components import iter_components, iter_text, literal
+
+ASSETS_DIR = Path("assets")
+FONTS_DIR = ASSETS_DIR / "fonts"
+MANIFEST_PATH = FONTS_DIR / "manifest.json"
+CACHE_DIR = Path(".cache") / "fonts"
+
+# Under the logger of Reflex, like `utils/icons.py`.
+logger = logging.getLogger("reflex").getChild(__name__)
+
+# Glyphs kept even when the page does not render them yet, so form input and
+# small copy edits never fall back to another font.
+BASE_GLYPHS = string.printable
+
+# Weight applied by the browser when a component sets none.
+DEFAULT_WEIGHT = 400
+
+# `font-display: optional` never swaps fonts after first paint: the preloaded
+# file is used when it arrives in time, otherwise the fallback stays.
+FONT_DISPLAY = "optional"
+
+# The fonts of the platform, after the vendored ones or alone without them.
+SYSTEM_FONTS = (
+    'system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, '
+    '"Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"'
+)
+
+
+class ChecksumError(ValueError):
+    """A font release archive does not match its pinned digest."""
+
+
+@dataclass(frozen=True)
+class FontSource:
+    """A pinned font release and the static file of each of its weights."""
+
+    family: str
+    version: str
+    url: str
+    # The SHA-256 digest of the archive at ``url``, in hex.
+    sha256: str
+    files: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def archive_name(self) -> str:
+        """The name of the downloaded release archive."""
+        return self.url.rsplit("/", 1)[-1]
+
+
+INTER = FontSource(
+    family="Inter",
+    version="4.0",
+    url="https://github.com/rsms/inter/releases/download/v4.0/Inter-4.0.zip",
+    # Not pinned yet: the release is skipped until the digest of the official
+    # archive is recorded here, see `build_fonts`.
+    sha256="",
+    files={
+        300: "extras/ttf/Inter-Light.ttf",
+        400: "extras/ttf/Inter-Regular.ttf",
+        500: "extras/ttf/Inter-Medium.ttf",
+        600: "extras/ttf/Inter-SemiBold.ttf",
+        700: "extras/ttf/Inter-Bold.ttf",
+    },
+)
+
+FONTS = [INTER]
+
+
+def used_glyphs(root: rx.Component) -> str:
+    """Get the glyphs to keep in the subset fonts.
+
+    Args:
+        root: The compiled page tree.
+
+    Returns:
+        The sorted unique characters rendered by the page plus the base glyphs.
+    """
+    text = "".join(iter_text(root))
+    return "".join(sorted(set(text + BASE_GLYPHS) - set(string.whitespace) | {" "}))
+
+
+def used_weights(root: rx.Component) -> set[int]:
+    """Get the font weights set by the components of a page.
+
+    Args:
+        root: The compiled page tree.
+
+    Returns:
+        The numeric font weights, always including the default one.
+    """
+    weights = {DEFAULT_WEIGHT}
+    for component in iter_components(root):
+        weight = literal((getattr(component, "style", None) or {}).get("fontWeight"))
+        if isinstance(weight, (int, str)) and str(weight).isdigit():
+            weights.add(int(weight))
+    return weights
+
+
+def verify_archive(font: FontSource, data: bytes, origin: str | Path):
+    """Check a release archive against its pinned digest.
+
+    Args:
+        font: The pinned font release.
+        data: The content of the archive.
+        origin: Where the archive was read from, for the error.
+
+    Raises:
+        ChecksumError: If the digest of the archive is not the pinned one.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != font.sha256:
+        raise ChecksumError(
+            f"{origin} has the SHA-256 digest {digest}, expected {font.sha256 or 'none'}: "
+            f"check it against the {font.family} {font.version} release and pin it in utils/fonts.py."
+        )
+
+
+def read_source(font: FontSource, source_dir: Path | None = None) -> dict[int, bytes]:
+    """Read the original font files of a release.
+
+    Args:
+        font: The pinned font release.
+        source_dir: A local directory holding the release archive, for offline builds.
+
+    Returns:
+        The raw font file of each weight.
+
+    Raises:
+        ChecksumError: If the archive is not the pinned one, before it is unpacked.
+    """
+    if source_dir is not None:
+        archive = source_dir / font.archive_name
+        data = archive.read_bytes()
+        verify_archive(font, data, archive)
+    elif (archive := CACHE_DIR / font.archive_name).exists():
+        data = archive.read_bytes()
+        verify_archive(font, data, archive)
+    else:
+        with urllib.request.urlopen(font.url) as response:
+            data = response.read()
+        # Only a verified archive is cached.
+        verify_archive(font, data, font.url)
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        archive.write_bytes(data)
+
+    with zipfile.ZipFile(io.BytesIO(data)) as release:
+        names = release.namelist()
+        return {
+            weight: release.read(next(name for name in names if name.endswith(path)))
+            for weight, path in font.files.items()
+        }
+
+
+def subset_woff2(font_file: bytes, glyphs: str) -> bytes:
+    """Subset a font to the given glyphs and compress it as WOFF2.
+
+    Args:
+        font_file: The original font file.
+        glyphs: The characters to keep.
+
+    Returns:
+        The subset WOFF2 font.
+    """
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.hinting = False
+    options.desubroutinize = True
+
+    font = TTFont(io.BytesIO(font_file))
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=glyphs)
+    subsetter.subset(font)
+
+    output = io.BytesIO()
+    subset.save_font(font, output, options)
+    return output.getvalue()
+
+
+def build_fonts(root: rx.Component, source_dir: Path | None = None) -> dict:
+    """Write the subset fonts of a page and their manifest.
+
+    Args:
+        root: The compiled page tree.
+        source_dir: A local directory holding the release files, for offline builds.
+
+    Returns:
+        The manifest of the generated files.
+    """
+    glyphs = used_glyphs(root)
+    weights = used_weights(root)
+
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in FONTS_DIR.glob("*.woff2"):
+        stale.unlink()
+
+    manifest = {"fonts": []}
+    for font in FONTS:
+        if not font.sha256:
+            logger.warning(
+                "%s %s is skipped, its digest is not pinned: record the SHA-256 of %s in utils/fonts.py.",
+                font.family,
+                font.version,
+                font.url,
+            )
+            continue
+        originals = read_source(font, source_dir)
+        for weight in sorted(weights & originals.keys()):
+            data = subset_woff2(originals[weight], glyphs)
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            name = f"{font.family.lower()}-{weight}.{digest}.woff2"
+            (FONTS_DIR / name).write_bytes(data)
+            manifest["fonts"].append(
+                {
+                    "family": font.family,
+                    "version": font.version,
+                    "weight": weight,
+                    "src": f"/{FONTS_DIR.relative_to(ASSETS_DIR).as_posix()}/{name}",
+                }
+            )
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def load_manifest() -> list[dict]:
+    """Load the vendored fonts, if the pipeline has been run.
+
+    Returns:
+        The manifest entry of each font file.
+    """
+    if not MANIFEST_PATH.exists():
+        return []
+    return json.loads(MANIFEST_PATH.read_text())["fonts"]
+
+
+def font_stack() -> str:
+    """Get the ``font-family`` of the page.
+
+    Returns:
+        The vendored families, then the system fonts.
+    """
+    families = dict.fromkeys(f"'{font['family']}'" for font in load_manifest())
+    return ", ".join([*families, SYSTEM_FONTS])
+
+
+def font_face_css(fonts: list[dict]) -> str:
+    """Build the @font-face rules of the vendored fonts.
+
+    Args:
+        fonts: The manifest entries.
+
+    Returns:
+        The CSS declaring every font file.
+    """
+    return "\n".join(
+        f"@font-face {{ font-family: '{font['family']}'; font-style: normal; "
+        f"font-weight: {font['weight']}; font-display: {FONT_DISPLAY}; "
+        f"src: url({font['src']}) format('woff2'); }}"
+        for font in fonts
+    )
+
+
+def font_head_tags() -> list[rx.Component]:
+    """Build the head tags preloading and declaring the vendored fonts.
+
+    Returns:
+        A preload link per font file and a style tag with the @font-face rules.
+    """
+    fonts = load_manifest()
+    if not fonts:
+        return []
+    return [
+        *(
+            rx.el.link(
+                rel="preload",
+                href=font["src"],
+                type="font/woff2",
+                cross_origin="anonymous",
+                custom_attrs={"as": "font"},
+            )
+            for font in fonts
+        ),
+        rx.el.style(font_face_css(fonts)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source",
+        type=Path,
+        help="Directory holding the release archives instead of downloading them.",
+    )
+    args = parser.parse_args()
+
+    from portofolio_reflex.pages.index.page import create_portfolio_page
+
+    manifest = build_fonts(create_portfolio_page(), args.source)
+    for font in manifest["fonts"]:
+        print(f"{font['family']} {font['weight']}: {font['src']}")
+
+
+if __name__ == "__main__":
+    main()
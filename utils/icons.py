@@ -0,0 +1,313 @@
+"""Build an SVG sprite holding only the icons used by the portfolio.
+
+The icon helpers render ``<svg><use href="<sprite>#<name>"/></svg>``. The
+pinned Lucide release is downloaded once and checked against the integrity
+hash published by npm before it is unpacked (or the icons are read from a
+local directory for offline builds), and the icons referenced by the
+compiled page are written as the ``<symbol>`` elements of a single
+content-hashed sprite under ``assets/icons``, together with a manifest read
+by the helpers. At compile time, ``IconsPlugin`` fails the build if an icon
+is missing from the sprite. Before the sprite is built, e.g. in a fresh
+checkout or while the integrity hash is not pinned, the icons render empty
+and the plugin only warns, like the fonts without their manifest.
+
+Usage:
+    python -m utils.icons [--source DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import functools
+import hashlib
+import io
+import json
+import logging
+import re
+import tarfile
+import urllib.request
+from pathlib import Path
+
+import reflex as rx
+from reflex.plugins import Plugin
+
+from utils.components import iter_components, literal
+
+# Under the logger of Reflex, which prints at the log level of the compile.
+logger = logging.getLogger("reflex").getChild(__name__)
+
+ASSETS_DIR = Path("assets")
+ICONS_DIR = ASSETS_DIR / "icons"
+MANIFEST_PATH = ICONS_DIR / "manifest.json"
+CACHE_DIR = Path(".cache") / "icons"
+
+# The last Lucide release shipping the brand icons (github, linkedin, twitter).
+LUCIDE_VERSION = "0.460.0"
+LUCIDE_URL = (
+    f"https://registry.npmjs.org/lucide-static/-/lucide-static-{LUCIDE_VERSION}.tgz"
+)
+# The `dist.integrity` of the release on npm, `npm view lucide-static@<version>
+# dist.integrity`. Not pinned yet: the release is not downloaded until it is
+# recorded here, see `build_sprite`.
+LUCIDE_INTEGRITY = ""
+
+# Attributes of the icon files applying to the whole glyph, moved to its symbol.
+SYMBOL_ATTRIBUTES = (
+    "viewBox",
+    "fill",
+    "stroke",
+    "stroke-width",
+    "stroke-linecap",
+    "stroke-linejoin",
+)
+
+
+class MissingIconError(FileNotFoundError):
+    """An icon is not part of the sprite or of the Lucide release."""
+
+
+class ChecksumError(ValueError):
+    """The Lucide release archive does not match its pinned integrity hash."""
+
+
+def icon_name(tag: str) -> str:
+    """Get the Lucide file name of an icon tag, e.g. ``map_pin`` -> ``map-pin``."""
+    return tag.replace("_", "-")
+
+
+@functools.cache
+def load_manifest() -> dict:
+    """Load the sprite, if the pipeline has been run.
+
+    The manifest is read once per process, and again after ``build_sprite``.
+
+    Returns:
+        The source of the sprite and the names of its icons.
+    """
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def icon_href(tag: str) -> str:
+    """Get the reference of an icon for a ``<use>`` element.
+
+    Args:
+        tag: The name of the icon.
+
+    Returns:
+        The icon symbol in the sprite, or a bare fragment before the sprite is built.
+    """
+    return f"{load_manifest().get('src', '')}#{icon_name(tag)}"
+
+
+def used_icons(root: rx.Component) -> set[str]:
+    """Get the icons referenced by a page.
+
+    Args:
+        root: The compiled page tree.
+
+    Returns:
+        The names of the icons of every ``<use>`` element.
+    """
+    icons = set()
+    for component in iter_components(root):
+        if getattr(component, "tag", None) == "use":
+            href = literal(getattr(component, "href", None))
+            if isinstance(href, str) and "#" in href:
+                icons.add(href.rpartition("#")[2])
+    return icons
+
+
+def verify_release(data: bytes, origin: str | Path):
+    """Check the release archive against its pinned integrity hash.
+
+    Args:
+        data: The content of the archive.
+        origin: Where the archive was read from, for the error.
+
+    Raises:
+        ChecksumError: If the archive does not have the pinned integrity hash.
+    """
+    algorithm, _, expected = LUCIDE_INTEGRITY.partition("-")
+    digest = base64.b64encode(
+        hashlib.new(algorithm or "sha512", data).digest()
+    ).decode()
+    if digest != expected:
+        raise ChecksumError(
+            f"{origin} has the integrity {algorithm or 'sha512'}-{digest}, expected {LUCIDE_INTEGRITY or 'none'}: "
+            f"check it against lucide-static {LUCIDE_VERSION} on npm and pin it in utils/icons.py."
+        )
+
+
+def read_icons(names: list[str], source_dir: Path | None = None) -> dict[str, bytes]:
+    """Read the original files of some icons.
+
+    Args:
+        names: The names of the icons.
+        source_dir: A local directory holding the icon files, for offline builds.
+
+    Returns:
+        The SVG file of each icon.
+
+    Raises:
+        MissingIconError: If an icon is not part of the release.
+        ChecksumError: If the release is not the pinned one, before it is unpacked.
+    """
+    if source_dir is not None:
+        paths = {name: source_dir / f"{name}.svg" for name in names}
+        if missing := [name for name, path in paths.items() if not path.is_file()]:
+            raise MissingIconError(f"{', '.join(missing)} not found in {source_dir}.")
+        return {name: path.read_bytes() for name, path in paths.items()}
+
+    archive = CACHE_DIR / LUCIDE_URL.rsplit("/", 1)[-1]
+    if archive.exists():
+        data = archive.read_bytes()
+        verify_release(data, archive)
+    else:
+        with urllib.request.urlopen(LUCIDE_URL) as response:
+            data = response.read()
+        # Only a verified archive is cached.
+        verify_release(data, LUCIDE_URL)
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        archive.write_bytes(data)
+
+    with tarfile.open(fileobj=io.BytesIO(data)) as release:
+        files = {}
+        for name in names:
+            try:
+                member = release.extractfile(f"package/icons/{name}.svg")
+            except KeyError:
+                member = None
+            if member is None:
+                raise MissingIconError(f"{name} is not a Lucide {LUCIDE_VERSION} icon.")
+            files[name] = member.read()
+        return files
+
+
+def symbol(name: str, svg: bytes) -> str:
+    """Turn an icon file into a sprite symbol.
+
+    Args:
+        name: The name of the icon, used as the id of the symbol.
+        svg: The SVG file of the icon.
+
+    Returns:
+        The ``<symbol>`` element of the icon.
+    """
+    match = re.search(r"<svg\b([^>]*)>(.*)</svg>", svg.decode(), re.DOTALL)
+    if match is None:
+        raise ValueError(f"{name} is not an SVG file.")
+    attributes = dict(re.findall(r'([\w:-]+)="([^"]*)"', match[1]))
+    kept = "".join(
+        f' {key}="{attributes[key]}"' for key in SYMBOL_ATTRIBUTES if key in attributes
+    )
+    body = re.sub(r">\s+<", "><", match[2].strip())
+    return f'<symbol id="{name}"{kept}>{body}</symbol>'
+
+
+def build_sprite(root: rx.Component, source_dir: Path | None = None) -> dict:
+    """Write the sprite of the icons of a page and its manifest.
+
+    Args:
+        root: The compiled page tree.
+        source_dir: A local directory holding the icon files, for offline builds.
+
+    Returns:
+        The manifest of the sprite, empty if it is not built.
+    """
+    if source_dir is None and not LUCIDE_INTEGRITY:
+        logger.warning(
+            "The icon sprite is not built, the integrity of lucide-static %s is not pinned: "
+            "record its npm `dist.integrity` in utils/icons.py.",
+            LUCIDE_VERSION,
+        )
+        return {}
+    names = sorted(used_icons(root))
+    icons = read_icons(names, source_dir)
+    sprite = (
+        f'<svg xmlns="http://www.w3.org/2000/svg">'
+        f"<!-- Lucide v{LUCIDE_VERSION}, ISC license -->"
+        f"{''.join(symbol(name, icons[name]) for name in names)}</svg>\n"
+    ).encode()
+
+    ICONS_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in ICONS_DIR.glob("sprite.*.svg"):
+        stale.unlink()
+    digest = hashlib.sha256(sprite).hexdigest()[:10]
+    name = f"sprite.{digest}.svg"
+    (ICONS_DIR / name).write_bytes(sprite)
+
+    manifest = {
+        "version": LUCIDE_VERSION,
+        "src": f"/{ICONS_DIR.relative_to(ASSETS_DIR).as_posix()}/{name}",
+        "icons": names,
+    }
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n")
+    load_manifest.cache_clear()
+    return manifest
+
+
+class IconsPlugin(Plugin):
+    """Fail the build when a page uses an icon missing from the sprite."""
+
+    manifest: dict | None = None
+    warned: bool = False
+
+    def enter_component(
+        self, comp, /, *, page_context, compile_context, in_prop_tree=False
+    ):
+        """Check that an icon reference points to the current sprite.
+
+        Args:
+            comp: The component being compiled.
+            page_context: The active page compilation state.
+            compile_context: The active compile-run state.
+            in_prop_tree: Whether the component is visited through a prop subtree.
+
+        Raises:
+            MissingIconError: If the icon is not part of the built sprite.
+        """
+        if getattr(comp, "tag", None) != "use":
+            return
+        href = literal(getattr(comp, "href", None))
+        if not isinstance(href, str) or "#" not in href:
+            return
+
+        if self.manifest is None:
+            self.manifest = load_manifest()
+        if not self.manifest:
+            if not self.warned:
+                logger.warning(
+                    "The icon sprite is not built, run `python -m utils.icons` to show the icons."
+                )
+                self.warned = True
+            return
+        src, _, name = href.rpartition("#")
+        if src != self.manifest.get("src") or name not in self.manifest.get(
+            "icons", ()
+        ):
+            raise MissingIconError(
+                f"{name} is not in the icon sprite, run `python -m utils.icons` first."
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source",
+        type=Path,
+        help="Directory holding the Lucide icon files instead of downloading them.",
+    )
+    args = parser.parse_args()
+
+    from portofolio_reflex.pages.index.page import create_portfolio_page
+
+    manifest = build_sprite(create_portfolio_page(), args.source)
+    if manifest:
+        print(f"{manifest['src']}: {', '.join(manifest['icons'])}")
+
+
+if __name__ == "__main__":
+    main()
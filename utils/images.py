@@ -0,0 +1,228 @@
+"""Generate responsive variants of the local photos of the portfolio.
+
+Every raster image at the root of ``assets/`` is resized to a few widths and
+encoded as AVIF and WebP under ``assets/img``, with content-hashed names. A
+tiny blurred placeholder is inlined in the manifest, so the page can reserve
+the space of the image and paint something before it loads. Every variant, one
+per format and width, is encoded on its own, in parallel across the cores,
+see ``utils/parallel.py``.
+
+Usage:
+    python -m utils.images [--jobs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from utils.parallel import StageReport, run_stage
+
+ASSETS_DIR = Path("assets")
+IMAGES_DIR = ASSETS_DIR / "img"
+MANIFEST_PATH = IMAGES_DIR / "manifest.json"
+
+SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+# Widths covering a 3rem avatar up to a third of the widest layout, at 1x and 2x.
+WIDTHS = (48, 96, 160, 320, 480, 640, 800)
+
+# Formats in order of preference, with their encoder settings.
+FORMATS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 75, "method": 6},
+}
+
+PLACEHOLDER_WIDTH = 16
+
+
+def encode(image, fmt: str, **options) -> bytes:
+    """Encode an image in the given format.
+
+    Args:
+        image: The Pillow image.
+        fmt: The name of the format.
+        options: The encoder settings.
+
+    Returns:
+        The encoded image.
+    """
+    output = io.BytesIO()
+    image.save(output, fmt.upper(), **options)
+    return output.getvalue()
+
+
+def placeholder(image) -> str:
+    """Build the inline low quality placeholder of an image.
+
+    Args:
+        image: The Pillow image.
+
+    Returns:
+        A WebP data URI of a few hundred bytes.
+    """
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    thumbnail = image.resize((PLACEHOLDER_WIDTH, height))
+    data = encode(thumbnail, "webp", quality=30)
+    return f"data:image/webp;base64,{base64.b64encode(data).decode()}"
+
+
+def open_image(path: Path):
+    """Open an image upright, in RGB.
+
+    Args:
+        path: The image.
+
+    Returns:
+        The Pillow image, rotated according to its EXIF orientation.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as original:
+        return ImageOps.exif_transpose(original).convert("RGB")
+
+
+def variant_widths(width: int) -> list[int]:
+    """Get the widths of the variants of an image.
+
+    Args:
+        width: The width of the original image.
+
+    Returns:
+        The widths narrower than the image, then the width of the image.
+    """
+    return [variant for variant in WIDTHS if variant < width] + [width]
+
+
+def encode_variant(task: tuple[Path, str, int, Path]) -> str:
+    """Write a variant of an image.
+
+    Args:
+        task: The original image, the format and width of the variant, and
+            the directory to write it to.
+
+    Returns:
+        The name of the variant, hashed from its content.
+    """
+    from PIL import Image
+
+    path, fmt, width, output_dir = task
+    image = open_image(path)
+    height = round(image.height * width / image.width)
+    data = encode(image.resize((width, height), Image.LANCZOS), fmt, **FORMATS[fmt])
+    name = f"{path.stem}-{width}.{hashlib.sha256(data).hexdigest()[:10]}.{fmt}"
+    (output_dir / name).write_bytes(data)
+    return name
+
+
+def encode_variants(
+    paths: list[Path], output_dir: Path, jobs: int | None = None
+) -> tuple[dict[Path, dict], StageReport]:
+    """Write the variants of some images, every variant in its own job.
+
+    Args:
+        paths: The original images.
+        output_dir: The directory to write the variants to.
+        jobs: The number of processes, see ``utils.parallel.run_stage``.
+
+    Returns:
+        The size of each image with the names and widths of its variants by
+        format, and the report of the stage.
+    """
+    sizes = {path: open_image(path).size for path in paths}
+    tasks = [
+        (path, fmt, width, output_dir)
+        for path in paths
+        for fmt in FORMATS
+        for width in variant_widths(sizes[path][0])
+    ]
+    names, report = run_stage("images", encode_variant, tasks, jobs)
+
+    images = {
+        path: {"size": size, "sources": {fmt: [] for fmt in FORMATS}}
+        for path, size in sizes.items()
+    }
+    for (path, fmt, width, _), name in zip(tasks, names):
+        images[path]["sources"][fmt].append([name, width])
+    return images, report
+
+
+def build_images(jobs: int | None = None) -> tuple[dict[str, dict], StageReport]:
+    """Write the variants of every local photo and their manifest.
+
+    Args:
+        jobs: The number of processes, see ``utils.parallel.run_stage``.
+
+    Returns:
+        The manifest entry of each image, keyed by its source in the pages,
+        and the report of the stage.
+    """
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in IMAGES_DIR.iterdir():
+        if stale.suffix[1:] in FORMATS:
+            stale.unlink()
+
+    paths = sorted(
+        path for path in ASSETS_DIR.iterdir() if path.suffix.lower() in SOURCE_SUFFIXES
+    )
+    images, report = encode_variants(paths, IMAGES_DIR, jobs)
+    prefix = f"/{IMAGES_DIR.relative_to(ASSETS_DIR).as_posix()}"
+    manifest = {
+        f"/{path.name}": {
+            "width": image["size"][0],
+            "height": image["size"][1],
+            "placeholder": placeholder(open_image(path)),
+            "sources": {
+                fmt: [[f"{prefix}/{name}", width] for name, width in variants]
+                for fmt, variants in image["sources"].items()
+            },
+        }
+        for path, image in images.items()
+    }
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return manifest, report
+
+
+def load_manifest() -> dict[str, dict]:
+    """Load the generated image variants.
+
+    Returns:
+        The manifest entry of each image, keyed by its source in the pages.
+    """
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def src_set(variants: list[list]) -> str:
+    """Format the variants of an image as a ``srcset`` attribute.
+
+    Args:
+        variants: The source and width of each variant.
+
+    Returns:
+        The candidate list, one entry per width.
+    """
+    return ", ".join(f"{src} {width}w" for src, width in variants)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--jobs", type=int, help="Number of processes, every core by default."
+    )
+    args = parser.parse_args()
+
+    manifest, report = build_images(args.jobs)
+    for src, image in manifest.items():
+        count = sum(len(variants) for variants in image["sources"].values())
+        print(f"{src}: {count} variants ({image['width']}x{image['height']})")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
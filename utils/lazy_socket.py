@@ -0,0 +1,200 @@
+"""Open the event websocket only when the visitor needs the backend.
+
+By default the Reflex client connects to ``/_event`` as soon as the page is
+loaded and keeps the socket, with the session state behind it, open for as
+long as the tab lives. ``LazySocketPlugin`` patches the generated
+``utils/state.js`` so the client:
+
+* no longer connects when the page mounts, nor warms the transport up;
+* connects when an event needing the backend is triggered, or when an element
+  marked with ``WARMUP_ATTRIBUTE`` gets the focus, e.g. the contact form, so
+  the socket is usually open by the time the form is submitted;
+* applies the events handled in the browser, such as scripts and redirects,
+  without waiting for the socket, unless an event queued before them needs
+  the backend;
+* disconnects once no event needed the backend for ``idle_timeout`` seconds,
+  and does not reconnect when the tab becomes visible again until it does.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from string import Template
+
+from reflex.plugins import Plugin
+
+STATE_JS = "utils/state.js"
+
+# Focusing an element inside an element with this attribute connects the socket.
+WARMUP_ATTRIBUTE = "data-connect-backend"
+
+MARKER = "// Lazy event socket, patched by utils/lazy_socket.py."
+
+# Seconds without any event needing the backend before the socket is closed.
+DEFAULT_IDLE_TIMEOUT = 60
+
+HELPERS = Template("""
+$marker
+const lazySocket = { idleTimeout: $idle_timeout_ms, idle: false, timer: undefined };
+
+const needsBackend = (event) =>
+  typeof event?.name === "string" &&
+  (event.name.startsWith("reflex___state") || event.name === SYNC_LOCAL_STORAGE);
+
+const scheduleIdleDisconnect = (socket) => {
+  lazySocket.idle = false;
+  clearTimeout(lazySocket.timer);
+  lazySocket.timer = setTimeout(() => {
+    if (event_queue.length > 0) {
+      scheduleIdleDisconnect(socket);
+    } else if (socket.current?.connected) {
+      lazySocket.idle = true;
+      socket.current.disconnect();
+    }
+  }, lazySocket.idleTimeout);
+};
+""")
+
+# The snippets of the template replaced by the patch, with their replacement.
+PATCHES = (
+    # Declare the helpers next to the event queue.
+    (
+        'const SYNC_LOCAL_STORAGE = "_sync_local_storage";\n',
+        'const SYNC_LOCAL_STORAGE = "_sync_local_storage";\n$helpers',
+    ),
+    # Coming back to the tab only reconnects a socket that was not idle.
+    (
+        '    if (document.visibilityState === "visible") {\n',
+        '    if (document.visibilityState === "visible" && !lazySocket.idle) {\n',
+    ),
+    # Without a socket, the events not needing the backend at the head of the
+    # queue are still applied, in order, instead of waiting for a connection.
+    (
+        "  if (!(socket && socket.connected) && isStateful()) {\n",
+        "  if (\n"
+        "    !(socket && socket.connected) &&\n"
+        "    isStateful() &&\n"
+        "    needsBackend(event_queue[0])\n"
+        "  ) {\n",
+    ),
+    # Every connection request postpones the idle disconnection.
+    (
+        "  const ensureSocketConnected = useCallback(async () => {\n",
+        "  const ensureSocketConnected = useCallback(async () => {\n"
+        "    scheduleIdleDisconnect(socket);\n",
+    ),
+    # Only connect for the events needing the backend.
+    (
+        "    if (!event_actions?.temporal) {\n"
+        "      // Reconnect socket if needed for non-temporal events.\n"
+        "      ensureSocketConnected();\n",
+        "    if (!event_actions?.temporal && _events.some(needsBackend)) {\n"
+        "      // Connect the socket on demand for the events needing the backend.\n"
+        "      ensureSocketConnected();\n",
+    ),
+    # Instead of connecting when the page mounts, connect when an element
+    # asking for it gets the focus.
+    (
+        "    mounted.current = true;\n    ensureSocketConnected();\n",
+        "    mounted.current = true;\n"
+        "    const warmUp = (event) => {\n"
+        '      if (event.target?.closest?.("[$attribute]")) {\n'
+        "        ensureSocketConnected();\n"
+        "      }\n"
+        "    };\n"
+        '    document.addEventListener("focusin", warmUp);\n',
+    ),
+    (
+        "    return () => {\n      mounted.current = false;\n",
+        "    return () => {\n"
+        '      document.removeEventListener("focusin", warmUp);\n'
+        "      clearTimeout(lazySocket.timer);\n"
+        "      mounted.current = false;\n",
+    ),
+)
+
+
+# The blocks of the template removed by the patch, from their first line up to
+# the line they end before.
+REMOVALS = (
+    # Do not warm the transport up while the page loads. Without a warm
+    # transport, the socket connecting on demand creates its own.
+    (
+        "// Start only the transport while React is still preparing to mount.",
+        "if (import.meta.hot) {\n",
+    ),
+)
+
+
+class LazySocketError(RuntimeError):
+    """The generated client no longer matches the patch."""
+
+
+def _find_once(state_js: str, snippet: str):
+    """Check that a snippet of the template appears exactly once.
+
+    Raises:
+        LazySocketError: If the snippet is missing or repeated.
+    """
+    if state_js.count(snippet) != 1:
+        raise LazySocketError(
+            f"{STATE_JS} does not contain {snippet!r} exactly once, "
+            "update utils/lazy_socket.py for this Reflex version."
+        )
+
+
+def lazy_connect(state_js: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> str:
+    """Patch the Reflex client to connect its event socket on demand.
+
+    Args:
+        state_js: The content of ``utils/state.js``.
+        idle_timeout: Seconds without any event needing the backend before the
+            socket is closed.
+
+    Returns:
+        The patched client, unchanged if it was already patched.
+
+    Raises:
+        LazySocketError: If a patched snippet is not found exactly once, or a
+            removed block does not end where expected.
+    """
+    if MARKER in state_js:
+        return state_js
+    for start, end in REMOVALS:
+        _find_once(state_js, start)
+        before, _, block = state_js.partition(start)
+        if end not in block:
+            raise LazySocketError(
+                f"{STATE_JS} does not contain {end!r} after {start!r}, "
+                "update utils/lazy_socket.py for this Reflex version."
+            )
+        state_js = before + end + block.partition(end)[2]
+
+    helpers = HELPERS.substitute(
+        marker=MARKER, idle_timeout_ms=round(idle_timeout * 1000)
+    )
+    for original, replacement in PATCHES:
+        _find_once(state_js, original)
+        replacement = Template(replacement).safe_substitute(
+            helpers=helpers, attribute=WARMUP_ATTRIBUTE
+        )
+        state_js = state_js.replace(original, replacement)
+    return state_js
+
+
+@dataclasses.dataclass
+class LazySocketPlugin(Plugin):
+    """Connect the event websocket only while the visitor interacts with the backend."""
+
+    # Seconds without any event needing the backend before the socket is closed.
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+
+    def pre_compile(self, **context):
+        """Patch the client of the app.
+
+        Args:
+            context: The context for the plugin.
+        """
+        context["add_modify_task"](
+            STATE_JS, lambda state_js: lazy_connect(state_js, self.idle_timeout)
+        )
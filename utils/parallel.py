@@ -0,0 +1,112 @@
+"""Map a function over the items of a build stage in a pool of processes.
+
+``run_stage`` runs the items in forked processes, which inherit the imported
+modules instead of importing them again, and returns the results in the
+order of the items whatever the order they finish in, so the output does not
+depend on the number of jobs. ``utils/images.py`` encodes each variant of the
+photos, one per format and width, this way.
+
+The CPU time of each item, its subprocesses included, is measured in its
+worker. Their sum is about how long the stage takes on a single core, so the
+report gives the speedup without a serial run, and is not inflated when the
+jobs outnumber the free cores like the wall time of each item would be.
+"""
+
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, NamedTuple, TypeVar
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+# The number of processes of a stage, every usable core by default.
+JOBS_ENV = "BUILD_JOBS"
+
+
+class StageReport(NamedTuple):
+    """How long a stage took, in seconds."""
+
+    name: str
+    items: int
+    jobs: int
+    wall: float
+    # The CPU time of the items, about the wall time on a single core.
+    work: float
+
+    @property
+    def speedup(self) -> float:
+        """The work done per second of wall time."""
+        return self.work / self.wall if self.wall else 1.0
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.items} items on {self.jobs} jobs in {self.wall:.2f} s, "
+            f"{self.work:.2f} s of work, speedup x{self.speedup:.1f}"
+        )
+
+
+def default_jobs() -> int:
+    """Get the number of processes of a stage.
+
+    Returns:
+        The value of ``BUILD_JOBS``, or the number of cores usable by the build.
+    """
+    if jobs := os.environ.get(JOBS_ENV):
+        return max(1, int(jobs))
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _cpu_time() -> float:
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+
+def _timed(function: Callable[[Item], Result], item: Item) -> tuple[Result, float]:
+    start = _cpu_time()
+    result = function(item)
+    return result, _cpu_time() - start
+
+
+def run_stage(
+    name: str,
+    function: Callable[[Item], Result],
+    items: Iterable[Item],
+    jobs: int | None = None,
+) -> tuple[list[Result], StageReport]:
+    """Apply a function to every item of a stage in parallel.
+
+    Args:
+        name: The name of the stage, in the report.
+        function: A module level function, its arguments and results picklable.
+        items: The inputs of the function.
+        jobs: The number of processes, ``default_jobs()`` if None. A single
+            job, or a platform without ``fork``, runs the stage in this process.
+
+    Returns:
+        The result of each item in the order of the items, and the report.
+    """
+    items = list(items)
+    jobs = max(1, min(jobs or default_jobs(), len(items)))
+    if "fork" not in multiprocessing.get_all_start_methods():
+        jobs = 1
+
+    start = time.perf_counter()
+    if jobs == 1:
+        timed = [_timed(function, item) for item in items]
+    else:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(jobs, mp_context=context) as pool:
+            timed = list(pool.map(functools.partial(_timed, function), items))
+    wall = time.perf_counter() - start
+
+    report = StageReport(
+        name, len(items), jobs, wall, sum(duration for _, duration in timed)
+    )
+    return [result for result, _ in timed], report
@@ -0,0 +1,160 @@
+"""Prerender the pages that opt in through ``template(prerender=True)``.
+
+React Router prerenders the HTML of the listed routes at export time and the
+client hydrates on top of it, so the first paint no longer waits for the
+JavaScript bundle. The critical CSS of each prerendered page is then inlined
+with Beasties and the full stylesheets are loaded without blocking rendering.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import subprocess
+from pathlib import Path
+
+from reflex.plugins import Plugin
+from reflex_base.constants import ReactRouter
+
+from utils.routes import RouteIndex
+
+# Under the logger of Reflex, which prints at the log level of the export.
+logger = logging.getLogger("reflex").getChild(__name__)
+
+BEASTIES_VERSION = "beasties@0.2.0"
+
+CRITICAL_CSS_SCRIPT = "critical-css.js"
+
+CRITICAL_CSS_SOURCE = """\
+/* Inline the critical CSS of prerendered pages, written by utils/prerender.py. */
+import Beasties from "beasties";
+import { readFile, writeFile } from "node:fs/promises";
+
+const [staticDir, ...pages] = process.argv.slice(2);
+const beasties = new Beasties({
+  path: staticDir,
+  publicPath: "/",
+  preload: "swap",
+  pruneSource: false,
+  inlineFonts: false,
+  logLevel: "warn",
+});
+for (const page of pages) {
+  await writeFile(page, await beasties.process(await readFile(page, "utf8")));
+}
+"""
+
+
+def prerendered_routes(routes: RouteIndex) -> list[str]:
+    """Get the static routes whose page opted in to prerendering.
+
+    Args:
+        routes: The routes registered through the template.
+
+    Returns:
+        The routes to prerender, in a stable order.
+    """
+    return [
+        route for route, data in routes if data.get("prerender") and "[" not in route
+    ]
+
+
+def restrict_prerender(config_js: str, routes: list[str]) -> str:
+    """Prerender only the given routes instead of every route.
+
+    Args:
+        config_js: The content of ``react-router.config.js``.
+        routes: The routes to prerender.
+
+    Returns:
+        The updated config, unchanged if prerendering is disabled for the build.
+
+    Raises:
+        ValueError: If the config is not the object exported by Reflex.
+    """
+    prefix = "export default "
+    if not config_js.strip().startswith(prefix):
+        raise ValueError(f"{ReactRouter.CONFIG_FILE} does not start with {prefix!r}.")
+    config = json.loads(config_js.strip().removeprefix(prefix).removesuffix(";"))
+    if not config.get("prerender"):
+        return config_js
+    config["prerender"] = routes or False
+    return f"{prefix}{json.dumps(config)};"
+
+
+def page_files(static_dir: Path, route: str) -> list[Path]:
+    """Get the HTML files written for a prerendered route.
+
+    Args:
+        static_dir: The exported frontend.
+        route: The route.
+
+    Returns:
+        The existing ``<route>/index.html`` file and its ``<route>.html`` copy.
+    """
+    path = route.strip("/")
+    candidates = [static_dir / path / "index.html"]
+    if path:
+        candidates.append(static_dir / f"{path}.html")
+    return [candidate for candidate in candidates if candidate.is_file()]
+
+
+def inline_critical_css(static_dir: Path, pages: list[str]):
+    """Inline the critical CSS of the prerendered pages, in a single Node process.
+
+    Args:
+        static_dir: The exported frontend.
+        pages: The HTML files of the prerendered pages, rewritten in place.
+    """
+    subprocess.run(
+        ["node", CRITICAL_CSS_SCRIPT, str(static_dir.resolve()), *pages],
+        cwd=static_dir.parents[1],
+        check=True,
+    )
+
+
+class PrerenderPlugin(Plugin):
+    """Prerender the opted-in pages and inline their critical CSS."""
+
+    def get_frontend_development_dependencies(self, **context) -> list[str]:
+        """Get the packages required by the plugin.
+
+        Args:
+            context: The context for the plugin.
+
+        Returns:
+            Beasties, used to extract the critical CSS.
+        """
+        return [BEASTIES_VERSION]
+
+    def pre_compile(self, **context):
+        """Restrict prerendering to the opted-in pages.
+
+        Args:
+            context: The context for the plugin.
+        """
+        from portofolio_reflex.templates.template import routes
+
+        context["add_save_task"](lambda: (CRITICAL_CSS_SCRIPT, CRITICAL_CSS_SOURCE))
+        context["add_modify_task"](
+            ReactRouter.CONFIG_FILE,
+            lambda config_js: restrict_prerender(config_js, prerendered_routes(routes)),
+        )
+
+    def post_build(self, **context):
+        """Inline the critical CSS of the prerendered pages.
+
+        Args:
+            context: The context for the plugin.
+        """
+        from portofolio_reflex.templates.template import routes
+
+        static_dir = context["static_dir"]
+        pages = [
+            str(page.resolve())
+            for route in prerendered_routes(routes)
+            for page in page_files(static_dir, route)
+        ]
+        if pages:
+            inline_critical_css(static_dir, pages)
+            logger.info("Inlined the critical CSS of %d pages", len(pages))
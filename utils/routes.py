@@ -1,25 +1,274 @@
-def structure_routes(routes):
-    tree = {}
-    for route in routes:
-        parts = route["route"].strip("/").split("/")
-        current_level = tree
-        for i, part in enumerate(parts):
-            if part not in current_level:
-                current_level[part] = {"route": None, "child": {}}
-            if i == len(parts) - 1:
-                current_level[part].update(route)
-            current_level = current_level[part]["child"]
-    return tree
-
-
-def yield_all_children(dictionary):
-    # Yield the current dictionary to the caller
-    yield dictionary
-    # Iterate through all key-value pairs in the dictionary
-    for key, value in dictionary.items():
-        # If the value is a dictionary, we check if we need to go deeper
-        if isinstance(value, dict):
-            yield from yield_all_children(value)
-        # If the key is 'child' and its value is a non-empty dictionary, we traverse this child
-        elif key == "child" and value:
-            yield from yield_all_children(value)
+"""Route index of the app, used for navigation and sitemap generation.
+
+Routes are stored in a trie with one node per path segment. Besides static
+segments, a node can have one ``[param]`` child and one catch-all child,
+written ``[...param]`` or ``[[...param]]`` when it may match nothing.
+
+At each level a static segment wins over a parameter, which wins over a
+catch-all. A match follows the preferred child and backtracks to the next
+one only on a dead end, e.g. ``/projects/new/edit`` with ``/projects/new``
+and ``/projects/[slug]/edit``; being a tree, the trie is never visited
+twice. A longest prefix lookup keeps at most two nodes per level instead,
+the preferred one and a fallback.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterator, NamedTuple
+
+
+class RouteNode:
+    """A segment of the route trie."""
+
+    __slots__ = ("segment", "route", "data", "static", "param", "catch_all")
+
+    def __init__(self, segment: str = ""):
+        self.segment = segment
+        # The full route when a page is registered at this node.
+        self.route: str | None = None
+        self.data: dict[str, Any] | None = None
+        self.static: dict[str, RouteNode] | None = None
+        self.param: RouteNode | None = None
+        self.catch_all: RouteNode | None = None
+
+    @property
+    def name(self) -> str:
+        """The parameter name of a dynamic segment."""
+        return self.segment.strip("[]").removeprefix("...")
+
+    @property
+    def optional(self) -> bool:
+        """Whether a catch-all segment also matches an empty path."""
+        return self.segment.startswith("[[")
+
+    def children(self) -> list[RouteNode]:
+        """Get the child segments, static ones sorted first.
+
+        Returns:
+            The child nodes.
+        """
+        children = [self.static[key] for key in sorted(self.static or ())]
+        return children + [child for child in (self.param, self.catch_all) if child]
+
+    def __repr__(self):
+        return f"RouteNode({self.segment!r}, route={self.route!r})"
+
+
+class RouteMatch(NamedTuple):
+    """The route matching a path, with its parameters."""
+
+    route: str
+    params: dict[str, str | list[str]]
+    data: dict[str, Any]
+
+
+def split_route(route: str) -> list[str]:
+    """Split a route into its segments.
+
+    Args:
+        route: The route or path, with or without surrounding slashes.
+
+    Returns:
+        The non empty segments.
+    """
+    return [segment for segment in route.strip("/").split("/") if segment]
+
+
+def normalize_route(route: str) -> str:
+    """Format a route the way it is stored in the index.
+
+    Args:
+        route: The route, with or without surrounding slashes.
+
+    Returns:
+        The route with a single leading slash.
+    """
+    return "/" + "/".join(split_route(route))
+
+
+def _dynamic_child(node: RouteNode | None, segment: str, route: str) -> RouteNode:
+    """Get or create the dynamic child of a node, rejecting conflicting names."""
+    if node is None:
+        return RouteNode(segment)
+    if node.segment != segment:
+        raise ValueError(f"{segment} in {route} conflicts with {node.segment}.")
+    return node
+
+
+def _candidates(
+    node: RouteNode, segments: list[str], position: int, params: dict
+) -> list[tuple[RouteNode, int, dict]]:
+    """Get the children of a node that may match the rest of a path.
+
+    Args:
+        node: The node reached.
+        segments: The segments of the path.
+        position: The index of the next segment.
+        params: The parameters captured up to the node.
+
+    Returns:
+        The child, the index of the segment after it and the parameters
+        captured with it, the least preferred first.
+    """
+    segment = segments[position]
+    candidates = []
+    catch_all = node.catch_all
+    if catch_all is not None and catch_all.route is not None:
+        candidates.append(
+            (catch_all, len(segments), {**params, catch_all.name: segments[position:]})
+        )
+    if node.param is not None:
+        candidates.append(
+            (node.param, position + 1, {**params, node.param.name: segment})
+        )
+    child = node.static.get(segment) if node.static else None
+    if child is not None:
+        candidates.append((child, position + 1, params))
+    return candidates
+
+
+class RouteIndex:
+    """A trie of routes, matched one segment at a time."""
+
+    __slots__ = ("root", "_size")
+
+    def __init__(self, routes: list[dict[str, Any]] | None = None):
+        self.root = RouteNode()
+        self._size = 0
+        for route in routes or []:
+            self.add(**route)
+
+    def add(self, route: str, **data: Any) -> RouteNode:
+        """Register a route.
+
+        Args:
+            route: The route, e.g. ``/projects/[slug]``.
+            data: Metadata kept with the route, such as its title.
+
+        Returns:
+            The node of the route.
+
+        Raises:
+            ValueError: If a catch-all segment is not the last one, or if a
+                dynamic segment is named differently than an existing sibling.
+        """
+        node = self.root
+        segments = split_route(route)
+        for position, segment in enumerate(segments):
+            if segment.startswith(("[...", "[[...")):
+                if position != len(segments) - 1:
+                    raise ValueError(f"Catch-all segment must be last in {route}.")
+                node.catch_all = _dynamic_child(node.catch_all, segment, route)
+                node = node.catch_all
+            elif segment.startswith("["):
+                node.param = _dynamic_child(node.param, segment, route)
+                node = node.param
+            else:
+                if node.static is None:
+                    node.static = {}
+                child = node.static.get(segment)
+                if child is None:
+                    child = node.static[segment] = RouteNode(segment)
+                node = child
+
+        if node.route is None:
+            self._size += 1
+        node.route = normalize_route(route)
+        node.data = data
+        return node
+
+    def match(self, path: str) -> RouteMatch | None:
+        """Find the route serving a path.
+
+        Args:
+            path: The requested path, e.g. ``/projects/spark``.
+
+        Returns:
+            The matching route and its parameters, or None.
+        """
+        segments = split_route(path)
+        # Depth first without recursion, the preferred child on top.
+        stack = [(self.root, 0, {})]
+        while stack:
+            node, position, params = stack.pop()
+            if position < len(segments):
+                stack.extend(_candidates(node, segments, position, params))
+            elif node.route is not None:
+                return RouteMatch(node.route, params, node.data)
+            elif (
+                (optional := node.catch_all) is not None
+                and optional.optional
+                and optional.route is not None
+            ):
+                return RouteMatch(
+                    optional.route, {**params, optional.name: []}, optional.data
+                )
+        return None
+
+    def longest_prefix(self, path: str) -> str | None:
+        """Find the deepest registered route containing a path.
+
+        The path is followed one level at a time, static segments first,
+        keeping the preferred node and a single fallback at each level, so
+        the lookup costs O(depth) however ambiguous the trie.
+
+        Args:
+            path: The requested path.
+
+        Returns:
+            The route of the deepest registered ancestor of the path, the
+            preferred one among ancestors as deep, or None.
+        """
+        segments = split_route(path)
+        best = self.root.route
+        level = [self.root]
+        # A catch-all is one segment deep, like the other children.
+        for position in range(len(segments)):
+            children = [
+                child
+                for node in level
+                for child, _, _ in reversed(_candidates(node, segments, position, {}))
+            ]
+            level = children[:2]
+            if not level:
+                break
+            best = next((node.route for node in level if node.route is not None), best)
+        return best
+
+    def walk(self) -> Iterator[tuple[int, RouteNode]]:
+        """Visit the trie depth first, without recursion.
+
+        Yields:
+            The depth and node of every segment, parents before their children.
+        """
+        stack = [(0, self.root)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            stack.extend((depth + 1, child) for child in reversed(node.children()))
+
+    def __iter__(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Iterate over the registered routes in a stable order.
+
+        Yields:
+            Each route with its metadata.
+        """
+        for _, node in self.walk():
+            if node.route is not None:
+                yield node.route, node.data
+
+    def __contains__(self, route: str) -> bool:
+        node = self.root
+        for segment in split_route(route):
+            if segment.startswith(("[...", "[[...")):
+                node = node.catch_all
+            elif segment.startswith("["):
+                node = node.param
+            else:
+                node = node.static.get(segment) if node.static else None
+            if node is None or node.segment != segment:
+                return False
+        return node.route is not None
+
+    def __len__(self) -> int:
+        return self._size
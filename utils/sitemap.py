@@ -0,0 +1,234 @@
+"""Write sitemap.xml, robots.txt and the navigation tree at compile time.
+
+The files are generated from the routes registered through the ``template``
+decorator and land in the public directory of the frontend, so both crawlers
+and the client read precomputed files instead of asking the backend. The
+navigation bar of the pages is built from the same routes, see
+``navigation_links``.
+
+Generation is incremental: the sitemap entry and navigation node of a route
+are kept between the compiles of a process, e.g. the reloads of ``reflex
+run``, and serialized again only when the metadata of the route changed. The
+files whose content did not change are not written again.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable
+from xml.sax.saxutils import escape
+
+from reflex.plugins import Plugin
+from reflex_base.constants import Dirs
+
+from utils.routes import RouteIndex
+
+SITEMAP_PATH = Path(Dirs.PUBLIC) / "sitemap.xml"
+ROBOTS_PATH = Path(Dirs.PUBLIC) / "robots.txt"
+NAVIGATION_PATH = Path(Dirs.PUBLIC) / "navigation.json"
+
+
+def navigation_node(route: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Build the navigation node of a route, without its children.
+
+    Args:
+        route: The route.
+        data: The metadata registered with the route.
+
+    Returns:
+        The route, with its title, description and sections when set.
+    """
+    node: dict[str, Any] = {"route": route}
+    for key in ("title", "description"):
+        if data.get(key) is not None:
+            node[key] = data[key]
+    if data.get("sections"):
+        node["sections"] = [
+            {"id": id, "title": title} for id, title in data["sections"].items()
+        ]
+    return node
+
+
+def navigation_tree(
+    index: RouteIndex,
+    node: Callable[[str, dict[str, Any]], dict[str, Any]] = navigation_node,
+) -> list[dict[str, Any]]:
+    """Nest the registered routes under their closest registered ancestor.
+
+    Args:
+        index: The registered routes.
+        node: Build the navigation node of a route, without its children.
+
+    Returns:
+        The navigation nodes of the top-level routes, each with its route,
+        title, description and sections when set, and its children.
+    """
+    tree: list[dict[str, Any]] = []
+    # The depth and node of the registered ancestors of the current route.
+    ancestors: list[tuple[int, dict[str, Any]]] = []
+    for depth, trie_node in index.walk():
+        if trie_node.route is None:
+            continue
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        entry = {**node(trie_node.route, trie_node.data), "children": []}
+        (ancestors[-1][1]["children"] if ancestors else tree).append(entry)
+        ancestors.append((depth, entry))
+    return tree
+
+
+class RouteFiles:
+    """The serialized entries of each route, reused between compiles."""
+
+    def __init__(self):
+        # The metadata, sitemap entry and navigation node of each route.
+        self.entries: dict[str, tuple[dict[str, Any], str, dict[str, Any]]] = {}
+        self.base_url = ""
+        # The routes serialized by the last call to `build`.
+        self.serialized: list[str] = []
+
+    def entry(self, route: str, data: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        """Get the entries of a route, serializing it only when it changed.
+
+        Args:
+            route: The route.
+            data: The metadata registered with the route.
+
+        Returns:
+            The ``<url>`` element, empty for dynamic routes, and the
+            navigation node of the route.
+        """
+        cached = self.entries.get(route)
+        if cached is None or cached[0] != data:
+            url = (
+                ""
+                if "[" in route
+                else f"  <url><loc>{escape(self.base_url + route)}</loc></url>\n"
+            )
+            cached = self.entries[route] = (
+                dict(data),
+                url,
+                navigation_node(route, data),
+            )
+            self.serialized.append(route)
+        return cached[1], cached[2]
+
+    def build(self, index: RouteIndex, deploy_url: str) -> dict[Path, str]:
+        """Generate the sitemap, robots and navigation files.
+
+        Args:
+            index: The registered routes.
+            deploy_url: The public URL of the site.
+
+        Returns:
+            The content of each file, keyed by its path in the web directory.
+        """
+        base_url = deploy_url.rstrip("/")
+        if base_url != self.base_url:
+            self.entries, self.base_url = {}, base_url
+        self.serialized = []
+
+        urls = "".join(self.entry(route, data)[0] for route, data in index)
+        tree = navigation_tree(index, lambda route, data: self.entry(route, data)[1])
+        self.entries = {route: self.entries[route] for route, _ in index}
+        return {
+            SITEMAP_PATH: (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                f"{urls}</urlset>\n"
+            ),
+            ROBOTS_PATH: (
+                "User-agent: *\n"
+                "Disallow: /_event/\n"
+                f"Sitemap: {base_url}/{SITEMAP_PATH.name}\n"
+            ),
+            NAVIGATION_PATH: json.dumps(tree) + "\n",
+        }
+
+
+def build_route_files(index: RouteIndex, deploy_url: str) -> dict[Path, str]:
+    """Generate the sitemap, robots and navigation files from scratch.
+
+    Args:
+        index: The registered routes.
+        deploy_url: The public URL of the site.
+
+    Returns:
+        The content of each file, keyed by its path in the web directory.
+    """
+    return RouteFiles().build(index, deploy_url)
+
+
+def changed_files(files: dict[Path, str], web_dir: Path) -> dict[Path, str]:
+    """Drop the files already written with the same content.
+
+    Args:
+        files: The content of each file, keyed by its path in the web directory.
+        web_dir: The web directory.
+
+    Returns:
+        The files to write.
+    """
+    changed = {}
+    for path, content in files.items():
+        target = web_dir / path
+        if not target.is_file() or target.read_text() != content:
+            changed[path] = content
+    return changed
+
+
+def navigation_links(index: RouteIndex, route: str) -> list[tuple[str, str]]:
+    """Get the links of the navigation bar of a page.
+
+    Args:
+        index: The registered routes.
+        route: The route of the page.
+
+    Returns:
+        The anchor and title of each section of the page, then the route and
+        title of every other static page with a title.
+    """
+    links = []
+    for other, data in index:
+        if other == route:
+            links = [
+                (f"#{id}", title) for id, title in (data.get("sections") or {}).items()
+            ] + links
+        elif "[" not in other and data.get("title"):
+            links.append((other, data["title"]))
+    return links
+
+
+# Kept between the compiles of the process.
+_route_files = RouteFiles()
+
+
+class RouteFilesPlugin(Plugin):
+    """Write the route files of the pages registered through the template."""
+
+    def pre_compile(self, **context):
+        """Schedule the generation of the route files.
+
+        Args:
+            context: The context for the plugin.
+        """
+        context["add_save_task"](route_files_task)
+
+
+def route_files_task() -> list[tuple[str, str]]:
+    """Generate the route files of the app.
+
+    Returns:
+        The path and content of each file.
+    """
+    from reflex.config import get_config
+    from reflex.utils.prerequisites import get_web_dir
+
+    from portofolio_reflex.templates.template import routes
+
+    files = _route_files.build(routes, get_config().deploy_url or "")
+    return [
+        (str(path), content)
+        for path, content in changed_files(files, get_web_dir()).items()
+    ]
@@ -0,0 +1,160 @@
+"""Compile the static style props of the pages to shared CSS classes.
+
+Reflex renders the style props of every component as an emotion ``css``
+object, serialized in the page bundle and injected in the document at
+runtime. Most styles of the portfolio are static and many are repeated, so
+they are compiled once at build time instead: each distinct style becomes a
+class of ``styles/style_classes.css`` and the components only reference its
+name. Like emotion styles, the classes are unlayered so they still win over
+Radix and Tailwind.
+
+Styles depending on a Var, such as a state or a theme color, are left to
+emotion.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Any
+
+import reflex as rx
+from reflex.plugins import Plugin
+from reflex_base.constants import Dirs
+from reflex_base.style import format_as_emotion
+
+STYLESHEET = "style_classes.css"
+
+CLASS_PREFIX = "s-"
+
+
+class DynamicStyleError(ValueError):
+    """A style value only known at runtime."""
+
+
+def _property(key: str) -> str:
+    """Format a style key as a CSS property."""
+    if key.startswith("--"):
+        return key
+    return re.sub(r"[A-Z]", lambda match: "-" + match.group().lower(), key)
+
+
+def _value(value: Any) -> str:
+    """Get the CSS value of a literal string style value."""
+    if isinstance(value, rx.Var):
+        if value._get_all_var_data() is not None:
+            raise DynamicStyleError(value._js_expr)
+        value = getattr(value, "_var_value", None)
+    # Emotion appends units to numbers, only plain strings are copied as is.
+    if not isinstance(value, str):
+        raise DynamicStyleError(repr(value))
+    return value
+
+
+def style_rules(selector: str, style: dict[str, Any]) -> list[str]:
+    """Compile an emotion style object to CSS rules.
+
+    As in emotion, the declarations of a selector come first and its nested
+    rules after them, whatever their order in the style.
+
+    Args:
+        selector: The selector the style applies to.
+        style: The emotion style, nested rules keyed by a media query or a
+            selector where ``&`` stands for the parent selector.
+
+    Returns:
+        The CSS rules.
+
+    Raises:
+        DynamicStyleError: If a value is not a literal string.
+    """
+    declarations, nested = [], []
+    for key, value in style.items():
+        if not isinstance(value, dict):
+            declarations.append(f"{_property(key)}:{_value(value)}")
+        elif key.startswith("@"):
+            nested.append(f"{key}{{{''.join(style_rules(selector, value))}}}")
+        else:
+            child = key.replace("&", selector) if "&" in key else f"{selector} {key}"
+            nested.extend(style_rules(child, value))
+    if declarations:
+        return [f"{selector}{{{';'.join(declarations)}}}", *nested]
+    return nested
+
+
+class StyleClassesPlugin(Plugin):
+    """Replace the static style props of components by shared classes."""
+
+    def __init__(self):
+        # The rules of every class seen by the process. The components of the
+        # memoized factories are shared across compiles and keep their class
+        # once their style is moved, so its rules must outlive the compile.
+        self.rules: dict[str, list[str]] = {}
+        # The classes used by the current compile, in order of first use.
+        self.classes: dict[str, None] = {}
+
+    def enter_component(
+        self, comp, /, *, page_context, compile_context, in_prop_tree=False
+    ):
+        """Move the style of a component to a shared class.
+
+        Args:
+            comp: The component being compiled.
+            page_context: The active page compilation state.
+            compile_context: The active compile-run state.
+            in_prop_tree: Whether the component is visited through a prop subtree.
+        """
+        class_name = comp.class_name
+        if isinstance(class_name, rx.Var):
+            class_name = getattr(class_name, "_var_value", None)
+        if not isinstance(class_name, (str, type(None))):
+            return
+        # Moved by a previous compile of the same component.
+        for name in (class_name or "").split():
+            if name in self.rules:
+                self.classes[name] = None
+
+        if not comp.style or isinstance(comp.style, rx.Var) or comp.style._var_data:
+            return
+        emotion = format_as_emotion(comp.style)
+        try:
+            body = "".join(style_rules("&", emotion or {}))
+        except DynamicStyleError:
+            return
+        name = CLASS_PREFIX + hashlib.sha256(body.encode()).hexdigest()[:8]
+        if name not in self.rules:
+            self.rules[name] = style_rules(f".{name}", emotion)
+        self.classes[name] = None
+
+        comp.class_name = f"{class_name} {name}" if class_name else name
+        comp.style = rx.style.Style()
+
+    def get_stylesheet_paths(self, **context) -> list[str]:
+        """Get the stylesheet of the classes, imported by the root stylesheet.
+
+        Args:
+            context: The context for the plugin.
+
+        Returns:
+            The path of the stylesheet relative to the styles directory.
+        """
+        return [f"./{STYLESHEET}"]
+
+    def pre_compile(self, **context):
+        """Schedule the stylesheet, written once every page is compiled.
+
+        Args:
+            context: The context for the plugin.
+        """
+        context["add_save_task"](self.stylesheet_task)
+
+    def stylesheet_task(self) -> tuple[str, str]:
+        """Write the classes used by the compiled pages.
+
+        Returns:
+            The path and content of the stylesheet.
+        """
+        classes, self.classes = self.classes, {}
+        rules = (rule for name in classes for rule in self.rules[name])
+        return str(Path(Dirs.STYLES) / STYLESHEET), "\n".join(rules) + "\n"